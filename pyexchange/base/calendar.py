@@ -13,6 +13,7 @@ ExchangeExtendedFieldURI = namedtuple('ExchangeExtendedFieldURI', ['distinguishe
 ExchangeEventOrganizer = namedtuple('ExchangeEventOrganizer', ['name', 'email'])
 ExchangeEventAttendee = namedtuple('ExchangeEventAttendee', ['name', 'email', 'required'])
 ExchangeEventResponse = namedtuple('ExchangeEventResponse', ['name', 'email', 'response', 'last_response', 'required'])
+ExchangeEventOccurrence = namedtuple('ExchangeEventOccurrence', ['id', 'start', 'end', 'original_start'])
 
 
 RESPONSE_ACCEPTED = u'Accept'
@@ -22,6 +23,14 @@ RESPONSE_UNKNOWN = u'Unknown'
 
 RESPONSES = [RESPONSE_ACCEPTED, RESPONSE_DECLINED, RESPONSE_TENTATIVE, RESPONSE_UNKNOWN]
 
+# Values of the merged free/busy vector, one per interval.
+FREE_BUSY_FREE = 0
+FREE_BUSY_TENTATIVE = 1
+FREE_BUSY_BUSY = 2
+FREE_BUSY_OOF = 3
+FREE_BUSY_WORKING_ELSEWHERE = 4
+FREE_BUSY_NO_DATA = 5
+
 
 class BaseExchangeCalendarService(object):
 
@@ -66,6 +75,10 @@ class BaseExchangeCalendarEvent(object):
     recurrence_end_date = None
     recurrence_days = None
     recurrence_interval = None
+    _recurrence_count = None
+
+    _modified_occurrences = []  # exceptions to a recurring series
+    _deleted_occurrences = []  # original start times of cancelled occurrences
 
     _type = None
 
@@ -90,7 +103,10 @@ class BaseExchangeCalendarEvent(object):
 
     WEEKLY_DAYS = [u'Sunday', u'Monday', u'Tuesday', u'Wednesday', u'Thursday', u'Friday', u'Saturday']
 
-    def __init__(self, service, id=None, calendar_id=u'calendar', xml=None, additional_properties=None, **kwargs):
+    def __init__(self, service, id=None, calendar_id=u'calendar', xml=None, additional_properties=None, fields=None,
+                 **kwargs):
+        self._dirty_attributes = set()  # each event tracks its own changes
+
         self.service = service
         self.calendar_id = calendar_id
 
@@ -99,12 +115,15 @@ class BaseExchangeCalendarEvent(object):
         elif id is None:
             self._update_properties(kwargs)
         else:
-            self._init_from_service(id, additional_properties=additional_properties)
+            self._init_from_service(id, additional_properties=additional_properties, fields=fields)
 
         self._track_dirty_attributes = True  # magically look for changed attributes
 
-    def _init_from_service(self, id, additional_properties=None):
-        """ Connect to the Exchange service and grab all the properties out of it. """
+    def _init_from_service(self, id, additional_properties=None, fields=None):
+        """
+        Connect to the Exchange service and grab all the properties out of it, or only the FieldURIs in
+        *fields* if given.
+        """
         raise NotImplementedError
 
     def _init_from_xml(self, xml):
@@ -130,6 +149,16 @@ class BaseExchangeCalendarEvent(object):
         """ **Read-only.** The internal id Exchange uses to refer to conflicting events. """
         return self._conflicting_event_ids
 
+    @property
+    def modified_occurrences(self):
+        """ **Read-only.** The occurrences of a recurring master that were changed, as :class:`ExchangeEventOccurrence` objects. """
+        return self._modified_occurrences
+
+    @property
+    def deleted_occurrences(self):
+        """ **Read-only.** The original start times of the occurrences of a recurring master that were cancelled. """
+        return self._deleted_occurrences
+
     @property
     def change_key(self):
         """ **Read-only.** When you change an event, Exchange makes you pass a change key to prevent overwriting a previous version. """
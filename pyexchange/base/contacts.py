@@ -38,7 +38,7 @@ class BaseExchangeContactItem(object):
     home_phone = None
     mobile_phone = None
 
-    def __init__(self, service, id=None, xml=None, folder_id=None, **kwargs):
+    def __init__(self, service, id=None, xml=None, folder_id=None, fields=None, **kwargs):
         self.service = service
         self.folder_id = folder_id
 
@@ -47,12 +47,12 @@ class BaseExchangeContactItem(object):
         elif id is None:
             self._update_properties(kwargs)
         else:
-            self._init_from_service(id)
+            self._init_from_service(id, fields=fields)
 
     def _init_from_xml(self, xml):
         raise NotImplementedError
 
-    def _init_from_service(self, id):
+    def _init_from_service(self, id, fields=None):
         raise NotImplementedError
 
     def create(self):
@@ -13,8 +13,9 @@ from datetime import datetime
 from pytz import utc
 
 
+from ..cache import LRUCache
 from ..exceptions import FailedExchangeException
-from ..compat import IS_PYTHON3
+from ..compat import IS_PYTHON3, _unicode
 
 SOAP_NS = u'http://schemas.xmlsoap.org/soap/envelope/'
 
@@ -23,6 +24,16 @@ S = ElementMaker(namespace=SOAP_NS, nsmap=SOAP_NAMESPACES)
 
 log = logging.getLogger('pyexchange')
 
+SLOT_PREFIX = u'pyexchange-slot-'
+
+_SLOT_RE = re.compile(br'<!--pyexchange-slot-(\w+)-->|pyexchange-slot-(\w+)')
+
+# Characters lxml refuses to serialize.
+_INVALID_XML_CHARACTERS_RE = re.compile(u'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_TEXT_ESCAPES = ((u'&', u'&amp;'), (u'<', u'&lt;'), (u'>', u'&gt;'), (u'\r', u'&#13;'))
+_ATTRIBUTE_ESCAPES = _TEXT_ESCAPES + ((u'"', u'&quot;'), (u'\n', u'&#10;'), (u'\t', u'&#9;'))
+
 if IS_PYTHON3:
     unichr = chr
 
@@ -40,18 +51,170 @@ def remove_control_characters(html):
     return html
 
 
+def slot(name):
+    """ A placeholder for a text or attribute value in a :class:`RequestTemplate`. """
+    return SLOT_PREFIX + name
+
+
+def repeat_children(element, name):
+    """ Marks the children of *element* as a :class:`RequestTemplate` section that is repeated for each value. """
+    element.insert(0, etree.Comment(slot(name)))
+    element.append(etree.Comment(slot(name)))
+    return element
+
+
+def escape_xml(value, in_attribute=False):
+    """ Escapes *value* the way lxml serializes text (or, with *in_attribute*, attribute values). """
+    value = _unicode(value)
+    if _INVALID_XML_CHARACTERS_RE.search(value):
+        raise ValueError(u'All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters')
+    for character, escaped in _ATTRIBUTE_ESCAPES if in_attribute else _TEXT_ESCAPES:
+        if character in value:
+            value = value.replace(character, escaped)
+    return value
+
+
+def serialize_body(element, encoding="utf-8"):
+    """ Serializes *element* the way it's written inside the envelope, i.e. without redeclaring the s: namespace. """
+    data = etree.tostring(S.Body(element), encoding=encoding)
+    return data[data.index(b'>') + 1:data.rindex(b'</')]
+
+
+class SerializedRequest(bytes):
+    """ A request body that is already serialized. ``send`` wraps it in the envelope as it is. """
+
+    def __new__(cls, data, operation, encoding="utf-8"):
+        self = bytes.__new__(cls, data)
+        self.operation = operation
+        self.encoding = encoding
+        return self
+
+
+class RequestTemplate(object):
+    """
+    A request body serialized once, with values spliced into it for each request. ::
+
+        template = RequestTemplate(repeat_children(M.ItemIds(T.ItemId(Id=slot(u'id'))), u'ids'))
+        body = template.render(ids=[{u'id': item_id} for item_id in item_ids])
+
+    Text and attribute values set to :func:`slot` are filled in from the keyword arguments of :meth:`render`,
+    escaped like lxml would. The children of an element marked with :func:`repeat_children` are written out
+    once for each dict in the list passed under that name.
+
+    The output is the same as serializing the element with the values in place, and is returned as a
+    :class:`SerializedRequest` for ``send``.
+    """
+
+    def __init__(self, element, encoding="utf-8"):
+        self.operation = etree.QName(element).localname
+        self.encoding = encoding
+
+        data = serialize_body(element, encoding)
+
+        # Each part is either bytes or a (name, in_attribute, repeated parts) tuple.
+        sections = [(None, [])]
+        position = 0
+        for match in _SLOT_RE.finditer(data):
+            text = data[position:match.start()]
+            sections[-1][1].append(text)
+            position = match.end()
+
+            section, name = match.group(1), match.group(2)
+            if name is not None:
+                sections[-1][1].append((name.decode('ascii'), text.endswith(b'="'), None))
+            elif sections[-1][0] == section:
+                section, parts = sections.pop()
+                sections[-1][1].append((section.decode('ascii'), False, parts))
+            else:
+                sections.append((section, []))
+
+        if len(sections) != 1:
+            raise ValueError(u'Unterminated repeated section in request template')
+
+        sections[0][1].append(data[position:])
+        self._parts = sections[0][1]
+
+    def render(self, **values):
+        output = []
+        self._render(self._parts, values, output)
+        return SerializedRequest(b''.join(output), self.operation, self.encoding)
+
+    def _render(self, parts, values, output):
+        for part in parts:
+            if isinstance(part, bytes):
+                output.append(part)
+                continue
+
+            name, in_attribute, repeated = part
+            if repeated is None:
+                output.append(escape_xml(values[name], in_attribute).encode(self.encoding))
+            else:
+                for repeated_values in values[name]:
+                    self._render(repeated, repeated_values, output)
+
+
 class ExchangeServiceSOAP(object):
 
     EXCHANGE_DATE_FORMAT = u"%Y-%m-%dT%H:%M:%SZ"
 
-    def __init__(self, connection):
+    # How many serialized envelopes (e.g. one per impersonated user) are kept.
+    ENVELOPE_CACHE_SIZE = 1000
+
+    def __init__(self, connection, response_cache=None):
         self.connection = connection
+        # An optional pyexchange.cache.ResponseCache for read-only requests that repeat.
+        self.response_cache = response_cache
+        # The serialized envelope around the body, for each value of _envelope_key().
+        self._envelopes = LRUCache(max_size=self.ENVELOPE_CACHE_SIZE)
+
+    def send(self, xml, headers=None, retries=4, timeout=30, encoding="utf-8", check_for_errors=True, use_cache=True):
+        """
+        Sends *xml*, an element or a :class:`SerializedRequest`, to Exchange and returns the parsed response.
+
+        The body is serialized on its own and sent between the halves of an envelope that is only serialized
+        once for each _envelope_key(), so no envelope tree is built per request.
+        """
+        if not isinstance(xml, SerializedRequest):
+            xml = SerializedRequest(serialize_body(xml, encoding), etree.QName(xml).localname, encoding)
+
+        prefix, suffix = self._serialized_envelope(xml.encoding)
+        request = b''.join((prefix, xml, suffix))
 
-    def send(self, xml, headers=None, retries=4, timeout=30, encoding="utf-8", check_for_errors=True):
-        request_xml = self._wrap_soap_xml_request(xml)
-        log.info(etree.tostring(request_xml, encoding=encoding, pretty_print=True))
-        response = self._send_soap_request(request_xml, headers=headers, retries=retries, timeout=timeout, encoding=encoding)
-        return self._parse(response, encoding=encoding, check_for_errors=check_for_errors)
+        if log.isEnabledFor(logging.INFO):
+            log.info(request.decode(xml.encoding))
+
+        cache_key = None
+        if use_cache and self.response_cache is not None and self.response_cache.caches(xml.operation):
+            url = getattr(self.connection, 'url', None) or u''
+            cache_key = self.response_cache.key(url.encode('utf-8') + request)
+            response = self.response_cache.get(cache_key)
+            if response is not None:
+                return self._parse(response, encoding=encoding, check_for_errors=check_for_errors)
+
+        response = self._send_soap_request(request, headers=headers, retries=retries, timeout=timeout, encoding=encoding)
+        tree = self._parse(response, encoding=encoding, check_for_errors=check_for_errors)
+
+        if cache_key is not None and self._is_cacheable(tree, check_for_errors):
+            self.response_cache.set(cache_key, xml.operation, response)
+
+        return tree
+
+    def _is_cacheable(self, tree, checked=True):
+        """
+        Whether a response can be stored: it passes error checking (done again unless *checked*), and every
+        ResponseMessage in it is a Success, so a partly failed batch is sent again rather than replayed.
+        """
+        if not checked:
+            try:
+                self._check_for_errors(tree)
+            except FailedExchangeException:
+                return False
+        return all(response_class == u'Success' for response_class in tree.xpath(u'//@ResponseClass'))
+
+    def invalidate_cached_responses(self, *operations):
+        """ Forgets cached responses to *operations* (e.g. u'GetFolder'), or all of them. """
+        if self.response_cache is not None:
+            self.response_cache.invalidate(*operations)
 
     def _parse(self, response, encoding="utf-8", check_for_errors=True):
 
@@ -66,7 +229,8 @@ class ExchangeServiceSOAP(object):
         if check_for_errors:
             self._check_for_errors(tree)
 
-        log.info(etree.tostring(tree, encoding=encoding, pretty_print=True))
+        if log.isEnabledFor(logging.INFO):
+            log.info(etree.tostring(tree, encoding=encoding, pretty_print=True))
         return tree
 
     def _check_for_errors(self, xml_tree):
@@ -83,7 +247,7 @@ class ExchangeServiceSOAP(object):
             raise FailedExchangeException(u"SOAP Fault from Exchange server", fault.text)
 
     def _send_soap_request(self, xml, headers=None, retries=2, timeout=30, encoding="utf-8"):
-        body = etree.tostring(xml, encoding=encoding)
+        body = xml if isinstance(xml, bytes) else etree.tostring(xml, encoding=encoding)
 
         response = self.connection.send(body, headers, retries, timeout)
         return response
@@ -92,6 +256,22 @@ class ExchangeServiceSOAP(object):
         root = S.Envelope(S.Body(exchange_xml))
         return root
 
+    def _envelope_key(self):
+        """ Whatever the envelope built by _wrap_soap_xml_request depends on, besides the body. """
+        return None
+
+    def _serialized_envelope(self, encoding="utf-8"):
+        """ The serialized envelope before and after the body, built once for each _envelope_key(). """
+        key = (self._envelope_key(), encoding)
+        envelope = self._envelopes.get(key, count=False)
+        if envelope is None:
+            marker = slot(u'body')
+            data = etree.tostring(self._wrap_soap_xml_request(etree.Comment(marker)), encoding=encoding)
+            prefix, suffix = data.split(b'<!--' + marker.encode('ascii') + b'-->')
+            envelope = (prefix, suffix)
+            self._envelopes.set(key, envelope)
+        return envelope
+
     def _parse_date(self, date_string):
         date = datetime.strptime(date_string, self.EXCHANGE_DATE_FORMAT)
         date = date.replace(tzinfo=utc)
@@ -118,11 +298,15 @@ class ExchangeServiceSOAP(object):
 
         result = {}
 
-        log.info(etree.tostring(element, pretty_print=True))
+        # Parsers run this once per item, so don't serialize anything nobody will read.
+        log_info = log.isEnabledFor(logging.INFO)
+        if log_info:
+            log.info(etree.tostring(element, pretty_print=True))
 
         for key in property_map:
             item = property_map[key]
-            log.info(u'Pulling xpath {xpath} into key {key}'.format(key=key, xpath=item[u'xpath']))
+            if log_info:
+                log.info(u'Pulling xpath {xpath} into key {key}'.format(key=key, xpath=item[u'xpath']))
             nodes = element.xpath(item[u'xpath'], namespaces=namespace_map)
 
             if nodes:
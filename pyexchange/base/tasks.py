@@ -41,7 +41,7 @@ class BaseExchangeTaskItem(object):
     last_modified_by = None
     last_modified_at = None
 
-    def __init__(self, service, id=None, xml=None, folder_id=None, **kwargs):
+    def __init__(self, service, id=None, xml=None, folder_id=None, fields=None, **kwargs):
         self.service = service
         self.folder_id = folder_id
 
@@ -50,12 +50,12 @@ class BaseExchangeTaskItem(object):
         elif id is None:
             self._update_properties(kwargs)
         else:
-            self._init_from_service(id)
+            self._init_from_service(id, fields=fields)
 
     def _init_from_xml(self, xml):
         raise NotImplementedError
 
-    def _init_from_service(self, id):
+    def _init_from_service(self, id, fields=None):
         raise NotImplementedError
 
     def create(self):
@@ -0,0 +1,298 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
+
+log = logging.getLogger('pyexchange')
+
+CachedItem = namedtuple('CachedItem', 'change_key xml fetched_at')
+
+_MISSING = object()
+
+# os.replace overwrites the target on every platform, but only exists on Python 3.
+_replace = getattr(os, 'replace', os.rename)
+
+
+class LRUCache(object):
+    """
+    A thread safe dict that holds at most *max_size* entries, dropping the least recently used one first.
+
+    If *ttl* is given, entries older than *ttl* seconds are treated as missing.
+    """
+
+    def __init__(self, max_size=1000, ttl=None, clock=time.time):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key, default=None, count=True):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or (self.ttl is not None and self.clock() - entry[0] > self.ttl):
+                if count:
+                    self.misses += 1
+                return default
+
+            self._entries[key] = entry
+            if count:
+                self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (self.clock(), value)
+            while self.max_size is not None and len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ItemCache(object):
+    """
+    Remembers GetItem responses together with the change key of the item they describe. ::
+
+        service = Exchange2010Service(connection, item_cache=ItemCache(max_size=5000, max_age=30))
+
+    A cached item younger than *max_age* seconds is served as is. An older one is checked with a cheap
+    IdOnly GetItem first and only fetched again if its change key moved on. Entries are dropped after
+    *max_stale_age* seconds (if given) or once *max_size* items are cached.
+
+    Responses are kept separately for each shape (base shape and additional properties) they were fetched
+    with, as long as the item doesn't change.
+    """
+
+    def __init__(self, max_size=1000, max_age=60, max_stale_age=None, clock=time.time):
+        self.max_age = max_age
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries = LRUCache(max_size=max_size, ttl=max_stale_age, clock=clock)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, item_id, shape=None):
+        """ Returns the :class:`CachedItem` for *item_id* fetched with *shape*, or None. """
+        entry = self._entries.get(item_id, count=False)
+        if entry is None or shape not in entry.xml:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedItem(change_key=entry.change_key, xml=entry.xml[shape], fetched_at=entry.fetched_at)
+
+    def is_fresh(self, cached):
+        return self.max_age is not None and self.clock() - cached.fetched_at <= self.max_age
+
+    def set(self, item_id, change_key, xml, shape=None):
+        entry = self._entries.get(item_id, count=False)
+        responses = dict(entry.xml) if entry is not None and entry.change_key == change_key else {}
+        responses[shape] = xml
+        self._entries.set(item_id, CachedItem(change_key=change_key, xml=responses, fetched_at=self.clock()))
+
+    def change_key(self, item_id):
+        """ The change key of *item_id* if it was cached or checked within max_age, otherwise None. """
+        entry = self._entries.get(item_id, count=False)
+        if entry is not None and self.is_fresh(entry):
+            return entry.change_key
+        return None
+
+    def item_ids(self):
+        return self._entries.keys()
+
+    def revalidate(self, item_id, change_key):
+        """ Keeps the cached responses for *item_id* if it still has *change_key*, and drops them if not. """
+        self.revalidations += 1
+        entry = self._entries.get(item_id, count=False)
+        if entry is None:
+            return False
+        if entry.change_key != change_key:
+            self._entries.invalidate(item_id)
+            return False
+        self._entries.set(item_id, entry._replace(fetched_at=self.clock()))
+        return True
+
+    def invalidate(self, item_ids):
+        """ Forgets the given item ids, e.g. because a sync or push notification said they changed. """
+        if item_ids is None:
+            return
+        if not isinstance(item_ids, (list, tuple, set)):
+            item_ids = [item_ids]
+        for item_id in item_ids:
+            self._entries.invalidate(item_id)
+
+    def invalidate_notification(self, events):
+        """ Forgets the items named in the output of ``notifications().parse_push_notification``. """
+        for event_type, ids in events.items():
+            if event_type == 'moved':
+                if ids:
+                    self.invalidate(ids.get('item_id'))
+                    self.invalidate(ids.get('old_item_id'))
+            else:
+                self.invalidate(ids)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class ResponseCache(object):
+    """
+    Remembers the responses to read-only EWS requests that are sent over and over. ::
+
+        service = Exchange2010Service(connection, response_cache=ResponseCache())
+
+    Responses are keyed by a hash of the serialized request envelope, so the impersonated user is part
+    of the key. Only the operations in *ttls* are cached, each for its own number of seconds (None means
+    until evicted). At most *max_size* responses are kept in memory; if *directory* is given, responses are
+    also written there and survive restarts.
+
+    Use :meth:`bypass` or ``send(..., use_cache=False)`` to go to Exchange anyway, and :meth:`invalidate` to
+    forget responses.
+    """
+
+    DEFAULT_TTLS = {
+        u'GetRoomLists': 3600,
+        u'GetRooms': 3600,
+        u'GetFolder': 300,
+        u'FindFolder': 300,
+        u'ConvertId': 86400,
+    }
+
+    def __init__(self, max_size=1000, ttls=None, directory=None, clock=time.time):
+        self.ttls = dict(self.DEFAULT_TTLS if ttls is None else ttls)
+        self.directory = directory
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = LRUCache(max_size=max_size, clock=clock)  # key -> (operation, expires_at, response)
+        self._local = threading.local()
+
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def caches(self, operation):
+        return operation in self.ttls and not getattr(self._local, 'bypass', False)
+
+    @contextmanager
+    def bypass(self):
+        """ Sends every request made by this thread inside the ``with`` block to Exchange. """
+        previous = getattr(self._local, 'bypass', False)
+        self._local.bypass = True
+        try:
+            yield self
+        finally:
+            self._local.bypass = previous
+
+    def key(self, request):
+        return hashlib.sha256(request).hexdigest()
+
+    def get(self, key):
+        entry = self._entries.get(key, count=False)
+        if entry is None and self.directory is not None:
+            entry = self._read(key)
+            if entry is not None:
+                self._entries.set(key, entry)
+
+        if entry is None or (entry[1] is not None and self.clock() > entry[1]):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry[2]
+
+    def set(self, key, operation, response):
+        ttl = self.ttls.get(operation)
+        entry = (operation, None if ttl is None else self.clock() + ttl, response)
+        self._entries.set(key, entry)
+        if self.directory is not None:
+            self._write(key, entry)
+
+    def invalidate(self, *operations):
+        """ Forgets the cached responses to *operations*, or every response if none are given. """
+        for key in self._entries.keys():
+            entry = self._entries.get(key, count=False)
+            if entry is not None and (not operations or entry[0] in operations):
+                self._entries.invalidate(key)
+
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                entry = self._read(name)
+                if entry is None or not operations or entry[0] in operations:
+                    self._remove(path)
+
+    def clear(self):
+        self.invalidate()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _read(self, key):
+        try:
+            with io.open(self._path(key), encoding='utf-8', newline='') as f:
+                operation = f.readline()
+                expires_at = f.readline()
+                response = f.read()
+            if not (operation.endswith(u'\n') and expires_at.endswith(u'\n')):
+                raise ValueError(u'truncated header')
+            expires_at = expires_at.rstrip(u'\n')
+            return operation.rstrip(u'\n'), float(expires_at) if expires_at else None, response
+        except (IOError, OSError):
+            return None
+        except ValueError as err:
+            # A file cut short or garbled (a crash mid-write, a full disk) is dropped and counts as a miss.
+            log.warning(u'Discarding corrupt cached response %s: %s' % (self._path(key), err))
+            self._remove(self._path(key))
+            return None
+
+    def _write(self, key, entry):
+        operation, expires_at, response = entry
+        temp_path = u'%s.%s.tmp' % (self._path(key), threading.current_thread().ident)
+        try:
+            with io.open(temp_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(u'%s\n%s\n' % (operation, u'' if expires_at is None else repr(expires_at)))
+                f.write(response)
+            _replace(temp_path, self._path(key))
+        except (IOError, OSError) as err:
+            log.warning(u'Unable to write cached response to %s: %s' % (self.directory, err))
+            self._remove(temp_path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
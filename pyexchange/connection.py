@@ -9,6 +9,7 @@ from requests_ntlm import HttpNtlmAuth
 from requests.auth import HTTPBasicAuth
 
 import logging
+import threading
 
 from .exceptions import FailedExchangeException
 
@@ -33,6 +34,7 @@ class ExchangeNTLMAuthConnection(ExchangeBaseConnection):
         self.handler = None
         self.session = None
         self.password_manager = None
+        self._session_lock = threading.Lock()
 
     def build_password_manager(self):
         if self.password_manager:
@@ -45,15 +47,18 @@ class ExchangeNTLMAuthConnection(ExchangeBaseConnection):
         return self.password_manager
 
     def build_session(self):
-        if self.session:
-            return self.session
+        # Batched requests are sent from several threads; only the first of them builds the session.
+        with self._session_lock:
+            if self.session:
+                return self.session
 
-        log.debug(u'Constructing opener')
+            log.debug(u'Constructing opener')
 
-        self.password_manager = self.build_password_manager()
+            self.password_manager = self.build_password_manager()
 
-        self.session = requests.Session()
-        self.session.auth = self.password_manager
+            session = requests.Session()
+            session.auth = self.password_manager
+            self.session = session
 
         return self.session
 
@@ -91,6 +96,7 @@ class ExchangeBasicAuthConnection(ExchangeBaseConnection):
         self.handler = None
         self.session = None
         self.password_manager = None
+        self._session_lock = threading.Lock()
 
     def build_password_manager(self):
         if self.password_manager:
@@ -103,15 +109,18 @@ class ExchangeBasicAuthConnection(ExchangeBaseConnection):
         return self.password_manager
 
     def build_session(self):
-        if self.session:
-            return self.session
+        # Batched requests are sent from several threads; only the first of them builds the session.
+        with self._session_lock:
+            if self.session:
+                return self.session
 
-        log.debug(u'Constructing opener')
+            log.debug(u'Constructing opener')
 
-        self.password_manager = self.build_password_manager()
+            self.password_manager = self.build_password_manager()
 
-        self.session = requests.Session()
-        self.session.auth = self.password_manager
+            session = requests.Session()
+            session.auth = self.password_manager
+            self.session = session
 
         return self.session
 
@@ -0,0 +1,181 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import threading
+
+# The contact properties that name lookups match the start of.
+NAME_ATTRIBUTES = (u'display_name', u'first_name', u'last_name')
+EMAIL_ATTRIBUTES = (u'email_address1', u'email_address2', u'email_address3')
+
+
+def _normalize(value):
+    return value.strip().lower()
+
+
+class PrefixTrie(object):
+    """ Maps strings to sets of values, and finds the values of every string starting with a prefix. """
+
+    def __init__(self):
+        self._root = {}
+
+    def add(self, key, value):
+        node = self._root
+        for character in key:
+            node = node.setdefault(character, {})
+        node.setdefault(None, set()).add(value)
+
+    def remove(self, key, value):
+        path = [self._root]
+        for character in key:
+            node = path[-1].get(character)
+            if node is None:
+                return
+            path.append(node)
+
+        values = path[-1].get(None)
+        if not values:
+            return
+        values.discard(value)
+        if not values:
+            del path[-1][None]
+
+        # Drop the nodes left leading nowhere.
+        for depth in range(len(key), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][key[depth - 1]]
+
+    def find(self, prefix, limit=None):
+        """ Returns the values under *prefix*, shortest keys first, stopping once there are *limit* of them. """
+        node = self._root
+        for character in prefix:
+            node = node.get(character)
+            if node is None:
+                return []
+
+        found = []
+        seen = set()
+        level = [node]
+        while level:
+            next_level = []
+            for node in level:
+                for value in node.get(None, ()):
+                    if value not in seen:
+                        seen.add(value)
+                        found.append(value)
+                        if limit is not None and len(found) >= limit:
+                            return found
+                next_level.extend(child for character, child in node.items() if character is not None)
+            level = next_level
+        return found
+
+
+class ContactDirectory(object):
+    """
+    A local copy of a contacts folder, for name and email lookups that don't go to Exchange.
+
+    ``refresh()`` loads the folder the first time; after that it lists the ids and change keys in the
+    folder and only fetches the contacts that are new or have changed since. Lookups are safe while another
+    thread refreshes.
+
+    **Examples**::
+
+      directory = service.contacts().directory()
+      directory.refresh()
+      directory.search(u'ann')
+      directory.by_email(u'ann@example.com')
+    """
+
+    def __init__(self, contact_service, batch_size=100, max_workers=4):
+        self.contact_service = contact_service
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        # Held for a whole refresh, so only one runs at a time; lookups only take _lock.
+        self._refresh_lock = threading.Lock()
+        self._contacts = {}
+        self._change_keys = {}
+        self._names = PrefixTrie()
+        self._emails = {}
+        self._loaded = False
+
+    def __len__(self):
+        return len(self._contacts)
+
+    def __iter__(self):
+        with self._lock:
+            contacts = list(self._contacts.values())
+        return iter(contacts)
+
+    def refresh(self):
+        """ Brings the directory up to date with the folder, returning the number of contacts fetched. """
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self):
+        if not self._loaded:
+            contacts = list(self.contact_service.get_all_contacts().items)
+            with self._lock:
+                for contact in contacts:
+                    self._add(contact)
+                self._loaded = True
+            return len(contacts)
+
+        service = self.contact_service.service
+        current = dict(service.folder().iter_ids(self.contact_service.folder_id))
+        changed = [id for id, change_key in current.items() if self._change_keys.get(id) != change_key]
+        contacts = [contact for contact in service.get_items(changed, batch_size=self.batch_size,
+                                                             max_workers=self.max_workers)
+                    if contact is not None]
+
+        with self._lock:
+            for id in [id for id in self._contacts if id not in current]:
+                self._remove(id)
+            for contact in contacts:
+                self._remove(contact.id)
+                self._add(contact)
+        return len(contacts)
+
+    def get(self, id):
+        return self._contacts.get(id)
+
+    def search(self, prefix, limit=None):
+        """ Returns the contacts whose display, first or last name starts with *prefix*, ignoring case. """
+        with self._lock:
+            return [self._contacts[id] for id in self._names.find(_normalize(prefix), limit)]
+
+    def by_email(self, email_address):
+        """ Returns the contact with this email address (in any of its three email fields), or None. """
+        with self._lock:
+            id = self._emails.get(_normalize(email_address))
+            return self._contacts.get(id)
+
+    def _names_of(self, contact):
+        return set(_normalize(getattr(contact, attribute)) for attribute in NAME_ATTRIBUTES
+                   if getattr(contact, attribute, None))
+
+    def _emails_of(self, contact):
+        return set(_normalize(getattr(contact, attribute)) for attribute in EMAIL_ATTRIBUTES
+                   if getattr(contact, attribute, None))
+
+    def _add(self, contact):
+        self._contacts[contact.id] = contact
+        self._change_keys[contact.id] = contact.change_key
+        for name in self._names_of(contact):
+            self._names.add(name, contact.id)
+        for email_address in self._emails_of(contact):
+            self._emails[email_address] = contact.id
+
+    def _remove(self, id):
+        contact = self._contacts.pop(id, None)
+        self._change_keys.pop(id, None)
+        if contact is None:
+            return
+        for name in self._names_of(contact):
+            self._names.remove(name, id)
+        for email_address in self._emails_of(contact):
+            if self._emails.get(email_address) == id:
+                del self._emails[email_address]
@@ -8,22 +8,32 @@ from __future__ import unicode_literals
 
 import logging
 from ..base.calendar import BaseExchangeCalendarEvent, BaseExchangeCalendarService, ExchangeEventOrganizer, \
-    ExchangeEventResponse, ExchangeExtendedProperty
+    ExchangeEventResponse, ExchangeEventOccurrence, ExchangeExtendedProperty
 from ..base.contacts import BaseExchangeContactService, BaseExchangeContactItem
 from ..base.rooms import BaseExchangeRoomService, BaseExchangeRoomItem
 from ..base.folder import BaseExchangeFolder, BaseExchangeFolderService
 from ..base.mail import BaseExchangeMailService, BaseExchangeMailItem
 from ..base.tasks import BaseExchangeTaskService, BaseExchangeTaskItem
-from ..base.soap import ExchangeServiceSOAP, S
+from ..base.soap import ExchangeServiceSOAP, SerializedRequest, S
+from ..cache import LRUCache
+from ..directory import ContactDirectory
+from ..freebusy import find_free_slots
+from ..hierarchy import FolderIndex
+from ..recurrence import expand_recurrence
 from ..exceptions import FailedExchangeException, ExchangeStaleChangeKeyException, ExchangeItemNotFoundException, ExchangeInternalServerTransientErrorException, ExchangeIrresolvableConflictException, InvalidEventType
 from ..compat import BASESTRING_TYPES
+from ..utils import chunks, run_concurrently, iter_concurrently, read_ahead as _read_ahead
 
-from . import soap_request
+from . import soap_request, soap_templates
+from .restrictions import IsEqualTo
 
 from lxml import etree
+from array import array
 from copy import deepcopy
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 from datetime import date
+from functools import partial
+import threading
 import warnings
 import email
 import six
@@ -34,13 +44,137 @@ log = logging.getLogger("pyexchange")
 NotificationSubscription = namedtuple('NotificationSubscription',
                                       'id watermark')
 
+UserAvailabilityError = namedtuple('UserAvailabilityError',
+                                   'attendees error')
+
+# Errors that mean the change key sent was out of date.
+STALE_CHANGE_KEY_ERRORS = (ExchangeStaleChangeKeyException, ExchangeIrresolvableConflictException)
+
+# The outcome of one item in a batched request. "xml" is the item's ResponseMessage, if Exchange sent one.
+ExchangeItemResult = namedtuple('ExchangeItemResult',
+                                'item id change_key response_code error xml')
+ExchangeItemResult.__new__.__defaults__ = (None,)
+
+# An item as listed by FolderService.iter_ids, without any of its properties.
+ExchangeItemId = namedtuple('ExchangeItemId', 'id change_key')
+
+# Where the id of the item each ResponseMessage is about lives, by operation.
+ITEM_RESULT_ID_PATHS = {
+    u'GetItem': u'm:Items/*/t:ItemId',
+    u'CreateItem': u'm:Items/*/t:ItemId',
+    u'UpdateItem': u'm:Items/*/t:ItemId',
+    u'MoveItem': u'm:Items/*/t:ItemId',
+    u'DeleteItem': None,
+    u'GetAttachment': u'm:Attachments/*/t:AttachmentId',
+    u'ConvertId': u'm:AlternateId',
+}
+
+# Properties FindItem doesn't return whatever the shape asks for; only GetItem has them.
+FIND_ITEM_UNAVAILABLE_FIELDS = frozenset([
+    u'item:Attachments', u'item:Body', u'item:MimeContent', u'item:UniqueBody',
+    u'message:ToRecipients', u'message:CcRecipients', u'message:BccRecipients',
+    u'calendar:RequiredAttendees', u'calendar:OptionalAttendees', u'calendar:Resources',
+])
+
+# Where a paged FindItem or FindFolder response says how far it got.
+_INCLUDES_LAST_ITEM_XPATH = etree.XPath(u'//m:RootFolder/@IncludesLastItemInRange', namespaces=soap_request.NAMESPACES)
+_TOTAL_ITEMS_XPATH = etree.XPath(u'//m:RootFolder/@TotalItemsInView', namespaces=soap_request.NAMESPACES)
+_PAGING_OFFSET_XPATH = etree.XPath(u'//m:RootFolder/@IndexedPagingOffset', namespaces=soap_request.NAMESPACES)
+
+# The ids in an IdOnly FindItem response, and the counts in a GetFolder one.
+_FOUND_ITEM_IDS_XPATH = etree.XPath(u'//m:RootFolder/t:Items/*/t:ItemId', namespaces=soap_request.NAMESPACES)
+_FOLDER_TOTAL_COUNT_XPATH = etree.XPath(u'//m:Folders/*/t:TotalCount/text()', namespaces=soap_request.NAMESPACES)
+_FOLDER_UNREAD_COUNT_XPATH = etree.XPath(u'//m:Folders/*/t:UnreadCount/text()', namespaces=soap_request.NAMESPACES)
+
+
+def _projected_format(fields, format=None):
+    """ The base shape to request: IdOnly plus *fields* if only some fields are wanted, else AllProperties. """
+    if format is not None:
+        return format
+    return u'IdOnly' if fields else u'AllProperties'
+
+
+def _parse_paging(xml_result):
+    """ Returns whether a paged response is the last page, how many items there are, and the next offset. """
+    total = _TOTAL_ITEMS_XPATH(xml_result)
+    return ("true" == _INCLUDES_LAST_ITEM_XPATH(xml_result)[0], int(total[0]) if total else None,
+            int(_PAGING_OFFSET_XPATH(xml_result)[0]))
+
+
+def _scan_pages(fetch_page, page_size, parallel=None, ordered=True, limit=None):
+    """
+    Yields the pages of a paged FindItem, as returned by ``fetch_page(offset, page_size)`` as a
+    ``(last_page, total, next_offset, page)`` tuple.
+
+    With *parallel* set, the first page says how many items there are, and the offsets of the other pages are
+    then fetched *parallel* at a time, yielded in order or (unless *ordered*) as they arrive. A page that comes
+    back short is followed by requests from the offset it reached, so nothing before the next page is missed.
+
+    With a *limit*, no more than that many items are asked for, so the first N of a sorted folder cost a
+    single request if N fits in a page.
+    """
+    if limit is not None:
+        if limit <= 0:
+            return
+        page_size = min(page_size, limit)
+    else:
+        limit = float('inf')
+
+    offset = 0
+    while True:
+        last_page, total, offset, page = fetch_page(offset, int(min(page_size, limit - offset)))
+        yield page
+
+        if last_page or offset >= limit:
+            return
+
+        if parallel and total is not None:
+            break
+
+    def fetch_range(start, size):
+        return start + size, fetch_page(start, size)
+
+    end = int(min(total, limit))
+    starts = list(range(offset, end, page_size))
+
+    # One window of pages at a time, so no more than *parallel* pages wait on the consumer.
+    for window in range(0, len(starts), parallel):
+        ranges = [(start, min(page_size, end - start)) for start in starts[window:window + parallel]]
+        for result, error in iter_concurrently(fetch_range, ranges, max_workers=parallel, ordered=ordered):
+            if error is not None:
+                raise error
+            range_end, (last_page, _, offset, page) = result
+            yield page
+
+            while not last_page and offset < range_end:
+                last_page, _, reached, page = fetch_page(offset, range_end - offset)
+                if reached <= offset:
+                    break
+                offset = reached
+                yield page
+
+
+# Maps the ASCII digits of a MergedFreeBusy string onto their values.
+_MERGED_FREE_BUSY_DIGITS = bytes(bytearray(i - ord('0') if ord('0') <= i <= ord('9') else i for i in range(256)))
+
 
 class Exchange2010Service(ExchangeServiceSOAP):
-    def __init__(self, connection, batch_size=1000, impersonate_sid=None):
-        super(Exchange2010Service, self).__init__(connection)
+
+    # The RequestServerVersion sent in every request header.
+    SERVER_VERSION = u'Exchange2010'
+
+    # How many id conversions convert_ids remembers.
+    CONVERTED_ID_CACHE_SIZE = 100000
+
+    def __init__(self, connection, batch_size=1000, impersonate_sid=None, item_cache=None, response_cache=None):
+        super(Exchange2010Service, self).__init__(connection, response_cache=response_cache)
         # The size of batches requested for paginated result sets.
         self.batch_size = batch_size
         self.impersonate_sid = impersonate_sid
+        # An optional pyexchange.cache.ItemCache for single item GetItem requests.
+        self.item_cache = item_cache
+        # Ids never change for a given pair of formats, so conversions are remembered.
+        self._converted_ids = LRUCache(max_size=self.CONVERTED_ID_CACHE_SIZE)
 
     def calendar(self, id="calendar"):
         return Exchange2010CalendarService(service=self, calendar_id=id)
@@ -71,6 +205,194 @@ class Exchange2010Service(ExchangeServiceSOAP):
         return response.xpath(u'//m:ConvertIdResponseMessage/m:AlternateId/@Id',
                               namespaces=soap_request.NAMESPACES)
 
+    def convert_ids(self, from_ids, destination_format, format='EwsId', mailbox='a@b.com', batch_size=100,
+                    max_workers=4):
+        """
+        Converts many ids from *format* to *destination_format*. ::
+
+            results = service.convert_ids(entry_ids, u'EwsId', format=u'EntryId')
+            ews_ids = [result.id for result in results]
+
+        Ids are sent ``batch_size`` at a time with up to ``max_workers`` requests in flight, and conversions
+        already made by this service are answered without asking Exchange again.
+
+        Returns one :class:`ExchangeItemResult` per id, in order: "item" is the id passed in, "id" the
+        converted one, and "error" is set if Exchange couldn't convert it.
+        """
+        from_ids = list(from_ids)
+        results = [None] * len(from_ids)
+
+        to_convert = OrderedDict()
+        for i, from_id in enumerate(from_ids):
+            converted = self._converted_ids.get((format, destination_format, mailbox, from_id))
+            if converted is not None:
+                results[i] = ExchangeItemResult(item=from_id, id=converted, change_key=None,
+                                                response_code=u'NoError', error=None)
+            else:
+                to_convert.setdefault(from_id, []).append(i)
+
+        converted_results = self._send_item_batches(
+            chunks(list(to_convert), batch_size or 100),
+            lambda batch: soap_request.convert_ids(batch, destination_format, format, mailbox),
+            max_workers=max_workers,
+        )
+
+        for result in converted_results:
+            if result.error is None and result.id is not None:
+                self._converted_ids.set((format, destination_format, mailbox, result.item), result.id)
+            for i in to_convert[result.item]:
+                results[i] = result
+
+        return results
+
+    def revalidate_cached_items(self, batch_size=100, max_workers=1):
+        """
+        Checks every item in the item cache against Exchange with batched IdOnly GetItem requests.
+
+        Items whose change key moved on, or that no longer exist, are dropped; the others count as fresh again.
+        """
+        if self.item_cache is None:
+            return
+
+        ids = self.item_cache.item_ids()
+        results = self._send_item_batches(
+            chunks(ids, batch_size), lambda batch: soap_templates.get_item(exchange_id=list(batch), format=u'IdOnly'),
+            max_workers=max_workers,
+        )
+        for result in results:
+            if result.error is not None:
+                self.item_cache.invalidate(result.item)
+            else:
+                self.item_cache.revalidate(result.item, result.change_key)
+
+    def send_items(self, body, items):
+        """
+        Sends a request about several items and returns one :class:`ExchangeItemResult` per item, in order,
+        instead of raising on the first item Exchange couldn't handle. ::
+
+            results = service.send_items(soap_request.get_item(ids), ids)
+            found = [result.xml for result in results if result.error is None]
+
+        *items* are whatever the request was built from, one per ResponseMessage; each result's "error" is
+        the exception its ResponseCode would have raised. Works for GetItem, CreateItem, UpdateItem,
+        DeleteItem, MoveItem, GetAttachment and ConvertId. A SOAP fault still raises.
+        """
+        operation = body.operation if isinstance(body, SerializedRequest) else etree.QName(body).localname
+        response_xml = self.send(body, check_for_errors=False)
+        self._check_for_SOAP_fault(response_xml)
+        return self._parse_item_results(response_xml, items, id_path=ITEM_RESULT_ID_PATHS.get(operation))
+
+    def get_item_results(self, ids, format=u'Default', additional_properties=None, batch_size=100, max_workers=1,
+                         fields=None):
+        """
+        Fetches *ids* in GetItem batches of *batch_size*, with up to *max_workers* in flight.
+
+        Returns one :class:`ExchangeItemResult` per id, in order. Ids that were deleted or can't be read get an
+        error rather than failing the batch; the others have the response message as "xml".
+        """
+        return self._send_item_batches(
+            chunks(list(ids), batch_size),
+            lambda batch: soap_templates.get_item(list(batch), format=format,
+                                                  additional_properties=additional_properties, fields=fields),
+            max_workers=max_workers,
+        )
+
+    def get_items(self, ids, format=None, batch_size=100, max_workers=4, fields=None):
+        """
+        Fetches items of any type at once. ::
+
+            for item in service.get_items(ids):
+                if isinstance(item, Exchange2010CalendarEvent):
+                    ...
+
+        Ids are sent in GetItem batches of *batch_size*, with up to *max_workers* in flight. Returns one object
+        per id, in order: an :class:`Exchange2010CalendarEvent`, :class:`Exchange2010MailItem`,
+        :class:`Exchange2010TaskItem` or :class:`Exchange2010ContactItem`, depending on what Exchange sent back.
+        Ids that couldn't be fetched, or that are some other kind of item, give None; use
+        :meth:`get_item_results` to find out why.
+
+        Items are fetched with AllProperties, or with IdOnly plus the FieldURIs in *fields* if given.
+        """
+        items = []
+        for result in self.get_item_results(ids, format=_projected_format(fields, format), batch_size=batch_size,
+                                            max_workers=max_workers, fields=fields):
+            item = None
+            if result.error is None:
+                item = self._item_from_xml(result.xml)
+            elif result.response_code is not None:
+                log.debug(u'Unable to get item %s: %s' % (result.item, result.response_code))
+            items.append(item)
+        return items
+
+    def _item_from_xml(self, message):
+        """ Loads the item in a GetItemResponseMessage into the class for its type. """
+        items_element = message.find(u'm:Items', namespaces=soap_request.NAMESPACES)
+        item_element = items_element[0] if items_element is not None and len(items_element) else None
+        if item_element is None:
+            return None
+
+        item_type = etree.QName(item_element).localname
+        if item_type == u'CalendarItem':
+            # Events are parsed with absolute paths, so they get a document of their own.
+            return Exchange2010CalendarEvent(service=self, xml=deepcopy(items_element))
+        elif item_type == u'Message':
+            return Exchange2010MailItem(service=self, xml=item_element)
+        elif item_type == u'Task':
+            return Exchange2010TaskItem(service=self, xml=item_element)
+        elif item_type == u'Contact':
+            return Exchange2010ContactItem(service=self, xml=item_element)
+
+        log.debug(u'Not loading item of type %s' % item_type)
+        return None
+
+    def get_attachment_results(self, attachment_ids, batch_size=100, max_workers=1):
+        """ Like :meth:`get_item_results`, for GetAttachment. """
+        return self._send_item_batches(
+            chunks(list(attachment_ids), batch_size),
+            lambda batch: soap_request.get_attachments(batch),
+            max_workers=max_workers,
+        )
+
+    def _get_item_xml(self, id, format=u'AllProperties', additional_properties=None, fields=None):
+        """ Sends GetItem for a single item, or answers it from the item cache when the item hasn't changed. """
+        body = soap_templates.get_item(exchange_id=id, format=format, additional_properties=additional_properties,
+                                       fields=fields)
+
+        if self.item_cache is None or isinstance(id, list):
+            return self.send(body)
+
+        if isinstance(additional_properties, list):
+            additional_properties = tuple(additional_properties)
+        shape = (format, additional_properties, tuple(fields or ()))
+
+        cached = self.item_cache.get(id, shape)
+        if cached is not None:
+            if self.item_cache.is_fresh(cached):
+                return cached.xml
+            if self.item_cache.revalidate(id, self._get_change_key(id)):
+                return cached.xml
+
+        response_xml = self.send(body)
+        id_element = response_xml.find(u'.//m:Items/*/t:ItemId', namespaces=soap_request.NAMESPACES)
+        if id_element is not None:
+            self.item_cache.set(id, id_element.get(u'ChangeKey'), response_xml, shape)
+
+        return response_xml
+
+    def _get_change_key(self, id):
+        try:
+            response_xml = self.send(soap_templates.get_item(exchange_id=id, format=u'IdOnly'))
+        except ExchangeItemNotFoundException:
+            self._invalidate_cached_items(id)
+            raise
+
+        id_element = response_xml.find(u'.//m:Items/*/t:ItemId', namespaces=soap_request.NAMESPACES)
+        return id_element.get(u'ChangeKey') if id_element is not None else None
+
+    def _invalidate_cached_items(self, ids):
+        if self.item_cache is not None:
+            self.item_cache.invalidate(ids)
+
     def _send_soap_request(self, body, headers=None, retries=2, timeout=30, encoding="utf-8"):
         headers = {
             "Accept": "text/xml",
@@ -81,7 +403,7 @@ class Exchange2010Service(ExchangeServiceSOAP):
     def _wrap_soap_xml_request(self, exchange_xml):
         header = S.Header(
             soap_request.T.RequestServerVersion(
-                Version="Exchange2010",
+                Version=self.SERVER_VERSION,
             ),
         )
         if self.impersonate_sid:
@@ -97,6 +419,9 @@ class Exchange2010Service(ExchangeServiceSOAP):
             S.Body(exchange_xml),
         )
 
+    def _envelope_key(self):
+        return self.SERVER_VERSION, self.impersonate_sid
+
     def _check_for_errors(self, xml_tree):
         super(Exchange2010Service, self)._check_for_errors(xml_tree)
         self._check_for_exchange_fault(xml_tree)
@@ -115,77 +440,511 @@ class Exchange2010Service(ExchangeServiceSOAP):
         # The full (massive) list of possible return responses is here.
         # http://msdn.microsoft.com/en-us/library/aa580757(v=exchg.140).aspx
         for code in response_codes:
-            if code.text == u"ErrorChangeKeyRequiredForWriteOperations":
-                # change key is missing or stale. we can fix that, so throw a special error
-                raise ExchangeStaleChangeKeyException(u"Exchange Fault (%s) from Exchange server" % code.text)
-            elif code.text == u"ErrorItemNotFound":
-                # exchange_invite_key wasn't found on the server
-                raise ExchangeItemNotFoundException(u"Exchange Fault (%s) from Exchange server" % code.text)
-            elif code.text == u"ErrorIrresolvableConflict":
-                # tried to update an item with an old change key
-                raise ExchangeIrresolvableConflictException(u"Exchange Fault (%s) from Exchange server" % code.text)
-            elif code.text == u"ErrorInternalServerTransientError":
-                # temporary internal server error. throw a special error so we can retry
-                raise ExchangeInternalServerTransientErrorException(u"Exchange Fault (%s) from Exchange server" % code.text)
-            elif code.text == u"ErrorCalendarOccurrenceIndexIsOutOfRecurrenceRange":
-                # just means some or all of the requested instances are out of range
-                pass
-            elif code.text != u"NoError":
-                raise FailedExchangeException(u"Exchange Fault (%s) from Exchange server" % code.text)
+            error = self._exception_for_response_code(code.text)
+            if error is not None:
+                raise error
+
+    def _exception_for_response_code(self, code):
+        """ Returns the exception a ResponseCode should raise, or None if it's not an error. """
+        if code == u"ErrorChangeKeyRequiredForWriteOperations":
+            # change key is missing or stale. we can fix that, so throw a special error
+            return ExchangeStaleChangeKeyException(u"Exchange Fault (%s) from Exchange server" % code)
+        elif code == u"ErrorItemNotFound":
+            # exchange_invite_key wasn't found on the server
+            return ExchangeItemNotFoundException(u"Exchange Fault (%s) from Exchange server" % code)
+        elif code == u"ErrorIrresolvableConflict":
+            # tried to update an item with an old change key
+            return ExchangeIrresolvableConflictException(u"Exchange Fault (%s) from Exchange server" % code)
+        elif code == u"ErrorInternalServerTransientError":
+            # temporary internal server error. throw a special error so we can retry
+            return ExchangeInternalServerTransientErrorException(u"Exchange Fault (%s) from Exchange server" % code)
+        elif code == u"ErrorCalendarOccurrenceIndexIsOutOfRecurrenceRange":
+            # just means some or all of the requested instances are out of range
+            return None
+        elif code != u"NoError":
+            return FailedExchangeException(u"Exchange Fault (%s) from Exchange server" % code)
+        return None
+
+    def _parse_item_results(self, xml_tree, items, id_path=u'm:Items/*/t:ItemId'):
+        """
+        Pairs each of *items* with its ResponseMessage from a batched request, in order.
+
+        Returns a list of :class:`ExchangeItemResult`, with the id and change key found at *id_path* (if any)
+        in each message. Items Exchange didn't answer for get a FailedExchangeException.
+        """
+        messages = xml_tree.xpath(u'//m:ResponseMessages/*', namespaces=soap_request.NAMESPACES)
+
+        results = []
+        for i, item in enumerate(items):
+            if i >= len(messages):
+                results.append(ExchangeItemResult(item=item, id=None, change_key=None, response_code=None,
+                                                  error=FailedExchangeException(u"Exchange server did not return a status response", None)))
+                continue
+
+            message = messages[i]
+            code = message.findtext(u'm:ResponseCode', namespaces=soap_request.NAMESPACES)
+            id_element = message.find(id_path, namespaces=soap_request.NAMESPACES) if id_path else None
+
+            results.append(ExchangeItemResult(
+                item=item,
+                id=id_element.get(u'Id') if id_element is not None else None,
+                change_key=id_element.get(u'ChangeKey') if id_element is not None else None,
+                response_code=code,
+                error=self._exception_for_response_code(code) if code is not None else
+                FailedExchangeException(u"Exchange server did not return a status response", None),
+                xml=message,
+            ))
+
+        return results
+
+    def _failed_item_results(self, items, error):
+        return [ExchangeItemResult(item=item, id=None, change_key=None, response_code=None, error=error) for item in items]
+
+    def _send_item_batches(self, batches, build_request, max_workers=1):
+        """
+        Sends ``build_request(batch)`` for each list of items in *batches* with :meth:`send_items`, with up to
+        *max_workers* in flight.
+
+        Returns one :class:`ExchangeItemResult` per item, in order. If a whole request fails, each of its items
+        gets that error.
+        """
+        def send(batch):
+            return self.send_items(build_request(batch), batch)
+
+        results = []
+        outcomes = run_concurrently(send, [(batch,) for batch in batches], max_workers=max_workers)
+        for batch, (batch_results, error) in zip(batches, outcomes):
+            if error is not None:
+                log.debug(u'Batched request failed for %s items: %s' % (len(batch), error))
+                batch_results = self._failed_item_results(batch, error)
+            results.extend(batch_results)
+
+        return results
 
 
 class Exchange2010CalendarService(BaseExchangeCalendarService):
+
+    # The most items sent in one batched request.
+    MAX_BATCH_SIZE = 100
+
+    VALID_UPDATE_OPERATION_TYPES = (
+        u'SendToNone', u'SendOnlyToAll', u'SendOnlyToChanged',
+        u'SendToAllAndSaveCopy', u'SendToChangedAndSaveCopy',
+    )
+
     def folders(self):
         return
 
     def event(self, id=None, **kwargs):
         return Exchange2010CalendarEvent(service=self.service, id=id, **kwargs)
 
-    def get_event(self, id, additional_properties=None):
-        return Exchange2010CalendarEvent(service=self.service, id=id, additional_properties=additional_properties)
+    def get_event(self, id, additional_properties=None, fields=None):
+        return Exchange2010CalendarEvent(service=self.service, id=id, additional_properties=additional_properties,
+                                         fields=fields)
 
     def new_event(self, **properties):
         return Exchange2010CalendarEvent(service=self.service, calendar_id=self.calendar_id, **properties)
 
-    def list_events(self, start=None, end=None, details=False, delegate_for=None, additional_properties=None):
+    def create_events(self, events, batch_size=100, max_workers=1):
+        """
+        Creates many events with as few CreateItem requests as possible. ::
+
+            events = [service.calendar().new_event(subject=u"Standup", start=start, end=end) for start, end in times]
+            for result in service.calendar().create_events(events):
+              if result.error:
+                print(result.item.subject, result.response_code)
+
+        Events are sent ``batch_size`` at a time, grouped by calendar_id, with up to ``max_workers`` requests in
+        flight. Each created event gets its id and change key, just like :meth:`Exchange2010CalendarEvent.create`.
+
+        Returns one :class:`ExchangeItemResult` per event, in order. An event Exchange rejected has the
+        exception its ResponseCode maps to in "error"; an event that doesn't validate, or whose whole request
+        failed, has that error instead. Nothing is raised for individual events.
+        """
+        events = list(events)
+        results = [None] * len(events)
+
+        by_calendar = OrderedDict()
+        for i, event in enumerate(events):
+            try:
+                event.validate()
+            except ValueError as err:
+                results[i] = ExchangeItemResult(item=event, id=None, change_key=None, response_code=None, error=err)
+                continue
+            by_calendar.setdefault(event.calendar_id, []).append(i)
+
+        indexes = []
+        batches = []
+        for calendar_indexes in by_calendar.values():
+            for batch in chunks(calendar_indexes, batch_size or self.MAX_BATCH_SIZE):
+                indexes.extend(batch)
+                batches.append([events[i] for i in batch])
+
+        created = self.service._send_item_batches(
+            batches, lambda batch: soap_request.new_events(batch, calendar_id=batch[0].calendar_id),
+            max_workers=max_workers,
+        )
+
+        for i, result in zip(indexes, created):
+            if result.error is None:
+                result.item._id, result.item._change_key = result.id, result.change_key
+            results[i] = result
+
+        return results
+
+    def update_events(self, events, calendar_item_update_operation_type=u'SendToAllAndSaveCopy', batch_size=100,
+                      max_workers=1, retry_stale=True):
+        """
+        Saves the changes to many events with as few UpdateItem requests as possible. ::
+
+            for event in events:
+              event.location = u'Room 2'
+            results = service.calendar().update_events(events)
+
+        Unlike :meth:`Exchange2010CalendarEvent.update`, the change keys the events already have are used as is.
+        If Exchange says one is out of date and *retry_stale* is set, the change keys of just those events are
+        refreshed with one GetItem and their changes are sent again.
+
+        Returns one :class:`ExchangeItemResult` per event, in order. Updated events get their new change key
+        and forget their changes. Events without changes aren't sent and get a result without a response_code.
+        """
+        if calendar_item_update_operation_type not in self.VALID_UPDATE_OPERATION_TYPES:
+            raise ValueError('calendar_item_update_operation_type has unknown value')
+
+        def build_request(batch):
+            return soap_request.update_items([(event, event._dirty_attributes) for event in batch],
+                                             calendar_item_update_operation_type)
+
+        def check(event):
+            event.validate()
+            return bool(event._dirty_attributes)
+
+        results = self._bulk_event_operation(events, build_request, batch_size, max_workers, retry_stale, check=check)
+
+        for result in results:
+            if result.response_code is not None and result.error is None:
+                result.item._change_key = result.change_key or result.item._change_key
+                result.item._reset_dirty_attributes()
+
+        return results
+
+    def cancel_events(self, events, batch_size=100, max_workers=1, retry_stale=True):
+        """
+        Cancels many events with as few DeleteItem requests as possible, notifying their attendees. ::
+
+            results = service.calendar().cancel_events(events)
+
+        Returns one :class:`ExchangeItemResult` per event, in order. See :meth:`update_events` for *retry_stale*.
+        """
+        return self._bulk_event_operation(events, soap_request.delete_events, batch_size, max_workers, retry_stale)
+
+    def move_events(self, events, folder_id, batch_size=100, max_workers=1, retry_stale=True):
+        """
+        Moves many events to the calendar *folder_id* with as few MoveItem requests as possible. ::
+
+            results = service.calendar().move_events(events, folder_id='NEW CALENDAR KEY HERE')
+
+        Moved events get their new id and change key. Returns one :class:`ExchangeItemResult` per event, in
+        order. See :meth:`update_events` for *retry_stale*.
+        """
+        if not folder_id or not isinstance(folder_id, BASESTRING_TYPES):
+            raise TypeError(u"folder_id must be a string")
+
+        results = self._bulk_event_operation(events, lambda batch: soap_request.move_events(batch, folder_id),
+                                             batch_size, max_workers, retry_stale)
+
+        for result in results:
+            if result.error is None and result.id:
+                result.item._id, result.item._change_key = result.id, result.change_key
+                result.item.calendar_id = folder_id
+
+        return results
+
+    def _bulk_event_operation(self, events, build_request, batch_size, max_workers, retry_stale, check=None):
+        events = list(events)
+        results = [None] * len(events)
+
+        to_send = []
+        for i, event in enumerate(events):
+            try:
+                if not event.id:
+                    raise TypeError(u"This event hasn't been created yet.")
+                if check is not None and not check(event):
+                    results[i] = ExchangeItemResult(item=event, id=event.id, change_key=event.change_key,
+                                                    response_code=None, error=None)
+                    continue
+            except (TypeError, ValueError) as err:
+                results[i] = ExchangeItemResult(item=event, id=None, change_key=None, response_code=None, error=err)
+                continue
+            to_send.append(i)
+
+        def send(indexes):
+            self.service._invalidate_cached_items([events[i].id for i in indexes])
+            batches = chunks([events[i] for i in indexes], batch_size or self.MAX_BATCH_SIZE)
+            for i, result in zip(indexes, self.service._send_item_batches(batches, build_request, max_workers=max_workers)):
+                results[i] = result
+
+        send(to_send)
+
+        if retry_stale:
+            stale = [i for i in to_send if isinstance(results[i].error, STALE_CHANGE_KEY_ERRORS)]
+            if stale:
+                refreshed = self._refresh_change_keys([events[i] for i in stale], batch_size, max_workers)
+                for i, result in zip(stale, refreshed):
+                    if result.error is not None:
+                        results[i] = result
+                send([i for i, result in zip(stale, refreshed) if result.error is None])
+
+        return results
+
+    def _refresh_change_keys(self, events, batch_size=100, max_workers=1):
+        """ Fetches the current change keys of *events* with batched IdOnly GetItem requests. """
+        batches = chunks(events, batch_size or self.MAX_BATCH_SIZE)
+        results = self.service._send_item_batches(
+            batches, lambda batch: soap_templates.get_item(exchange_id=[event.id for event in batch], format=u'IdOnly'),
+            max_workers=max_workers,
+        )
+
+        for result in results:
+            if result.error is None:
+                result.item._change_key = result.change_key
+
+        return results
+
+    def list_events(self, start=None, end=None, details=False, delegate_for=None, additional_properties=None,
+                    fields=None):
         return Exchange2010CalendarEventList(service=self.service, calendar_id=self.calendar_id, start=start, end=end,
                                              details=details, delegate_for=delegate_for,
-                                             additional_properties=additional_properties)
+                                             additional_properties=additional_properties, fields=fields)
 
     def sync_events(self, delegate_for=None, sync_state=None):
         return Exchange2010SyncCalendarEventList(service=self.service, calendar_id=self.calendar_id,
                                                  delegate_for=delegate_for, sync_state=sync_state)
 
-    def get_user_availability(self, attendees, start, end):
-        return Exchange2010UserAvailabilityList(self.service, attendees, start, end)
+    def update_queue(self, flush_interval=5.0, max_pending=100, **update_options):
+        """
+        Returns a write-behind queue that collects event changes and saves them with :meth:`update_events`. ::
+
+            with service.calendar().update_queue() as queue:
+              event.location = u'Room 2'
+              queue.add(event)
+
+        See :class:`Exchange2010CalendarUpdateQueue`.
+        """
+        return Exchange2010CalendarUpdateQueue(self, flush_interval=flush_interval, max_pending=max_pending,
+                                               **update_options)
+
+    def get_user_availability(self, attendees, start, end, batch_size=100, max_workers=4,
+                              requested_view=u'FreeBusy', merged_free_busy_interval=30, partial_results=False):
+        return Exchange2010UserAvailabilityList(self.service, attendees, start, end,
+                                                batch_size=batch_size, max_workers=max_workers,
+                                                requested_view=requested_view,
+                                                merged_free_busy_interval=merged_free_busy_interval,
+                                                partial_results=partial_results)
+
+
+class Exchange2010CalendarUpdateQueue(object):
+    """
+    Collects changed events and saves them in batched UpdateItem requests, instead of one request per change.
+
+    Changes to an event that's already queued are merged, so an event changed several times is only sent once.
+    The queue is flushed ``flush_interval`` seconds after the first change is added, as soon as
+    ``max_pending`` events are waiting, or when :meth:`flush` is called. Other keyword arguments are passed
+    to :meth:`Exchange2010CalendarService.update_events`.
+
+    Timed flushes happen on a background thread; their results are passed to ``on_flush`` if it's given.
+    Don't change a queued event while it's being flushed.
+    """
+
+    def __init__(self, calendar, flush_interval=5.0, max_pending=100, on_flush=None, **update_options):
+        self.calendar = calendar
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.on_flush = on_flush
+        self.update_options = update_options
+
+        self._pending = OrderedDict()  # event id -> event
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(self, event):
+        """ Queues the changes made to *event*. Events without changes are ignored. """
+        if not event.id:
+            raise TypeError(u"You can't update an event that hasn't been created yet.")
+
+        if not event._dirty_attributes:
+            return
+
+        with self._lock:
+            queued = self._pending.get(event.id)
+            if queued is not None and queued is not event:
+                # A different copy of the same event: carry over the changes only the queued copy has.
+                for attribute in queued._dirty_attributes - event._dirty_attributes:
+                    setattr(event, attribute, getattr(queued, attribute))
+                event._change_key = event._change_key or queued._change_key
+
+            self._pending[event.id] = event
+            full = self.max_pending and len(self._pending) >= self.max_pending
+
+            if not full and self._timer is None and self.flush_interval is not None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        """ Saves every queued event now. Returns the :class:`ExchangeItemResult` for each of them. """
+        with self._lock:
+            events = list(self._pending.values())
+            self._pending.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not events:
+            return []
+
+        results = self.calendar.update_events(events, **self.update_options)
+
+        if self.on_flush is not None:
+            self.on_flush(results)
+
+        return results
+
+    def close(self):
+        """ Stops the timer and saves anything still queued. """
+        return self.flush()
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception as err:
+            log.error(u'Flushing queued event updates failed: %s' % err)
 
 
 class Exchange2010UserAvailabilityList(object):
-    def __init__(self, service, attendees, start, end):
+    """
+    Looks up free/busy information for a list of attendees and stores it in each attendee's "busy" key.
+
+    Exchange caps the number of mailboxes in a single GetUserAvailability request, so the attendees are sent
+    in chunks of at most ``batch_size``, with up to ``max_workers`` chunks in flight at once. Results are
+    merged back in attendee order. If a whole chunk fails, the failure is raised, unless ``partial_results``
+    is set: then its attendees get ``busy = None`` and the failure is recorded in "self.errors". If Exchange
+    rejects a single mailbox, that attendee gets ``busy = None`` and an "error" key holding the response code.
+
+    With one of the merged views (``requested_view=u'MergedOnly'`` is the smallest), each attendee also gets
+    a "merged_free_busy" key: an ``array('B')`` with one FREE_BUSY_* value per ``merged_free_busy_interval``
+    minutes, starting at ``start``. ``MergedOnly`` doesn't return individual events, so "busy" isn't set.
+    """
+
+    # The most mailboxes Exchange accepts in one GetUserAvailability request.
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, service, attendees, start, end, batch_size=MAX_BATCH_SIZE, max_workers=4,
+                 requested_view=u'FreeBusy', merged_free_busy_interval=30, partial_results=False):
+        if requested_view not in soap_request.FREE_BUSY_VIEWS:
+            raise ValueError(u'requested_view must be one of %s' % u', '.join(soap_request.FREE_BUSY_VIEWS))
+
         self.service = service
         self.attendees = attendees
-        body = soap_request.get_user_availability(attendees or [], start, end)
+        self.start = start
+        self.end = end
+        self.requested_view = requested_view
+        self.merged_free_busy_interval = merged_free_busy_interval
+        self.errors = []
+
+        batch_size = min(batch_size or self.MAX_BATCH_SIZE, self.MAX_BATCH_SIZE)
+        batches = chunks(attendees or [], batch_size)
+
+        results = run_concurrently(self._send_batch, [(batch, start, end) for batch in batches],
+                                   max_workers=max_workers)
+
+        for batch, (response_xml, error) in zip(batches, results):
+            if error is not None:
+                if not partial_results:
+                    raise error
+                log.debug(u'GetUserAvailability failed for %s attendees: %s' % (len(batch), error))
+                for attendee in batch:
+                    attendee['busy'] = None
+                self.errors.append(UserAvailabilityError(attendees=batch, error=error))
+            else:
+                self._parse_response_for_results(response_xml, batch)
+
+    def find_free_slots(self, duration, **kwargs):
+        """
+        Ranks the times in this window when a meeting of length *duration* fits everyone's calendar. ::
+
+            availability = service.calendar().get_user_availability(attendees, start, end)
+            for slot in availability.find_free_slots(timedelta(minutes=30), limit=5):
+                print(slot.start, slot.optional_conflicts)
+
+        Attendees with ``required=False`` only lower a slot's rank. See :func:`pyexchange.freebusy.find_free_slots`
+        for the other options.
+        """
+        kwargs.setdefault('merged_free_busy_interval', self.merged_free_busy_interval)
+        return find_free_slots(self.attendees or [], self.start, self.end, duration, **kwargs)
 
+    def _send_batch(self, attendees, start, end):
+        body = soap_templates.get_user_availability(attendees, start, end, requested_view=self.requested_view,
+                                                    merged_free_busy_interval=self.merged_free_busy_interval)
         response_xml = self.service.send(body, check_for_errors=False)
+        self.service._check_for_SOAP_fault(response_xml)
+        return response_xml
 
-        self._parse_response_for_results(response_xml)
+    def _parse_response_for_results(self, response, attendees=None):
+        if attendees is None:
+            attendees = self.attendees
 
-    def _parse_response_for_results(self, response):
-        for i, free_busy_view in enumerate(response.xpath(
-                '//m:GetUserAvailabilityResponse/m:FreeBusyResponseArray/m:FreeBusyResponse/m:FreeBusyView',
+        for i, free_busy_response in enumerate(response.xpath(
+                '//m:GetUserAvailabilityResponse/m:FreeBusyResponseArray/m:FreeBusyResponse',
                 namespaces=soap_request.NAMESPACES)):
 
-            self.attendees[i]['busy'] = []
+            if i >= len(attendees):
+                break
+
+            response_code = free_busy_response.findtext('m:ResponseMessage/m:ResponseCode',
+                                                        namespaces=soap_request.NAMESPACES)
+            free_busy_view = free_busy_response.find('m:FreeBusyView', namespaces=soap_request.NAMESPACES)
+
+            if (response_code is not None and response_code != u'NoError') or free_busy_view is None:
+                attendees[i]['busy'] = None
+                attendees[i]['error'] = response_code
+                continue
+
+            merged_free_busy = free_busy_view.findtext('t:MergedFreeBusy', namespaces=soap_request.NAMESPACES)
+            if merged_free_busy is not None:
+                attendees[i]['merged_free_busy'] = self._parse_merged_free_busy(merged_free_busy)
+
+            if self.requested_view == u'MergedOnly':
+                continue
+
+            attendees[i]['busy'] = []
 
             for calendar_event in free_busy_view.xpath('t:CalendarEventArray/t:CalendarEvent',
                                                        namespaces=soap_request.NAMESPACES):
 
-                self.attendees[i]['busy'].append(dict(
+                attendees[i]['busy'].append(dict(
                     start_time=calendar_event.findtext('t:StartTime', namespaces=soap_request.NAMESPACES),
                     end_time=calendar_event.findtext('t:EndTime', namespaces=soap_request.NAMESPACES),
                     busy_type=calendar_event.findtext('t:BusyType', namespaces=soap_request.NAMESPACES),
                 ))
 
+    def _parse_merged_free_busy(self, merged_free_busy):
+        # Each character is a single digit, so translating the ASCII bytes gives the values directly.
+        return array('B', merged_free_busy.strip().encode('ascii').translate(_MERGED_FREE_BUSY_DIGITS))
+
 
 class Exchange2010SyncCalendarEventList(object):
     def __init__(self, service=None, calendar_id='calendar', delegate_for=None, sync_state=None):
@@ -197,7 +956,7 @@ class Exchange2010SyncCalendarEventList(object):
         self.deleted = []
         self.last_sync_state = None
 
-        body = soap_request.sync_calendar_items(
+        body = soap_templates.sync_calendar_items(
             calendar_id=calendar_id, delegate_for=delegate_for, sync_state=sync_state
         )
 
@@ -228,16 +987,21 @@ class Exchange2010SyncCalendarEventList(object):
         for delete in changes.xpath('//t:Delete/t:ItemId/@Id', namespaces=soap_request.NAMESPACES):
             self.deleted.append(delete)
 
+        self.service._invalidate_cached_items([event.id for event in self.updated] + self.deleted)
+
         return self
 
 
 class Exchange2010CalendarEventList(object):
     """
     Creates & Stores a list of Exchange2010CalendarEvent items in the "self.events" variable.
+
+    If *fields* (FieldURIs such as u'calendar:Start') are given, only those are fetched, both for the list and
+    for the details.
     """
 
     def __init__(self, service=None, calendar_id=u'calendar', start=None, end=None, details=False, delegate_for=None,
-                 additional_properties=None):
+                 additional_properties=None, fields=None):
         self.service = service
         self.count = 0
         self.start = start
@@ -246,14 +1010,15 @@ class Exchange2010CalendarEventList(object):
         self.event_ids = list()
         self.details = details
         self.delegate_for = delegate_for
+        self.fields = fields
         self.total_items_in_view = None
         self.contains_all_items = None
 
         # This request uses a Calendar-specific query between two dates.
         body = soap_request.get_calendar_items(
-            format=u'AllProperties', calendar_id=calendar_id,
+            format=_projected_format(fields), calendar_id=calendar_id,
             start=self.start, end=self.end, delegate_for=self.delegate_for,
-            max_entries=1000, additional_properties=additional_properties
+            max_entries=1000, additional_properties=additional_properties, fields=fields
         )
         response_xml = self.service.send(body)
         self._parse_response_for_all_events(response_xml)
@@ -316,7 +1081,8 @@ class Exchange2010CalendarEventList(object):
 
             # Send the SOAP request with the list of exchange ID values.
             log.debug(u"Requesting all event details for events: {event_list}".format(event_list=str(self.event_ids)))
-            body = soap_request.get_item(exchange_id=self.event_ids, format=u'AllProperties')
+            body = soap_templates.get_item(exchange_id=self.event_ids, format=_projected_format(self.fields),
+                                           fields=self.fields)
             response_xml = self.service.send(body)
 
             # Re-parse the results for all the details!
@@ -327,11 +1093,10 @@ class Exchange2010CalendarEventList(object):
 
 class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
 
-    def _init_from_service(self, id, additional_properties=None):
+    def _init_from_service(self, id, additional_properties=None, fields=None):
         log.debug(u'Creating new Exchange2010CalendarEvent object from ID')
-        body = soap_request.get_item(exchange_id=id, format=u'AllProperties',
-                                     additional_properties=additional_properties)
-        response_xml = self.service.send(body)
+        response_xml = self.service._get_item_xml(id, format=_projected_format(fields),
+                                                  additional_properties=additional_properties, fields=fields)
         properties = self._parse_response_for_get_event(response_xml)
 
         self._update_properties(properties)
@@ -466,11 +1231,7 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
             if kwargs['send_only_to_changed_attendees']:
                 calendar_item_update_operation_type = u'SendToChangedAndSaveCopy'
 
-        VALID_UPDATE_OPERATION_TYPES = (
-            u'SendToNone', u'SendOnlyToAll', u'SendOnlyToChanged',
-            u'SendToAllAndSaveCopy', u'SendToChangedAndSaveCopy',
-        )
-        if calendar_item_update_operation_type not in VALID_UPDATE_OPERATION_TYPES:
+        if calendar_item_update_operation_type not in Exchange2010CalendarService.VALID_UPDATE_OPERATION_TYPES:
             raise ValueError('calendar_item_update_operation_type has unknown value')
 
         self.validate()
@@ -481,6 +1242,7 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
 
             body = soap_request.update_item(self, self._dirty_attributes, calendar_item_update_operation_type=calendar_item_update_operation_type)
             self.service.send(body)
+            self.service._invalidate_cached_items(self._id)
             self._reset_dirty_attributes()
         else:
             log.info(u"Update was called, but there's nothing to update. Doing nothing.")
@@ -501,6 +1263,7 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
 
         self.refresh_change_key()
         self.service.send(soap_request.delete_event(self))
+        self.service._invalidate_cached_items(self._id)
         # TODO rsanders high - check return status to make sure it was actually sent
         return None
 
@@ -523,6 +1286,7 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
 
         self.refresh_change_key()
         response_xml = self.service.send(soap_request.move_event(self, folder_id))
+        self.service._invalidate_cached_items(self._id)
         new_id, new_change_key = self._parse_id_and_change_key_from_response(response_xml)
         if not new_id:
             raise ValueError(u"MoveItem returned success but requested item not moved")
@@ -532,9 +1296,10 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
         self.calendar_id = folder_id
         return self
 
-    def get_master(self):
+    def get_master(self, fields=None):
         """
           get_master()
+          :param list fields:  Only fetch these FieldURIs (e.g. u'item:Subject') on top of the id.
           :raises InvalidEventType: When this method is called on an event that is not a Occurrence type.
 
           This will return the master event to the occurrence.
@@ -553,15 +1318,16 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
         if self.type not in ['Occurrence', 'Exception']:
             raise InvalidEventType("get_master method can only be called on a 'Occurrence' or 'Exception' event type, '{}' received".format(self.type))
 
-        body = soap_request.get_master(exchange_id=self._id, format=u"AllProperties")
+        body = soap_request.get_master(exchange_id=self._id, format=_projected_format(fields), fields=fields)
         response_xml = self.service.send(body)
 
         return Exchange2010CalendarEvent(service=self.service, xml=response_xml)
 
-    def get_occurrence(self, instance_index):
+    def get_occurrence(self, instance_index, fields=None):
         """
           get_occurrence(instance_index)
           :param iterable instance_index: This should be tuple or list of integers which correspond to occurrences.
+          :param list fields:  Only fetch these FieldURIs (e.g. u'item:Subject') on top of the ids.
           :raises TypeError: When instance_index is not an iterable of ints.
           :raises InvalidEventType: When this method is called on an event that is not a RecurringMaster type.
 
@@ -585,7 +1351,8 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
         if self.type != 'RecurringMaster':
             raise InvalidEventType("get_occurrance method can only be called on a 'RecurringMaster' event type")
 
-        body = soap_request.get_occurrence(exchange_id=self._id, instance_index=instance_index, format=u"AllProperties")
+        body = soap_request.get_occurrence(exchange_id=self._id, instance_index=instance_index,
+                                           format=_projected_format(fields), fields=fields)
         response_xml = self.service.send(body)
 
         items = response_xml.xpath(u'//m:GetItemResponseMessage/m:Items', namespaces=soap_request.NAMESPACES)
@@ -597,9 +1364,45 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
 
         return events
 
-    def conflicting_events(self):
+    def expand_occurrences(self, start, end, timezone):
+        """
+          expand_occurrences(start, end, timezone)
+          :raises InvalidEventType: When this method is called on an event that is not a RecurringMaster type.
+
+          This will return the occurrences of a recurring master between start and end as a list of
+          :class:`ExchangeEventOccurrence` objects, without asking Exchange for each of them. Modified occurrences
+          keep their own id and times and cancelled ones are left out.
+
+          timezone is the meeting's time zone (a tzinfo, such as one from pytz). The days of the series are
+          worked out in it, so a weekly meeting stays on its weekday whatever the UTC date, and occurrences keep
+          the wall clock time of the master in it across daylight saving time changes.
+
+          **Examples**::
+
+            master = service.calendar().get_event(id='<event_id>')
+
+            for occurrence in master.expand_occurrences(start, end, pytz.timezone('America/Los_Angeles')):
+              print(occurrence.start)
+
+        """
+
+        if self.type != 'RecurringMaster':
+            raise InvalidEventType("expand_occurrences method can only be called on a 'RecurringMaster' event type")
+
+        return expand_recurrence(
+            self.start, self.end, self.recurrence, start, end, timezone,
+            interval=self.recurrence_interval,
+            days=self.recurrence_days,
+            end_date=self.recurrence_end_date,
+            count=self._recurrence_count,
+            modified_occurrences=self.modified_occurrences,
+            deleted_occurrences=self.deleted_occurrences,
+        )
+
+    def conflicting_events(self, fields=None):
         """
           conflicting_events()
+          :param list fields:  Only fetch these FieldURIs (e.g. u'item:Subject') on top of the ids.
 
           This will return a list of conflicting events.
 
@@ -614,7 +1417,8 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
         if not self.conflicting_event_ids:
             return []
 
-        body = soap_request.get_item(exchange_id=self.conflicting_event_ids, format="AllProperties")
+        body = soap_templates.get_item(exchange_id=self.conflicting_event_ids, format=_projected_format(fields),
+                                       fields=fields)
         response_xml = self.service.send(body)
 
         items = response_xml.xpath(u'//m:GetItemResponseMessage/m:Items', namespaces=soap_request.NAMESPACES)
@@ -628,10 +1432,13 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
 
     def refresh_change_key(self):
 
-        body = soap_request.get_item(exchange_id=self._id, format=u"IdOnly")
+        body = soap_templates.get_item(exchange_id=self._id, format=u"IdOnly")
         response_xml = self.service.send(body)
         self._id, self._change_key = self._parse_id_and_change_key_from_response(response_xml)
 
+        if self.service.item_cache is not None:
+            self.service.item_cache.revalidate(self._id, self._change_key)
+
         return self
 
     def _parse_id_and_change_key_from_response(self, response):
@@ -661,6 +1468,8 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
 
         result['_conflicting_event_ids'] = self._parse_event_conflicts(response)
 
+        result['_modified_occurrences'], result['_deleted_occurrences'] = self._parse_event_occurrences(response)
+
         self.xml = response
 
         return result
@@ -737,7 +1546,11 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
             },
             u'recurrence_days': {
                 u'xpath': u'//m:Items/t:CalendarItem/t:Recurrence/t:WeeklyRecurrence/t:DaysOfWeek',
-            }
+            },
+            u'_recurrence_count': {
+                u'xpath': u'//m:Items/t:CalendarItem/t:Recurrence/t:NumberedRecurrence/t:NumberOfOccurrences',
+                u'cast': u'int',
+            },
         }
 
         result = self.service._xpath_to_dict(element=response, property_map=property_map, namespace_map=soap_request.NAMESPACES)
@@ -878,6 +1691,21 @@ class Exchange2010CalendarEvent(BaseExchangeCalendarEvent):
         conflicting_ids = response.xpath(u'//m:Items/t:CalendarItem/t:ConflictingMeetings/t:CalendarItem/t:ItemId', namespaces=soap_request.NAMESPACES)
         return [id_element.get(u"Id") for id_element in conflicting_ids]
 
+    def _parse_event_occurrences(self, response):
+        modified = []
+        for occurrence in response.xpath(u'//m:Items/t:CalendarItem/t:ModifiedOccurrences/t:Occurrence', namespaces=soap_request.NAMESPACES):
+            id_element = occurrence.find(u't:ItemId', namespaces=soap_request.NAMESPACES)
+            modified.append(ExchangeEventOccurrence(
+                id=id_element.get(u'Id') if id_element is not None else None,
+                start=self.service._parse_date(occurrence.findtext(u't:Start', namespaces=soap_request.NAMESPACES)),
+                end=self.service._parse_date(occurrence.findtext(u't:End', namespaces=soap_request.NAMESPACES)),
+                original_start=self.service._parse_date(occurrence.findtext(u't:OriginalStart', namespaces=soap_request.NAMESPACES)),
+            ))
+
+        deleted_starts = response.xpath(u'//m:Items/t:CalendarItem/t:DeletedOccurrences/t:DeletedOccurrence/t:Start/text()', namespaces=soap_request.NAMESPACES)
+
+        return modified, [self.service._parse_date(start) for start in deleted_starts]
+
 
 class Exchange2010FolderService(BaseExchangeFolderService):
 
@@ -921,10 +1749,56 @@ class Exchange2010FolderService(BaseExchangeFolderService):
 
         return Exchange2010Folder(service=self.service, **properties)
 
-    def find_folder(self, parent_id, traversal='Shallow'):
+    def sync_folders(self, folder_id=None, sync_state=None, fields=None):
+        """
+          sync_folders(folder_id=None, sync_state=None)
+          :param str folder_id:  The folder to sync the subfolders of; the whole mailbox by default.
+          :param str sync_state:  The last_sync_state of the previous sync, if there was one.
+          :param list fields:  Only fetch these FieldURIs (e.g. u'folder:DisplayName') of the
+            created and updated folders.
+
+          Returns the folders created, updated and deleted since the sync that handed out
+          *sync_state*, or every folder as created without one. Keep its last_sync_state for the
+          next call.
+
+          **Examples**::
+
+            changes = service.folder().sync_folders(sync_state=saved_state)
+            for folder in changes.created + changes.updated:
+              print(folder.display_name)
+            for folder_id in changes.deleted:
+              print(folder_id)
+            saved_state = changes.last_sync_state
+        """
+        return Exchange2010SyncFolderHierarchy(service=self.service, folder_id=folder_id, sync_state=sync_state,
+                                               fields=fields)
+
+    def index(self, root=u'msgfolderroot', ttl=None):
+        """
+          index(root='msgfolderroot', ttl=None)
+          :param str root:  The folder to index the subfolders of.
+          :param int ttl:  How many seconds the index is used before it is loaded again.
+
+          Returns a FolderIndex of every folder under *root*, for resolving folder paths such as
+          u'Inbox/Projects/X' to ids and back without going to Exchange each time.
+
+          **Examples**::
+
+            folders = service.folder().index(ttl=300)
+            for folder in folders.children(folders.resolve(u'Inbox')):
+              print(folder.display_name)
+        """
+        return FolderIndex(self, root=root, ttl=ttl)
+
+    def find_folder(self, parent_id, traversal='Shallow', read_ahead=0, fields=None, use_cache=True):
         """
           find_folder(parent_id)
           :param str parent_id:  The parent folder to list.
+          :param int read_ahead:  How many pages to fetch in the background
+            while the caller works through the current one.
+          :param list fields:  Only fetch these FieldURIs (e.g. u'folder:DisplayName')
+            on top of the folder ids.
+          :param bool use_cache:  Allow answers from the service's response cache.
 
           This method will return a generator of sub-folders to a given
           parent folder.
@@ -941,41 +1815,144 @@ class Exchange2010FolderService(BaseExchangeFolderService):
             for folder in folders:
               folder.delete()
         """
+        for batch in _read_ahead(self._find_folder_pages(parent_id, traversal, fields, use_cache), read_ahead):
+            for f in batch:
+                yield f
+
+    def _find_folder_pages(self, parent_id, traversal, fields=None, use_cache=True):
         offset = 0
         last_batch = False
 
         while not last_batch:
             body = soap_request.find_folder(
-                parent_id=parent_id, format=u'AllProperties',
+                parent_id=parent_id, format=_projected_format(fields),
                 traversal=traversal, limit=self.service.batch_size,
-                offset=offset,
+                offset=offset, fields=fields,
             )
-            xml_result = self.service.send(body)
-            last_batch = "true" == xml_result.xpath(
-                '//m:RootFolder/@IncludesLastItemInRange',
-                namespaces=soap_request.NAMESPACES,
-            )[0]
-            offset = int(xml_result.xpath(
-                '//m:RootFolder/@IndexedPagingOffset',
-                namespaces=soap_request.NAMESPACES,
-            )[0])
-            batch = self._parse_response_for_find_folder(xml_result)
-            for f in batch:
-                yield f
+            xml_result = self.service.send(body, use_cache=use_cache)
+            last_batch, _, offset = _parse_paging(xml_result)
+            yield self._parse_response_for_find_folder(xml_result)
+
+    def iter_ids(self, folder_id, restriction=None, order_by=None, read_ahead=0):
+        """
+          iter_ids(folder_id)
+          :param str folder_id:  The folder to list.
+          :param Restriction restriction:  Only list the items matching this.
+          :param list order_by:  FieldURIs to sort on, prefixed with a minus sign for descending order.
+          :param int read_ahead:  How many pages to fetch in the background
+            while the caller works through the current one.
+
+          Yields the id and change key of every item in a folder, as ExchangeItemId tuples. Only the ids
+          are asked for and no item objects are built, which makes this the cheap way to compare a
+          folder with a local copy.
+
+          **Examples**::
+
+            known = dict(service.folder().iter_ids(u'inbox'))
+        """
+        pages = _scan_pages(partial(self._fetch_id_page, folder_id, restriction, order_by), self.service.batch_size)
+        for batch in _read_ahead(pages, read_ahead):
+            for item_id in batch:
+                yield item_id
+
+    def _fetch_id_page(self, folder_id, restriction, order_by, offset, page_size):
+        body = soap_templates.find_items(
+            folder_id=folder_id, format=u'IdOnly', limit=page_size, offset=offset,
+            restriction=restriction, order_by=order_by,
+        )
+        xml_result = self.service.send(body)
+        last_batch, total, next_offset = _parse_paging(xml_result)
+
+        ids = [ExchangeItemId(element.get(u'Id'), element.get(u'ChangeKey'))
+               for element in _FOUND_ITEM_IDS_XPATH(xml_result)]
+        return last_batch, total, next_offset, ids
+
+    def count(self, folder_id, unread=False, restriction=None):
+        """
+          count(folder_id)
+          :param str folder_id:  The folder to count the items of.
+          :param bool unread:  Only count unread items.
+          :param Restriction restriction:  Only count the items matching this.
+
+          Returns how many items are in a folder. Without a restriction this is the folder's own
+          TotalCount (or UnreadCount); with one, a FindItem asks for a single id and the count is the
+          TotalItemsInView of the answer.
+
+          **Examples**::
+
+            unread = service.folder().count(u'inbox', unread=True)
+        """
+        if restriction is None:
+            field = u'folder:UnreadCount' if unread else u'folder:TotalCount'
+            # Counts change with every new item, so they are never answered from the response cache.
+            xml_result = self.service.send(soap_request.get_folder(folder_id, format=u'IdOnly', fields=[field]),
+                                           use_cache=False)
+            counts = (_FOLDER_UNREAD_COUNT_XPATH if unread else _FOLDER_TOTAL_COUNT_XPATH)(xml_result)
+            return int(counts[0]) if counts else None
+
+        if unread:
+            restriction = restriction & IsEqualTo(u'message:IsRead', False)
+        return self._fetch_id_page(folder_id, restriction, None, 0, 1)[1]
 
     def _parse_response_for_find_folder(self, response):
 
-        result = []
+        # The folders are parsed with relative paths, so they can stay in the response document.
         folders = response.xpath(u'//t:Folders/t:*', namespaces=soap_request.NAMESPACES)
-        for folder in folders:
-            result.append(
-                Exchange2010Folder(
-                    service=self.service,
-                    xml=etree.fromstring(etree.tostring(folder))  # Might be a better way to do this
-                )
+        return [Exchange2010Folder(service=self.service, xml=folder) for folder in folders]
+
+
+class Exchange2010SyncFolderHierarchy(object):
+    """
+    The folder changes since a sync state, fetched by one SyncFolderHierarchy
+    after another until Exchange says there are no more. "created" and
+    "updated" hold Exchange2010Folder objects, "deleted" the ids of the
+    deleted folders.
+    """
+
+    def __init__(self, service=None, folder_id=None, sync_state=None, fields=None):
+        self.service = service
+        self.folder_id = folder_id
+
+        self.created = []
+        self.updated = []
+        self.deleted = []
+        self.last_sync_state = sync_state
+
+        contains_all_folders = False
+        while not contains_all_folders:
+            body = soap_request.sync_folder_hierarchy(
+                folder_id=folder_id, format=_projected_format(fields),
+                sync_state=self.last_sync_state, fields=fields,
             )
+            response_xml = self.service.send(body)
 
-        return result
+            self._parse_response_for_changes(response_xml)
+            contains_all_folders = "true" == response_xml.xpath(
+                '//m:SyncFolderHierarchyResponseMessage/m:IncludesLastFolderInRange',
+                namespaces=soap_request.NAMESPACES,
+            )[0].text
+            self.last_sync_state = response_xml.xpath(
+                '//m:SyncFolderHierarchyResponseMessage/m:SyncState',
+                namespaces=soap_request.NAMESPACES,
+            )[0].text
+
+        if self.created or self.updated or self.deleted:
+            self.service.invalidate_cached_responses(u'GetFolder', u'FindFolder')
+
+    def _parse_response_for_changes(self, response):
+        changes = response.xpath('//m:SyncFolderHierarchyResponseMessage/m:Changes',
+                                 namespaces=soap_request.NAMESPACES)[0]
+
+        for create in changes.xpath('t:Create/t:*', namespaces=soap_request.NAMESPACES):
+            self.created.append(Exchange2010Folder(service=self.service, xml=create))
+
+        for update in changes.xpath('t:Update/t:*', namespaces=soap_request.NAMESPACES):
+            self.updated.append(Exchange2010Folder(service=self.service, xml=update))
+
+        for delete in changes.xpath('t:Delete/t:FolderId/@Id', namespaces=soap_request.NAMESPACES):
+            self.deleted.append(delete)
+
+        return self
 
 
 class Exchange2010Folder(BaseExchangeFolder):
@@ -1008,6 +1985,7 @@ class Exchange2010Folder(BaseExchangeFolder):
         body = soap_request.new_folder(self)
 
         response_xml = self.service.send(body)
+        self.service.invalidate_cached_responses(u'GetFolder', u'FindFolder')
         self._id, self._change_key = self._parse_id_and_change_key_from_response(response_xml)
 
         return self
@@ -1027,6 +2005,7 @@ class Exchange2010Folder(BaseExchangeFolder):
         body = soap_request.delete_folder(self)
 
         response_xml = self.service.send(body)  # noqa
+        self.service.invalidate_cached_responses(u'GetFolder', u'FindFolder')
         # TODO: verify deletion
         self._id = None
         self._change_key = None
@@ -1052,6 +2031,7 @@ class Exchange2010Folder(BaseExchangeFolder):
             raise TypeError(u"You can't move a folder that hasn't been created yet.")
 
         response_xml = self.service.send(soap_request.move_folder(self, folder_id))  # noqa
+        self.service.invalidate_cached_responses(u'GetFolder', u'FindFolder')
 
         result_id, result_key = self._parse_id_and_change_key_from_response(response_xml)
         if self.id != result_id:
@@ -1126,14 +2106,16 @@ class Exchange2010Folder(BaseExchangeFolder):
             }
         }
 
-        effective_rights_element = response.xpath('t:EffectiveRights', namespaces=soap_request.NAMESPACES)[0]
+        # Left out of folder shapes that only ask for some fields.
+        effective_rights_elements = response.xpath('t:EffectiveRights', namespaces=soap_request.NAMESPACES)
 
-        result.update({
-            'effective_rights': self.service._xpath_to_dict(
-                element=effective_rights_element, property_map=effective_rights,
-                namespace_map=soap_request.NAMESPACES
-            )
-        })
+        if effective_rights_elements:
+            result.update({
+                'effective_rights': self.service._xpath_to_dict(
+                    element=effective_rights_elements[0], property_map=effective_rights,
+                    namespace_map=soap_request.NAMESPACES
+                )
+            })
 
         return result
 
@@ -1342,42 +2324,87 @@ class Exchange2010RoomItem(object):
 
 
 class Exchange2010ContactService(BaseExchangeContactService):
-    def get_contact(self, id):
-        return Exchange2010ContactItem(service=self.service, id=id)
+    def get_contact(self, id, fields=None):
+        return Exchange2010ContactItem(service=self.service, id=id, fields=fields)
+
+    def directory(self, batch_size=100, max_workers=4):
+        """
+        Returns a ContactDirectory of this folder, for local name and email
+        lookups. It is empty until refresh() is called.
+        """
+        return ContactDirectory(self, batch_size=batch_size, max_workers=max_workers)
 
     def find_contacts(self, query=None, initial_name=None, final_name=None,
-                      max_entries=100):
+                      max_entries=100, fields=None, restriction=None, order_by=None):
         """
         :param str query: AQS query string
         :param str initial_name: Lower bound on contact names (lexicographically)
         :param str final_name: Upper bound on contact names
         :param int max_entries: Maximum number of matches
+        :param list fields: Only fetch these FieldURIs (e.g. u'contacts:DisplayName')
+        :param Restriction restriction: Only return contacts matching this
+        :param list order_by: FieldURIs to sort on, prefixed with a minus sign for descending order
         """
         body = soap_request.find_contact_items(
             self.folder_id, query_string=query, initial_name=initial_name,
             final_name=final_name, max_entries=max_entries,
+            format=u'IdOnly' if fields else u'Default', fields=fields,
+            restriction=restriction, order_by=order_by,
         )
         response_xml = self.service.send(body)
         return Exchange2010ContactList(service=self.service,
                                        folder_id=self.folder_id,
                                        xml_result=response_xml)
 
-    def get_all_contacts(self):
+    def get_all_contacts(self, read_ahead=0, parallel=None, ordered=True, fields=None, restriction=None,
+                         order_by=None, limit=None):
         """
-        Return a list of all contacts in the current folder.
+        Return a list of all contacts in the current folder, or only those
+        matching *restriction* (see the restrictions module).
         """
         return Exchange2010ContactList(service=self.service,
-                                       folder_id=self.folder_id)
+                                       folder_id=self.folder_id,
+                                       read_ahead=read_ahead,
+                                       parallel=parallel,
+                                       ordered=ordered,
+                                       fields=fields,
+                                       restriction=restriction,
+                                       order_by=order_by,
+                                       limit=limit)
 
 
 class Exchange2010ContactList(object):
     """
     Creates & Stores a list of Exchange2010ContactItem objects in the
     "self.items" variable.
+
+    With a *read_ahead* of N, up to N pages are fetched on a background
+    thread while the caller works through the current one.
+
+    With *parallel* set to N, the pages after the first are fetched by N
+    workers at once, at the offsets the first page's TotalItemsInView calls
+    for. They are yielded in order, or as they arrive unless *ordered*. Items
+    added or removed during the scan can shift between pages, so a scan of
+    a changing folder may miss or repeat some.
+
+    If *fields* (FieldURIs such as u'contacts:DisplayName') are given, only
+    those are fetched; the other properties are left unset. With a
+    *restriction*, only the contacts matching it are listed.
+
+    *order_by* sorts the contacts on the server (FieldURIs, prefixed with a
+    minus sign for descending order) and *limit* stops after that many.
     """
-    def __init__(self, service, folder_id=None, xml_result=None):
+    def __init__(self, service, folder_id=None, xml_result=None, read_ahead=0, parallel=None, ordered=True,
+                 fields=None, restriction=None, order_by=None, limit=None):
         self.service = service
         self.folder_id = folder_id
+        self.fields = fields
+        self.restriction = restriction
+        self.order_by = order_by
+        self.limit = limit
+        self.read_ahead = read_ahead
+        self.parallel = parallel
+        self.ordered = ordered
         self.count = None
         self._items = None
 
@@ -1398,33 +2425,23 @@ class Exchange2010ContactList(object):
                 yield item
             return
 
-        offset = 0
-        while True:
-            body = soap_request.find_items(
-                folder_id=self.folder_id, format=u'AllProperties',
-                limit=self.service.batch_size, offset=offset,
-            )
-            xml_result = self.service.send(body)
-            last_batch = "true" == xml_result.xpath(
-                '//m:RootFolder/@IncludesLastItemInRange',
-                namespaces=soap_request.NAMESPACES,
-            )[0]
-            self.count = int(xml_result.xpath(
-                '//m:RootFolder/@TotalItemsInView',
-                namespaces=soap_request.NAMESPACES,
-            )[0])
-            offset = int(xml_result.xpath(
-                '//m:RootFolder/@IndexedPagingOffset',
-                namespaces=soap_request.NAMESPACES,
-            )[0])
-
-            batch = self._parse_response_for_all_contacts(xml_result)
-
+        for batch in _read_ahead(self._pages(), self.read_ahead):
             for t in batch:
                 yield t
 
-            if last_batch:
-                return
+    def _pages(self):
+        return _scan_pages(self._fetch_page, self.service.batch_size, self.parallel, self.ordered, self.limit)
+
+    def _fetch_page(self, offset, page_size):
+        body = soap_templates.find_items(
+            folder_id=self.folder_id, format=_projected_format(self.fields),
+            limit=page_size, offset=offset, fields=self.fields,
+            restriction=self.restriction, order_by=self.order_by,
+        )
+        xml_result = self.service.send(body)
+        last_batch, self.count, next_offset = _parse_paging(xml_result)
+
+        return last_batch, self.count, next_offset, self._parse_response_for_all_contacts(xml_result)
 
     def _parse_response_for_all_contacts(self, xml):
         contacts = xml.xpath(u'//t:Items/t:Contact',
@@ -1454,9 +2471,8 @@ class Exchange2010ContactList(object):
 
 
 class Exchange2010ContactItem(BaseExchangeContactItem):
-    def _init_from_service(self, id):
-        body = soap_request.get_item(exchange_id=id, format=u'AllProperties')
-        response_xml = self.service.send(body)
+    def _init_from_service(self, id, fields=None):
+        response_xml = self.service._get_item_xml(id, format=_projected_format(fields), fields=fields)
 
         return self._init_from_xml(response_xml)
 
@@ -1469,7 +2485,9 @@ class Exchange2010ContactItem(BaseExchangeContactItem):
         self._update_properties(properties)
 
         physical_addresses = []
-        xml_phys_addresses = xml.xpath(u'//t:PhysicalAddresses', namespaces=soap_request.NAMESPACES)
+        # Relative, like the other properties: contacts from a FindItem page share one document.
+        xml_phys_addresses = xml.xpath(u'descendant-or-self::t:Contact/t:PhysicalAddresses/t:Entry',
+                                       namespaces=soap_request.NAMESPACES)
 
         for xml_phys in xml_phys_addresses:
             addr_props = self._parse_physical_addresses(xml_phys)
@@ -1550,23 +2568,22 @@ class Exchange2010ContactItem(BaseExchangeContactItem):
         )
 
     def _parse_physical_addresses(self, xml):
-        # Use relative selectors here so that we can call this in the
-        # context of each Contact element without deepcopying.
+        # *xml* is one t:Entry of a contact's PhysicalAddresses.
         property_map = {
             u'street': {
-                u'xpath': u'descendant-or-self::t:Street',
+                u'xpath': u't:Street',
             },
             u'city': {
-                u'xpath': u'descendant-or-self::t:City',
+                u'xpath': u't:City',
             },
             u'state': {
-                u'xpath': u'descendant-or-self::t:State',
+                u'xpath': u't:State',
             },
             u'country_or_region': {
-                u'xpath': u'descendant-or-self::t:CountryOrRegion',
+                u'xpath': u't:CountryOrRegion',
             },
             u'postal_code': {
-                u'xpath': u'descendant-or-self::t:PostalCode',
+                u'xpath': u't:PostalCode',
             },
         }
         return self.service._xpath_to_dict(
@@ -1584,11 +2601,14 @@ BODY_TYPES = [BODY_TYPE_HTML, BODY_TYPE_TEXT]
 
 
 class Exchange2010MailService(BaseExchangeMailService):
-    def get_mail(self, id):
-        return Exchange2010MailItem(service=self.service, id=id)
+    def get_mail(self, id, fields=None):
+        return Exchange2010MailItem(service=self.service, id=id, fields=fields)
 
-    def list_mails(self):
-        return Exchange2010MailList(service=self.service, folder_id=self.folder_id)
+    def list_mails(self, read_ahead=0, parallel=None, ordered=True, fields=None, restriction=None, order_by=None,
+                   limit=None):
+        return Exchange2010MailList(service=self.service, folder_id=self.folder_id, read_ahead=read_ahead,
+                                    parallel=parallel, ordered=ordered, fields=fields, restriction=restriction,
+                                    order_by=order_by, limit=limit)
 
     def get_attachment(self, attachment_id):
         """
@@ -1766,9 +2786,38 @@ class Exchange2010MailService(BaseExchangeMailService):
 
 
 class Exchange2010MailList(object):
-    def __init__(self, service=None, folder_id=u'inbox', xml_result=None):
+    """
+    The messages in a mail folder, fetched a page at a time.
+
+    With a *read_ahead* of N, up to N pages (with their extended properties)
+    are fetched on a background thread while the caller works through the
+    current one.
+
+    With *parallel* set to N, the pages after the first are fetched by N
+    workers at once, at the offsets the first page's TotalItemsInView calls
+    for. They are yielded in order, or as they arrive unless *ordered*. Items
+    added or removed during the scan can shift between pages, so a scan of
+    a changing folder may miss or repeat some.
+
+    If *fields* (FieldURIs such as u'item:Subject') are given, only those
+    are fetched, both in the list and with the extended properties. With a
+    *restriction*, only the messages matching it are listed.
+
+    *order_by* sorts the messages on the server (FieldURIs, prefixed with a
+    minus sign for descending order) and *limit* stops after that many, so
+    ``order_by=[u'-item:DateTimeReceived'], limit=50`` lists the 50 newest.
+    """
+    def __init__(self, service=None, folder_id=u'inbox', xml_result=None, read_ahead=0, parallel=None,
+                 ordered=True, fields=None, restriction=None, order_by=None, limit=None):
         self.service = service
         self.folder_id = folder_id
+        self.fields = fields
+        self.restriction = restriction
+        self.order_by = order_by
+        self.limit = limit
+        self.read_ahead = read_ahead
+        self.parallel = parallel
+        self.ordered = ordered
         self._items = None
         self.count = None
 
@@ -1790,34 +2839,26 @@ class Exchange2010MailList(object):
                 yield item
             return
 
-        offset = 0
-        while True:
-            body = soap_request.find_items(
-                folder_id=self.folder_id, limit=self.service.batch_size,
-                offset=offset, format=u'AllProperties'
-            )
-            xml_result = self.service.send(body)
-            last_batch = "true" == xml_result.xpath(
-                '//m:RootFolder/@IncludesLastItemInRange',
-                namespaces=soap_request.NAMESPACES,
-            )[0]
-            self.count = int(xml_result.xpath(
-                '//m:RootFolder/@TotalItemsInView',
-                namespaces=soap_request.NAMESPACES,
-            )[0])
-            offset = int(xml_result.xpath(
-                '//m:RootFolder/@IndexedPagingOffset',
-                namespaces=soap_request.NAMESPACES,
-            )[0])
-
-            batch = self._parse_response_for_all_mails(xml_result)
-            self.load_extended_properties(batch)
-
+        for batch in _read_ahead(self._pages(), self.read_ahead):
             for t in batch:
                 yield t
 
-            if last_batch:
-                return
+    def _pages(self):
+        return _scan_pages(self._fetch_page, self.service.batch_size, self.parallel, self.ordered, self.limit)
+
+    def _fetch_page(self, offset, page_size):
+        body = soap_templates.find_items(
+            folder_id=self.folder_id, limit=page_size,
+            offset=offset, format=_projected_format(self.fields), fields=self.fields,
+            restriction=self.restriction, order_by=self.order_by,
+        )
+        xml_result = self.service.send(body)
+        last_batch, self.count, next_offset = _parse_paging(xml_result)
+
+        batch = self._parse_response_for_all_mails(xml_result)
+        self.load_extended_properties(batch)
+
+        return last_batch, self.count, next_offset, batch
 
     def load_extended_properties(self, items):
         """
@@ -1825,7 +2866,8 @@ class Exchange2010MailList(object):
         if there are no items, nothing is done (empty items would cause soap error 500)
         """
         if items:
-            body = soap_request.get_mail_items(items)
+            body = soap_request.get_mail_items(items, format=u'IdOnly' if self.fields else u'Default',
+                                               fields=self.fields)
             logging.info(etree.tostring(body))
             xml_result = self.service.send(body)
 
@@ -1869,9 +2911,8 @@ class Exchange2010MailList(object):
 
 
 class Exchange2010MailItem(BaseExchangeMailItem):
-    def _init_from_service(self, id):
-        body = soap_request.get_item(exchange_id=id, format=u'AllProperties')
-        response_xml = self.service.send(body)
+    def _init_from_service(self, id, fields=None):
+        response_xml = self.service._get_item_xml(id, format=_projected_format(fields), fields=fields)
 
         return self._init_from_xml(response_xml)
 
@@ -2074,25 +3115,58 @@ class Exchange2010MailItem(BaseExchangeMailItem):
 
 
 class Exchange2010TaskService(BaseExchangeTaskService):
-    def get_task(self, id):
-        return Exchange2010TaskItem(service=self.service, id=id)
+    def get_task(self, id, fields=None):
+        return Exchange2010TaskItem(service=self.service, id=id, fields=fields)
 
-    def get_all_tasks(self):
+    def get_all_tasks(self, read_ahead=0, fields=None, restriction=None, order_by=None, limit=None,
+                      single_pass=False):
         """
-        Return a list of all tasks in the current folder.
+        Return a list of all tasks in the current folder, or only those
+        matching *restriction* (see the restrictions module).
         """
         return Exchange2010TaskList(service=self.service,
-                                    folder_id=self.folder_id)
+                                    folder_id=self.folder_id,
+                                    read_ahead=read_ahead,
+                                    fields=fields,
+                                    restriction=restriction,
+                                    order_by=order_by,
+                                    limit=limit,
+                                    single_pass=single_pass)
 
 
 class Exchange2010TaskList(object):
     """
     Creates an iterator over a list of Exchange2010TaskItem objects in
     "self.items".
+
+    With a *read_ahead* of N, up to N pages (with their extended properties)
+    are fetched on a background thread while the caller works through the
+    current one.
+
+    If *fields* (FieldURIs such as u'task:Status') are given, only those are
+    fetched with the extended properties. With a *restriction*, only the
+    tasks matching it are listed.
+
+    *order_by* sorts the tasks on the server (FieldURIs, prefixed with a
+    minus sign for descending order) and *limit* stops after that many.
+
+    By default each page of ids from FindItem is followed by a GetItem for
+    the tasks' properties. With *single_pass*, FindItem returns the
+    properties itself (all of them, or just *fields*), and a GetItem is
+    only sent for the *fields* FindItem can't return, such as item:Body.
+    That GetItem runs while the next page is being found. Without *fields*
+    a single pass doesn't load bodies.
     """
-    def __init__(self, service, folder_id=None, xml_result=None):
+    def __init__(self, service, folder_id=None, xml_result=None, read_ahead=0, fields=None, restriction=None,
+                 order_by=None, limit=None, single_pass=False):
         self.service = service
         self.folder_id = folder_id
+        self.fields = fields
+        self.single_pass = single_pass
+        self.restriction = restriction
+        self.order_by = order_by
+        self.limit = limit
+        self.read_ahead = read_ahead
         self.count = None
         self._items = None
 
@@ -2114,44 +3188,52 @@ class Exchange2010TaskList(object):
                 yield item
             return
 
-        offset = 0
-        while True:
-            body = soap_request.find_items(
-                folder_id=self.folder_id, format=u'IdOnly',
-                limit=self.service.batch_size, offset=offset,
-            )
-            xml_result = self.service.send(body)
-            last_batch = "true" == xml_result.xpath(
-                '//m:RootFolder/@IncludesLastItemInRange',
-                namespaces=soap_request.NAMESPACES,
-            )[0]
-            self.count = int(xml_result.xpath(
-                '//m:RootFolder/@TotalItemsInView',
-                namespaces=soap_request.NAMESPACES,
-            )[0])
-            offset = int(xml_result.xpath(
-                '//m:RootFolder/@IndexedPagingOffset',
-                namespaces=soap_request.NAMESPACES,
-            )[0])
-
-            batch = self._parse_response_for_all_tasks(xml_result)
-            self.load_extended_properties(batch)
-
+        for batch in _read_ahead(self._pages(), self.read_ahead):
             for t in batch:
                 yield t
 
-            if last_batch:
-                return
+    def _pages(self):
+        pages = _scan_pages(self._fetch_page, self.service.batch_size, limit=self.limit)
+
+        detail_fields = [field for field in self.fields or () if field in FIND_ITEM_UNAVAILABLE_FIELDS]
+        if self.single_pass and detail_fields:
+            return self._load_details(_read_ahead(pages, 1), detail_fields)
+        return pages
+
+    def _load_details(self, pages, fields):
+        # The pages are read ahead, so the next FindItem is already on its way while this GetItem is.
+        for batch in pages:
+            self.load_extended_properties(batch, fields)
+            yield batch
+
+    def _fetch_page(self, offset, page_size):
+        format, fields = u'IdOnly', None
+        if self.single_pass:
+            fields = [field for field in self.fields or () if field not in FIND_ITEM_UNAVAILABLE_FIELDS]
+            format = _projected_format(self.fields)
+
+        body = soap_templates.find_items(
+            folder_id=self.folder_id, format=format, fields=fields,
+            limit=page_size, offset=offset, restriction=self.restriction, order_by=self.order_by,
+        )
+        xml_result = self.service.send(body)
+        last_batch, self.count, next_offset = _parse_paging(xml_result)
 
-    def load_extended_properties(self, items):
+        batch = self._parse_response_for_all_tasks(xml_result)
+        if not self.single_pass:
+            self.load_extended_properties(batch)
+
+        return last_batch, self.count, next_offset, batch
+
+    def load_extended_properties(self, items, fields=None):
         """
-        loads additional task info via soap
+        loads additional task info via soap, only *fields* if given (else the list's own fields)
         if there are no items, nothing is done (empty items would cause soap error 500)
         """
         if items:
-            body = soap_request.get_item([i.id for i in items],
-                                         format=u'AllProperties')
-            logging.info(etree.tostring(body))
+            fields = fields or self.fields
+            body = soap_templates.get_item([i.id for i in items],
+                                           format=_projected_format(fields), fields=fields)
             xml_result = self.service.send(body)
 
             self._parse_response_for_extended_properties(items, xml_result)
@@ -2201,9 +3283,8 @@ class Exchange2010TaskList(object):
 
 
 class Exchange2010TaskItem(BaseExchangeTaskItem):
-    def _init_from_service(self, id):
-        body = soap_request.get_item(exchange_id=id, format=u'AllProperties')
-        response_xml = self.service.send(body)
+    def _init_from_service(self, id, fields=None):
+        response_xml = self.service._get_item_xml(id, format=_projected_format(fields), fields=fields)
 
         return self._init_from_xml(response_xml)
 
@@ -2363,4 +3444,8 @@ class Exchange2010NotificationService(object):
                     '//t:{}/t:ItemId/@Id'.format(xml_event_type),
                     namespaces=soap_request.NAMESPACES,
                 )
+
+        if self.service.item_cache is not None:
+            self.service.item_cache.invalidate_notification(events)
+
         return events
@@ -0,0 +1,182 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+# Search expressions for the m:Restriction of a FindItem, so that Exchange does the filtering.
+#
+# Fields are FieldURIs such as u'message:IsRead' or u'item:DateTimeReceived', indexed ones such as
+# u'contacts:EmailAddress:EmailAddress1', or extended properties. Expressions combine with &, | and ~:
+#
+#   unread_from_today = IsEqualTo(u'message:IsRead', False) & IsGreaterThan(u'item:DateTimeReceived', midnight)
+from datetime import datetime, date
+
+from ..compat import _unicode
+from ..utils import convert_datetime_to_utc
+from .soap_request import T, EXCHANGE_DATETIME_FORMAT, EXCHANGE_DATE_FORMAT, field_uri_xml
+
+
+def constant_value(value):
+    """ Formats *value* the way Exchange expects it in a t:Constant. """
+    if isinstance(value, bool):
+        return u'true' if value else u'false'
+    if isinstance(value, datetime):
+        return convert_datetime_to_utc(value).strftime(EXCHANGE_DATETIME_FORMAT)
+    if isinstance(value, date):
+        return value.strftime(EXCHANGE_DATE_FORMAT)
+    return _unicode(value)
+
+
+def _field_key(field):
+    if hasattr(field, 'property_name'):
+        return (field.distinguished_property_set_id, field.property_name, field.property_type)
+    return field
+
+
+class Restriction(object):
+    """ A search expression. Subclasses build their XML in to_xml; equal expressions build the same XML. """
+
+    def to_xml(self):
+        raise NotImplementedError
+
+    def _key(self):
+        raise NotImplementedError
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self).__name__, self._key()))
+
+    def __repr__(self):
+        return u'{}{!r}'.format(type(self).__name__, self._key())
+
+
+class _Comparison(Restriction):
+    TAG = None
+
+    def __init__(self, field, value):
+        self.field = field
+        self.value = value
+
+    def to_xml(self):
+        return getattr(T, self.TAG)(
+            field_uri_xml(self.field),
+            T.FieldURIOrConstant(T.Constant(Value=constant_value(self.value))),
+        )
+
+    def _key(self):
+        return (_field_key(self.field), constant_value(self.value))
+
+
+class IsEqualTo(_Comparison):
+    TAG = u'IsEqualTo'
+
+
+class IsNotEqualTo(_Comparison):
+    TAG = u'IsNotEqualTo'
+
+
+class IsGreaterThan(_Comparison):
+    TAG = u'IsGreaterThan'
+
+
+class IsGreaterThanOrEqualTo(_Comparison):
+    TAG = u'IsGreaterThanOrEqualTo'
+
+
+class IsLessThan(_Comparison):
+    TAG = u'IsLessThan'
+
+
+class IsLessThanOrEqualTo(_Comparison):
+    TAG = u'IsLessThanOrEqualTo'
+
+
+class Contains(Restriction):
+    """
+    Matches string (or multi-valued string, such as item:Categories) fields containing *value*.
+
+    *mode* is one of FullString, Prefixed, Substring, PrefixOnWords or ExactPhrase, and *comparison* one of
+    Exact, IgnoreCase, IgnoreNonSpacingCharacters or Loose.
+    """
+
+    def __init__(self, field, value, mode=u'Substring', comparison=u'IgnoreCase'):
+        self.field = field
+        self.value = value
+        self.mode = mode
+        self.comparison = comparison
+
+    def to_xml(self):
+        return T.Contains(
+            field_uri_xml(self.field),
+            T.Constant(Value=constant_value(self.value)),
+            ContainmentMode=self.mode,
+            ContainmentComparison=self.comparison,
+        )
+
+    def _key(self):
+        return (_field_key(self.field), constant_value(self.value), self.mode, self.comparison)
+
+
+class Exists(Restriction):
+    """ Matches items that have a value for *field*. """
+
+    def __init__(self, field):
+        self.field = field
+
+    def to_xml(self):
+        return T.Exists(field_uri_xml(self.field))
+
+    def _key(self):
+        return (_field_key(self.field),)
+
+
+class _Combination(Restriction):
+    TAG = None
+
+    def __init__(self, *restrictions):
+        if not restrictions:
+            raise ValueError(u'{} needs at least one restriction'.format(type(self).__name__))
+        self.restrictions = restrictions
+
+    def to_xml(self):
+        if len(self.restrictions) == 1:
+            return self.restrictions[0].to_xml()
+        return getattr(T, self.TAG)(*[restriction.to_xml() for restriction in self.restrictions])
+
+    def _key(self):
+        return self.restrictions
+
+
+class And(_Combination):
+    TAG = u'And'
+
+
+class Or(_Combination):
+    TAG = u'Or'
+
+
+class Not(Restriction):
+
+    def __init__(self, restriction):
+        self.restriction = restriction
+
+    def to_xml(self):
+        return T.Not(self.restriction.to_xml())
+
+    def _key(self):
+        return (self.restriction,)
@@ -6,7 +6,7 @@ Unless required by applicable law or agreed to in writing, software?distributed
 """
 from lxml.builder import ElementMaker
 from ..utils import convert_datetime_to_utc
-from ..compat import _unicode
+from ..compat import _unicode, BASESTRING_TYPES
 import base64
 
 MSG_NS = u'http://schemas.microsoft.com/exchange/services/2006/messages'
@@ -29,6 +29,9 @@ DISTINGUISHED_IDS = (
     'Archiverecoverableitemsdeletions', 'Archiverecoverableitemsversions', 'Archiverecoverableitemspurges',
 )
 
+FREE_BUSY_VIEWS = (u'MergedOnly', u'FreeBusy', u'FreeBusyMerged', u'Detailed', u'DetailedMerged')
+MERGED_FREE_BUSY_VIEWS = (u'MergedOnly', u'FreeBusyMerged', u'DetailedMerged')
+
 NOTIFICATION_EVENT_TYPES = {
     'copied': 'CopiedEvent',
     'created': 'CreatedEvent',
@@ -82,6 +85,79 @@ def resource_node(element, resources):
     return element
 
 
+def field_uri_xml(field):
+    """
+    Builds the path to a property: a t:FieldURI for names like u'item:Subject', a t:IndexedFieldURI for
+    u'contacts:EmailAddress:EmailAddress1', or a t:ExtendedFieldURI for an extended property.
+    """
+    if not isinstance(field, BASESTRING_TYPES):
+        return T.ExtendedFieldURI(
+            DistinguishedPropertySetId=field.distinguished_property_set_id,
+            PropertyName=field.property_name,
+            PropertyType=field.property_type,
+        )
+
+    parts = field.split(u':')
+    if len(parts) == 3:
+        return T.IndexedFieldURI(FieldURI=u':'.join(parts[:2]), FieldIndex=parts[2])
+    return T.FieldURI(FieldURI=field)
+
+
+def sort_order_xml(order_by):
+    """
+    Builds an m:SortOrder from FieldURIs to sort on, most significant first. Fields prefixed with a minus
+    sign, such as u'-item:DateTimeReceived', are sorted in descending order.
+    """
+    orders = []
+    for field in order_by:
+        descending = field.startswith(u'-')
+        orders.append(T.FieldOrder(
+            field_uri_xml(field[1:] if descending else field),
+            Order=u'Descending' if descending else u'Ascending',
+        ))
+    return M.SortOrder(*orders)
+
+
+def additional_properties_node(additional_properties=None, fields=None):
+    """
+    Builds the t:AdditionalProperties of an item shape, or returns None if there are none.
+
+    *fields* are first-class FieldURIs such as u'item:Subject' or u'calendar:Start'; *additional_properties*
+    are extended properties (anything with distinguished_property_set_id, property_name and property_type).
+    """
+    properties = [field_uri_xml(field) for field in fields or []]
+
+    if additional_properties:
+        properties.extend(map(
+            field_uri_xml,
+            additional_properties if isinstance(additional_properties, list) else [additional_properties]
+        ))
+
+    return T.AdditionalProperties(*properties) if properties else None
+
+
+def item_shape(format=u'Default', additional_properties=None, fields=None, *options):
+    """ Builds an m:ItemShape with the given base shape, shape *options* and additional properties. """
+    shape = M.ItemShape(T.BaseShape(format), *options)
+
+    properties = additional_properties_node(additional_properties, fields)
+    if properties is not None:
+        shape.append(properties)
+
+    return shape
+
+
+def folder_shape(format=u'Default', fields=None):
+    """ Builds an m:FolderShape with the given base shape and additional *fields* (such as u'folder:DisplayName'). """
+    shape = M.FolderShape(T.BaseShape(format))
+
+    properties = additional_properties_node(fields=fields)
+    if properties is not None:
+        shape.append(properties)
+
+    return shape
+
+
 def delete_field(field_uri):
     """
         Helper function to request deletion of a field. This is necessary when you want to overwrite values instead of
@@ -101,19 +177,25 @@ def delete_field(field_uri):
 
 def convert_id(id_value, destination_format, format=u'EwsId',
                mailbox=u'a@b.com'):
+    return convert_ids([id_value], destination_format, format, mailbox)
+
+
+def convert_ids(id_values, destination_format, format=u'EwsId',
+                mailbox=u'a@b.com'):
+    """ Converts several ids with a single ConvertId; Exchange answers for each AlternateId in order. """
     return M.ConvertId(
         M.SourceIds(
-            T.AlternateId(
+            *[T.AlternateId(
                 Format=format,
                 Id=id_value,
                 Mailbox=mailbox,
-            )
+            ) for id_value in id_values]
         ),
         DestinationFormat=destination_format,
     )
 
 
-def get_item(exchange_id, format=u"Default", additional_properties=None):
+def get_item(exchange_id, format=u"Default", additional_properties=None, fields=None):
     """
       Requests a calendar item from the store.
 
@@ -124,6 +206,9 @@ def get_item(exchange_id, format=u"Default", additional_properties=None):
 
       http://msdn.microsoft.com/en-us/library/aa564509(v=exchg.140).aspx
 
+      fields are first-class FieldURIs (e.g. item:Subject) to return on top of the base shape, so IdOnly
+      plus a few fields keeps responses small.
+
       <m:GetItem  xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
               xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
         <m:ItemShape>
@@ -143,26 +228,8 @@ def get_item(exchange_id, format=u"Default", additional_properties=None):
     else:
         elements = [T.ItemId(Id=exchange_id)]
 
-    if additional_properties:
-        additional_properties = list(map(
-            lambda x: T.ExtendedFieldURI(
-                DistinguishedPropertySetId=x.distinguished_property_set_id,
-                PropertyName=x.property_name,
-                PropertyType=x.property_type),
-            additional_properties if isinstance(additional_properties, list) else [additional_properties]
-        ))
-    else:
-        additional_properties = []
-
-    shapes = [T.BaseShape(format)]
-
-    if additional_properties:
-        shapes.append(T.AdditionalProperties(*additional_properties))
-
     root = M.GetItem(
-        M.ItemShape(
-            *shapes
-        ),
+        item_shape(format, additional_properties, fields),
         M.ItemIds(
             *elements
         )
@@ -172,7 +239,7 @@ def get_item(exchange_id, format=u"Default", additional_properties=None):
 
 def get_calendar_items(format=u"Default", calendar_id=u'calendar',
                        start=None, end=None, max_entries=1000,
-                       delegate_for=None, additional_properties=None):
+                       delegate_for=None, additional_properties=None, fields=None):
     start = start.strftime(EXCHANGE_DATETIME_FORMAT)
     end = end.strftime(EXCHANGE_DATETIME_FORMAT)
 
@@ -189,27 +256,9 @@ def get_calendar_items(format=u"Default", calendar_id=u'calendar',
     else:
         target = M.ParentFolderIds(T.FolderId(Id=calendar_id))
 
-    if additional_properties:
-        additional_properties = list(map(
-            lambda x: T.ExtendedFieldURI(
-                DistinguishedPropertySetId=x.distinguished_property_set_id,
-                PropertyName=x.property_name,
-                PropertyType=x.property_type),
-            additional_properties if isinstance(additional_properties, list) else [additional_properties]
-        ))
-    else:
-        additional_properties = []
-
-    shapes = [T.BaseShape(format)]
-
-    if additional_properties:
-        shapes.append(T.AdditionalProperties(*additional_properties))
-
     root = M.FindItem(
         {'Traversal': 'Shallow'},
-        M.ItemShape(
-            *shapes
-        ),
+        item_shape(format, additional_properties, fields),
         M.CalendarView({
             u'MaxEntriesReturned': _unicode(max_entries),
             u'StartDate': start,
@@ -247,6 +296,22 @@ def sync_calendar_items(calendar_id='calendar', format='Default', delegate_for=N
     return root
 
 
+def sync_folder_hierarchy(folder_id=None, format=u'Default', sync_state=None, fields=None):
+    """
+    Asks for the folders created, changed or deleted under *folder_id* (the whole mailbox if None) since
+    *sync_state* was handed out, or for every folder without one.
+    """
+    items = [folder_shape(format, fields)]
+
+    if folder_id is not None:
+        items.append(M.SyncFolderId(folder_id_xml(folder_id)))
+
+    if sync_state:
+        items.append(M.SyncState(sync_state))
+
+    return M.SyncFolderHierarchy(*items)
+
+
 def get_room_lists():
     return M.GetRoomLists()
 
@@ -270,9 +335,13 @@ def find_contact_items(folder_id, initial_name=None, final_name=None,
 
 
 def find_items(folder_id, query_string=None, format=u'Default',
-               limit=None, offset=0):
+               limit=None, offset=0, fields=None, restriction=None, order_by=None):
+    """
+    *restriction* is a search expression from the restrictions module; only the items matching it are
+    returned. *order_by* lists the fields to sort on, as for sort_order_xml.
+    """
     root = M.FindItem(
-        M.ItemShape(T.BaseShape(format)),
+        item_shape(format, fields=fields),
         Traversal=u'Shallow',
     )
     if offset or (limit is not None):
@@ -282,6 +351,10 @@ def find_items(folder_id, query_string=None, format=u'Default',
             Offset=str(offset),
             BasePoint='Beginning',
         ))
+    if restriction is not None:
+        root.append(M.Restriction(restriction.to_xml()))
+    if order_by:
+        root.append(sort_order_xml(order_by))
     root.append(M.ParentFolderIds(folder_id_xml(folder_id)))
     if query_string:
         root.append(M.QueryString(query_string))
@@ -300,14 +373,13 @@ def get_attachments(ids):
     return root
 
 
-def get_mail_items(items, format=u'Default', include_mime_content=False):
+def get_mail_items(items, format=u'Default', include_mime_content=False, fields=None):
     incl_mime_content = "true"
     if not include_mime_content:
         incl_mime_content = "false"
 
     root = M.GetItem(
-        M.ItemShape(T.BaseShape(format),
-                    T.IncludeMimeContent(incl_mime_content)),
+        item_shape(format, None, fields, T.IncludeMimeContent(incl_mime_content)),
         M.ItemIds()
     )
 
@@ -320,7 +392,7 @@ def get_mail_items(items, format=u'Default', include_mime_content=False):
     return root
 
 
-def get_master(exchange_id, format=u"Default"):
+def get_master(exchange_id, format=u"Default", fields=None):
     """
       Requests a calendar item from the store.
 
@@ -331,6 +403,8 @@ def get_master(exchange_id, format=u"Default"):
 
       http://msdn.microsoft.com/en-us/library/aa564509(v=exchg.140).aspx
 
+      fields are FieldURIs (e.g. item:Subject) to return on top of the base shape.
+
       <m:GetItem  xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
               xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
         <m:ItemShape>
@@ -344,9 +418,7 @@ def get_master(exchange_id, format=u"Default"):
     """
 
     root = M.GetItem(
-        M.ItemShape(
-            T.BaseShape(format)
-        ),
+        item_shape(format, fields=fields),
         M.ItemIds(
             T.RecurringMasterItemId(OccurrenceId=exchange_id)
         )
@@ -354,7 +426,7 @@ def get_master(exchange_id, format=u"Default"):
     return root
 
 
-def get_occurrence(exchange_id, instance_index, format=u"Default"):
+def get_occurrence(exchange_id, instance_index, format=u"Default", fields=None):
     """
       Requests one or more calendar items from the store matching the master & index.
 
@@ -363,6 +435,8 @@ def get_occurrence(exchange_id, instance_index, format=u"Default"):
       format controls how much data you get back from Exchange. Full docs are here, but acceptible values
       are IdOnly, Default, and AllProperties.
 
+      fields are FieldURIs (e.g. item:Subject) to return on top of the base shape.
+
       GetItem Doc:
       http://msdn.microsoft.com/en-us/library/aa564509(v=exchg.140).aspx
       OccurrenceItemId Doc:
@@ -382,9 +456,7 @@ def get_occurrence(exchange_id, instance_index, format=u"Default"):
     """
 
     root = M.GetItem(
-        M.ItemShape(
-            T.BaseShape(format)
-        ),
+        item_shape(format, fields=fields),
         M.ItemIds()
     )
 
@@ -394,14 +466,12 @@ def get_occurrence(exchange_id, instance_index, format=u"Default"):
     return root
 
 
-def get_folder(folder_id, format=u"Default"):
+def get_folder(folder_id, format=u"Default", fields=None):
 
     id = T.DistinguishedFolderId(Id=folder_id) if folder_id in DISTINGUISHED_IDS else T.FolderId(Id=folder_id)
 
     root = M.GetFolder(
-        M.FolderShape(
-            T.BaseShape(format)
-        ),
+        folder_shape(format, fields),
         M.FolderIds(id)
     )
     return root
@@ -424,9 +494,9 @@ def new_folder(folder):
 
 
 def find_folder(parent_id, format=u"Default", traversal='Shallow',
-                limit=None, offset=0):
+                limit=None, offset=0, fields=None):
     root = M.FindFolder(
-        M.FolderShape(T.BaseShape(format)),
+        folder_shape(format, fields),
         Traversal=traversal,
     )
     if offset or (limit is not None):
@@ -504,23 +574,35 @@ def new_event(event):
   </m:CreateItem>
     """
 
-    id = T.DistinguishedFolderId(Id=event.calendar_id) if event.calendar_id in DISTINGUISHED_IDS else T.FolderId(Id=event.calendar_id)
+    return new_events([event], calendar_id=event.calendar_id)
 
-    start = convert_datetime_to_utc(event.start)
-    end = convert_datetime_to_utc(event.end)
 
-    root = M.CreateItem(
+def new_events(events, calendar_id=u'calendar'):
+    """
+    Requests several events be created in the same calendar with a single CreateItem.
+
+    Exchange answers with one CreateItemResponseMessage per event, in the same order.
+    """
+
+    id = T.DistinguishedFolderId(Id=calendar_id) if calendar_id in DISTINGUISHED_IDS else T.FolderId(Id=calendar_id)
+
+    return M.CreateItem(
         M.SavedItemFolderId(id),
-        M.Items(
-            T.CalendarItem(
-                T.Subject(event.subject),
-                T.Body(event.text_body or u'', BodyType="Text"),
-                )
-        ),
+        M.Items(*[calendar_item(event) for event in events]),
         SendMeetingInvitations="SendToAllAndSaveCopy"
     )
 
-    calendar_node = root.xpath(u'/m:CreateItem/m:Items/t:CalendarItem', namespaces=NAMESPACES)[0]
+
+def calendar_item(event):
+    """ Builds the t:CalendarItem for a new event. """
+
+    start = convert_datetime_to_utc(event.start)
+    end = convert_datetime_to_utc(event.end)
+
+    calendar_node = T.CalendarItem(
+        T.Subject(event.subject),
+        T.Body(event.text_body or u'', BodyType="Text"),
+    )
 
     if event.reminder_minutes_before_start:
         calendar_node.append(T.ReminderIsSet('true'))
@@ -589,7 +671,7 @@ def new_event(event):
             )
         )
 
-    return root
+    return calendar_node
 
 
 def delete_event(event):
@@ -610,9 +692,14 @@ def delete_event(event):
     </DeleteItem>
 
     """
+    return delete_events([event])
+
+
+def delete_events(events):
+    """ Requests several items be deleted from the store with a single DeleteItem. """
     root = M.DeleteItem(
         M.ItemIds(
-            T.ItemId(Id=event.id, ChangeKey=event.change_key)
+            *[T.ItemId(Id=event.id, ChangeKey=event.change_key) for event in events]
         ),
         DeleteType="HardDelete",
         SendMeetingCancellations="SendToAllAndSaveCopy",
@@ -623,13 +710,18 @@ def delete_event(event):
 
 
 def move_event(event, folder_id):
+    return move_events([event], folder_id)
+
+
+def move_events(events, folder_id):
+    """ Requests several items be moved to *folder_id* with a single MoveItem. """
 
     id = T.DistinguishedFolderId(Id=folder_id) if folder_id in DISTINGUISHED_IDS else T.FolderId(Id=folder_id)
 
     root = M.MoveItem(
         M.ToFolderId(id),
         M.ItemIds(
-            T.ItemId(Id=event.id, ChangeKey=event.change_key)
+            *[T.ItemId(Id=event.id, ChangeKey=event.change_key) for event in events]
         )
     )
     return root
@@ -659,20 +751,34 @@ def update_property_node(node_to_insert, field_uri):
 
 def update_item(event, updated_attributes, calendar_item_update_operation_type):
     """ Saves updates to an event in the store. Only request changes for attributes that have actually changed."""
+    return update_items([(event, updated_attributes)], calendar_item_update_operation_type)
+
+
+def update_items(changes, calendar_item_update_operation_type):
+    """
+    Saves updates to several events with a single UpdateItem.
 
-    root = M.UpdateItem(
+    *changes* is a list of ``(event, updated_attributes)`` pairs; each becomes one t:ItemChange.
+    """
+
+    return M.UpdateItem(
         M.ItemChanges(
-            T.ItemChange(
-                T.ItemId(Id=event.id, ChangeKey=event.change_key),
-                T.Updates()
-            )
+            *[item_change(event, updated_attributes) for event, updated_attributes in changes]
         ),
         ConflictResolution=u"AlwaysOverwrite",
         MessageDisposition=u"SendAndSaveCopy",
         SendMeetingInvitationsOrCancellations=calendar_item_update_operation_type
     )
 
-    update_node = root.xpath(u'/m:UpdateItem/m:ItemChanges/t:ItemChange/t:Updates', namespaces=NAMESPACES)[0]
+
+def item_change(event, updated_attributes):
+    """ Builds the t:ItemChange for the attributes of an event that have changed. """
+
+    update_node = T.Updates()
+    root = T.ItemChange(
+        T.ItemId(Id=event.id, ChangeKey=event.change_key),
+        update_node
+    )
 
     # if not send_only_to_changed_attendees:
     #   # We want to resend invites, which you do by setting an attribute to the same value it has. Right now, events
@@ -1027,20 +1133,38 @@ def create_mime_email(subject, mime, recipients, cc_recipients, bcc_recipients,
         , MessageDisposition=disposition)
 
 
-def get_user_availability(attendees, start, end):
+def get_user_availability(attendees, start, end, requested_view=u'FreeBusy', merged_free_busy_interval=30):
+    """
+      Requests free/busy information for a list of attendees.
+
+      requested_view is one of FREE_BUSY_VIEWS. The merged views return a MergedFreeBusy string with one digit
+      per merged_free_busy_interval minutes instead of (or as well as) the individual calendar events.
+
+      http://msdn.microsoft.com/en-us/library/aa564001(v=exchg.140).aspx
+    """
+    if requested_view not in FREE_BUSY_VIEWS:
+        raise ValueError(u'requested_view must be one of %s' % u', '.join(FREE_BUSY_VIEWS))
+
     start = convert_datetime_to_utc(start)
     end = convert_datetime_to_utc(end)
 
     array = M.MailboxDataArray(*list(map(lambda x: T.MailboxData(T.Email(T.Address(x['email'])), T.AttendeeType('Optional')), attendees)))
 
+    options = [T.TimeWindow(
+        T.StartTime(start.strftime(EXCHANGE_DATETIME_FORMAT)),
+        T.EndTime(end.strftime(EXCHANGE_DATETIME_FORMAT))
+    )]
+
+    if requested_view in MERGED_FREE_BUSY_VIEWS:
+        options.append(T.MergedFreeBusyIntervalInMinutes(str(merged_free_busy_interval)))
+
+    options.append(T.RequestedView(requested_view))
+
     return M.GetUserAvailabilityRequest(
         T.TimeZone(T.Bias('0'),
                    T.StandardTime(T.Bias('0'), T.Time('00:00:00'), T.DayOrder('0'), T.Month('0'), T.DayOfWeek('Sunday')),
                    T.DaylightTime(T.Bias('0'), T.Time('00:00:00'), T.DayOrder('0'), T.Month('0'), T.DayOfWeek('Sunday'))
                    ),
         array,
-        T.FreeBusyViewOptions(T.TimeWindow(
-            T.StartTime(start.strftime(EXCHANGE_DATETIME_FORMAT)),
-            T.EndTime(end.strftime(EXCHANGE_DATETIME_FORMAT))
-        ), T.RequestedView('FreeBusy'))
+        T.FreeBusyViewOptions(*options)
     )
@@ -0,0 +1,112 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+# Prebuilt versions of the requests sent most often.
+#
+# Each function here takes the same arguments as the one of the same name in soap_request, and returns the
+# same request already serialized (a SerializedRequest). The request is built with soap_request once for each
+# shape (base shape, kind of folder and so on), and from then on the ids, offsets and dates are spliced into
+# the serialized bytes.
+from datetime import datetime
+
+from pytz import utc
+
+from ..base.soap import RequestTemplate, slot, repeat_children
+from ..cache import LRUCache
+from ..utils import convert_datetime_to_utc
+from . import soap_request
+from .soap_request import NAMESPACES, DISTINGUISHED_IDS, EXCHANGE_DATETIME_FORMAT
+
+# Templates by the function that built them and the shape of the request.
+_templates = LRUCache(max_size=500)
+
+# Stands in for the start and end times while a GetUserAvailability template is built.
+_PLACEHOLDER_TIME = datetime(2000, 1, 1, tzinfo=utc)
+
+
+def _template(key, build):
+    template = _templates.get(key, count=False)
+    if template is None:
+        template = RequestTemplate(build())
+        _templates.set(key, template)
+    return template
+
+
+def get_item(exchange_id, format=u"Default", additional_properties=None, fields=None):
+    if additional_properties or fields:
+        return soap_request.get_item(exchange_id, format=format, additional_properties=additional_properties,
+                                     fields=fields)
+
+    def build():
+        root = soap_request.get_item([slot(u'id')], format=format)
+        repeat_children(root.find(u'm:ItemIds', namespaces=NAMESPACES), u'ids')
+        return root
+
+    ids = exchange_id if isinstance(exchange_id, list) else [exchange_id]
+    return _template((u'GetItem', format), build).render(ids=[{u'id': id} for id in ids])
+
+
+def find_items(folder_id, query_string=None, format=u'Default', limit=None, offset=0, fields=None, restriction=None,
+               order_by=None):
+    # Restrictions carry constants (dates, addresses, search terms) that change from call to call, and a
+    # template for each of them would push the common requests out of the cache.
+    if restriction is not None:
+        return soap_request.find_items(folder_id, query_string=query_string, format=format, limit=limit,
+                                       offset=offset, fields=fields, restriction=restriction, order_by=order_by)
+
+    distinguished = folder_id in DISTINGUISHED_IDS
+    paged = bool(offset or (limit is not None))
+
+    def build():
+        return soap_request.find_items(
+            folder_id if distinguished else slot(u'folder_id'),
+            query_string=slot(u'query_string') if query_string else None,
+            format=format,
+            limit=slot(u'limit') if paged else None,
+            offset=slot(u'offset') if paged else 0,
+            fields=fields,
+            order_by=order_by,
+        )
+
+    key = (u'FindItem', folder_id if distinguished else None, bool(query_string), format, paged,
+           tuple(fields or ()), tuple(order_by or ()))
+    return _template(key, build).render(
+        folder_id=folder_id, query_string=query_string, limit=limit or 1000, offset=offset,
+    )
+
+
+def sync_calendar_items(calendar_id='calendar', format='Default', delegate_for=None, sync_state=None):
+    distinguished = calendar_id == 'calendar'
+
+    def build():
+        return soap_request.sync_calendar_items(
+            calendar_id=calendar_id if distinguished else slot(u'calendar_id'),
+            format=format,
+            delegate_for=slot(u'delegate_for') if delegate_for is not None else None,
+            sync_state=slot(u'sync_state') if sync_state else None,
+        )
+
+    key = (u'SyncFolderItems', distinguished, delegate_for is not None, bool(sync_state), format)
+    return _template(key, build).render(calendar_id=calendar_id, delegate_for=delegate_for, sync_state=sync_state)
+
+
+def get_user_availability(attendees, start, end, requested_view=u'FreeBusy', merged_free_busy_interval=30):
+    def build():
+        root = soap_request.get_user_availability([{u'email': slot(u'email')}], _PLACEHOLDER_TIME, _PLACEHOLDER_TIME,
+                                                  requested_view=requested_view,
+                                                  merged_free_busy_interval=merged_free_busy_interval)
+        repeat_children(root.find(u'm:MailboxDataArray', namespaces=NAMESPACES), u'mailboxes')
+        root.find(u't:FreeBusyViewOptions/t:TimeWindow/t:StartTime', namespaces=NAMESPACES).text = slot(u'start')
+        root.find(u't:FreeBusyViewOptions/t:TimeWindow/t:EndTime', namespaces=NAMESPACES).text = slot(u'end')
+        return root
+
+    key = (u'GetUserAvailabilityRequest', requested_view,
+           merged_free_busy_interval if requested_view in soap_request.MERGED_FREE_BUSY_VIEWS else None)
+    return _template(key, build).render(
+        mailboxes=[{u'email': attendee['email']} for attendee in attendees],
+        start=convert_datetime_to_utc(start).strftime(EXCHANGE_DATETIME_FORMAT),
+        end=convert_datetime_to_utc(end).strftime(EXCHANGE_DATETIME_FORMAT),
+    )
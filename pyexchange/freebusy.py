@@ -0,0 +1,234 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from pytz import utc
+
+from .base.calendar import FREE_BUSY_TENTATIVE, FREE_BUSY_BUSY, FREE_BUSY_OOF
+from .utils import convert_datetime_to_utc
+
+FreeSlot = namedtuple('FreeSlot', 'start end optional_conflicts')
+
+DEFAULT_BUSY_TYPES = (u'Busy', u'OOF', u'Tentative')
+DEFAULT_WORKING_DAYS = (0, 1, 2, 3, 4)  # Monday to Friday
+
+_MERGED_BUSY_TYPES = {
+    FREE_BUSY_TENTATIVE: u'Tentative',
+    FREE_BUSY_BUSY: u'Busy',
+    FREE_BUSY_OOF: u'OOF',
+}
+
+
+def find_free_slots(attendees, start, end, duration, granularity=timedelta(minutes=15),
+                    working_hours=None, working_days=DEFAULT_WORKING_DAYS, timezone=utc,
+                    busy_types=DEFAULT_BUSY_TYPES, merged_free_busy_interval=None, limit=None):
+    """
+    Finds the times between *start* and *end* when a meeting of length *duration* fits.
+
+    *attendees* are the dicts filled in by ``get_user_availability``: each one has either a "busy" list of
+    dicts with start_time/end_time/busy_type, or a "merged_free_busy" vector covering the window from *start*
+    in steps of *merged_free_busy_interval* minutes. An attendee with ``required=False`` doesn't block a
+    slot; instead every optional attendee who is busy adds their "weight" (default 1) to the slot's
+    optional_conflicts. Attendees without free/busy data (a failed lookup) are ignored.
+
+    If *working_hours* is a ``(datetime.time, datetime.time)`` pair, slots must fall within those hours on
+    *working_days* (0 is Monday) in *timezone*. Hours ending at or before they start, such as
+    ``(time(22), time(6))``, run past midnight and count as part of the day they start on.
+
+    Returns a list of :class:`FreeSlot` ordered by optional_conflicts and then by start time. Candidate
+    starts are *granularity* apart; busy times are rounded outwards to the same grid.
+
+    Every attendee's busy time is rasterized into a Python integer used as a bitset with one bit per grid
+    step, so combining attendees and sliding the meeting across the window are whole-window bitwise
+    operations rather than per-slot loops.
+    """
+    start = convert_datetime_to_utc(start)
+    end = convert_datetime_to_utc(end)
+
+    grid = _Grid(start, granularity)
+    size = grid.index_ceil(end)
+    span = grid.index_ceil(start + duration)
+
+    if size <= 0 or span <= 0 or span > size:
+        return []
+
+    window = (1 << size) - 1
+
+    # Anything past the end of the window blocks, so meetings can't run over it.
+    blocked = ((1 << span) - 1) << size
+    if working_hours is not None:
+        blocked |= window & ~_working_hours_mask(grid, start, end, working_hours, working_days, timezone)
+
+    optional = []
+    for attendee in attendees:
+        mask = _attendee_mask(grid, attendee, busy_types, merged_free_busy_interval)
+        if mask is None:
+            continue
+        if attendee.get('required', True):
+            blocked |= mask
+        else:
+            optional.append((mask, attendee.get('weight', 1)))
+
+    candidates = ~_dilate(blocked, span) & ((1 << (size - span + 1)) - 1)
+    if not candidates:
+        return []
+
+    # Bit-sliced counter: bit i of planes[j] is bit j of the optional conflict score for the slot at i.
+    planes = []
+    for mask, weight in optional:
+        conflicts = _dilate(mask, span) & candidates
+        plane = 0
+        while weight:
+            if weight & 1:
+                _add_to_counter(planes, conflicts, plane)
+            weight >>= 1
+            plane += 1
+
+    plane_bits = [_bits(plane) for plane in planes]
+
+    slots = []
+    for index in _set_bit_indexes(candidates):
+        score = 0
+        for j, bits in enumerate(plane_bits):
+            if index < len(bits) and bits[index] == u'1':
+                score |= 1 << j
+        slot_start = grid.time(index)
+        slots.append(FreeSlot(start=slot_start, end=slot_start + duration, optional_conflicts=score))
+
+    slots.sort(key=lambda slot: (slot.optional_conflicts, slot.start))
+
+    if limit is not None:
+        slots = slots[:limit]
+
+    return slots
+
+
+class _Grid(object):
+    """ Maps datetimes onto bit indexes, one bit per *granularity* from *start*. """
+
+    def __init__(self, start, granularity):
+        self.start = start
+        self.granularity = granularity
+        self.step_seconds = _total_seconds(granularity)
+
+    def index_floor(self, when):
+        return int(_total_seconds(when - self.start) // self.step_seconds)
+
+    def index_ceil(self, when):
+        return -int(-_total_seconds(when - self.start) // self.step_seconds)
+
+    def time(self, index):
+        return self.start + self.granularity * index
+
+    def interval_mask(self, interval_start, interval_end):
+        first = max(self.index_floor(interval_start), 0)
+        last = self.index_ceil(interval_end)
+        if last <= first:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+
+def _attendee_mask(grid, attendee, busy_types, merged_free_busy_interval):
+    busy = attendee.get('busy')
+    merged = attendee.get('merged_free_busy')
+
+    if busy is not None:
+        mask = 0
+        for event in busy:
+            if event.get('busy_type') not in busy_types:
+                continue
+            mask |= grid.interval_mask(_parse_time(event['start_time']), _parse_time(event['end_time']))
+        return mask
+
+    if merged is not None:
+        if not merged_free_busy_interval:
+            raise ValueError(u'merged_free_busy_interval is required to use merged free/busy data')
+
+        interval = timedelta(minutes=merged_free_busy_interval)
+        mask = 0
+        run_start = None
+        for i, value in enumerate(list(merged) + [None]):
+            is_busy = _MERGED_BUSY_TYPES.get(value) in busy_types
+            if is_busy and run_start is None:
+                run_start = i
+            elif not is_busy and run_start is not None:
+                mask |= grid.interval_mask(grid.start + interval * run_start, grid.start + interval * i)
+                run_start = None
+        return mask
+
+    return None
+
+
+def _working_hours_mask(grid, start, end, working_hours, working_days, timezone):
+    day_start, day_end = working_hours
+    mask = 0
+
+    day = start.astimezone(timezone).date() - timedelta(days=1)
+    last_day = end.astimezone(timezone).date()
+
+    # Hours that cross midnight end on the next day.
+    end_day_offset = timedelta(days=1 if day_end <= day_start else 0)
+
+    while day <= last_day:
+        if day.weekday() in working_days:
+            mask |= grid.interval_mask(_localize(timezone, datetime.combine(day, day_start)),
+                                       _localize(timezone, datetime.combine(day + end_day_offset, day_end)))
+        day += timedelta(days=1)
+
+    return mask
+
+
+def _dilate(mask, span):
+    """ Sets bit i wherever any of bits i .. i + span - 1 of *mask* is set. """
+    covered = 1
+    while covered < span:
+        step = min(covered, span - covered)
+        mask |= mask >> step
+        covered += step
+    return mask
+
+
+def _add_to_counter(planes, mask, plane):
+    carry = mask
+    while carry:
+        if plane == len(planes):
+            planes.append(0)
+        planes[plane], carry = planes[plane] ^ carry, planes[plane] & carry
+        plane += 1
+
+
+def _bits(mask):
+    """ The bits of *mask*, least significant first, as a string of '0' and '1'. """
+    return bin(mask)[:1:-1]
+
+
+def _set_bit_indexes(mask):
+    bits = _bits(mask)
+    index = bits.find(u'1')
+    while index != -1:
+        yield index
+        index = bits.find(u'1', index + 1)
+
+
+def _parse_time(value):
+    if isinstance(value, datetime):
+        return convert_datetime_to_utc(value)
+    # GetUserAvailability is requested in UTC and answers with fixed-width "YYYY-MM-DDTHH:MM:SS" times.
+    # Slicing them is several times faster than strptime, which matters with thousands of events.
+    return datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                    int(value[11:13]), int(value[14:16]), int(value[17:19]), tzinfo=utc)
+
+
+def _localize(timezone, value):
+    if hasattr(timezone, 'localize'):
+        return timezone.localize(value)
+    return value.replace(tzinfo=timezone)
+
+
+def _total_seconds(delta):
+    return delta.days * 86400 + delta.seconds + delta.microseconds / 1000000.0
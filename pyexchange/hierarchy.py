@@ -0,0 +1,115 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import threading
+import time
+from collections import namedtuple
+
+# The folder properties the index needs; the rest of each folder isn't fetched.
+INDEX_FIELDS = (u'folder:DisplayName', u'folder:ParentFolderId', u'folder:FolderClass', u'folder:ChildFolderCount')
+
+PATH_SEPARATOR = u'/'
+
+_FolderMaps = namedtuple('_FolderMaps', 'folders children ids_by_path paths_by_id')
+
+
+def _path_key(path):
+    return PATH_SEPARATOR.join(part.lower() for part in path.strip(PATH_SEPARATOR).split(PATH_SEPARATOR))
+
+
+class FolderIndex(object):
+    """
+    The folders under *root*, from one Deep folder search, for resolving paths without going to Exchange.
+
+    Paths are display names joined by slashes, starting below *root* (u'Inbox/Projects/X'), and are
+    matched ignoring case, as Exchange does. The index is loaded on first use, and loaded again on use once
+    it is older than *ttl* seconds, or whenever ``refresh()`` is called.
+
+    **Examples**::
+
+      folders = service.folder().index(ttl=300)
+      folder_id = folders.resolve(u'Inbox/Projects/X')
+    """
+
+    def __init__(self, folder_service, root=u'msgfolderroot', ttl=None):
+        self.folder_service = folder_service
+        self.root = root
+        self.ttl = ttl
+        self.loaded_at = None
+        self._maps = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        # The response cache would hand back the tree this index is being refreshed to replace.
+        folders = list(self.folder_service.find_folder(parent_id=self.root, traversal=u'Deep',
+                                                       fields=list(INDEX_FIELDS), use_cache=False))
+        self._maps = self._build(folders)
+        self.loaded_at = time.time()
+        return self
+
+    def _build(self, folders):
+        by_id = dict((folder.id, folder) for folder in folders)
+
+        # Folders whose parent isn't in the index hang off the root.
+        children = {None: []}
+        for folder in folders:
+            parent_id = folder.parent_id if folder.parent_id in by_id else None
+            children.setdefault(parent_id, []).append(folder.id)
+
+        paths_by_id = {}
+        pending = [(id, by_id[id].display_name or u'') for id in children[None]]
+        while pending:
+            id, path = pending.pop()
+            paths_by_id[id] = path
+            pending.extend((child, path + PATH_SEPARATOR + (by_id[child].display_name or u''))
+                           for child in children.get(id, ()))
+
+        ids_by_path = dict((_path_key(path), id) for id, path in paths_by_id.items())
+        return _FolderMaps(by_id, children, ids_by_path, paths_by_id)
+
+    def _current(self):
+        maps = self._maps
+        if maps is None or (self.ttl is not None and time.time() - self.loaded_at >= self.ttl):
+            with self._lock:
+                # Another thread may have loaded it while this one waited.
+                if self._maps is maps:
+                    self.refresh()
+            maps = self._maps
+        return maps
+
+    def __len__(self):
+        return len(self._current().folders)
+
+    def __iter__(self):
+        return iter(list(self._current().folders.values()))
+
+    def get(self, id):
+        """ Returns the folder with this id, or None. """
+        return self._current().folders.get(id)
+
+    def resolve(self, path):
+        """ Returns the id of the folder at *path*, or None. """
+        return self._current().ids_by_path.get(_path_key(path))
+
+    def folder(self, path):
+        """ Returns the folder at *path*, or None. """
+        maps = self._current()
+        return maps.folders.get(maps.ids_by_path.get(_path_key(path)))
+
+    def path_of(self, id):
+        """ Returns the path of the folder with this id, or None. """
+        return self._current().paths_by_id.get(id)
+
+    def parent(self, id):
+        """ Returns the parent of the folder with this id, or None for the folders right under the root. """
+        maps = self._current()
+        folder = maps.folders.get(id)
+        return maps.folders.get(folder.parent_id) if folder is not None else None
+
+    def children(self, id=None):
+        """ Returns the folders right under the folder with this id, or right under the root. """
+        maps = self._current()
+        return [maps.folders[child] for child in maps.children.get(id, ())]
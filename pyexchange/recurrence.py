@@ -0,0 +1,141 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+from calendar import monthrange
+from datetime import datetime, timedelta
+
+from pytz import utc
+
+from .base.calendar import ExchangeEventOccurrence
+from .utils import convert_datetime_to_utc
+
+# Exchange starts weeks on Sunday unless told otherwise.
+WEEKDAY_OFFSETS = {
+    u'Sunday': 0, u'Monday': 1, u'Tuesday': 2, u'Wednesday': 3, u'Thursday': 4, u'Friday': 5, u'Saturday': 6,
+}
+
+
+def expand_recurrence(start, end, recurrence, window_start, window_end, timezone, interval=1, days=None,
+                      end_date=None, count=None, modified_occurrences=None, deleted_occurrences=None):
+    """
+    Lists the occurrences of a recurring series that overlap the window from *window_start* to *window_end*.
+
+    *start* and *end* are the times of the first occurrence. *recurrence* is one of 'daily', 'weekly', 'monthly'
+    or 'yearly', as parsed from a recurring master, with *interval* and (for weekly series) the space separated
+    *days* to repeat on. The series stops after *end_date* (inclusive) or after *count* occurrences.
+
+    *timezone* is the meeting's time zone. Weekdays, month days and dates are worked out in it, and occurrences
+    keep the wall clock time of the first one in it across daylight saving time changes, so a series on Mondays
+    at 9:00 in Los Angeles stays on Mondays even though it is Tuesday in UTC by then.
+
+    *modified_occurrences* are :class:`ExchangeEventOccurrence` exceptions to the series, which replace the
+    occurrence at their original_start. *deleted_occurrences* are the original start times of cancelled
+    occurrences.
+
+    Returns a list of :class:`ExchangeEventOccurrence` sorted by start, in UTC. Occurrences that haven't been
+    modified have no id.
+    """
+    start = convert_datetime_to_utc(start)
+    end = convert_datetime_to_utc(end)
+    window_start = convert_datetime_to_utc(window_start)
+    window_end = convert_datetime_to_utc(window_end)
+
+    interval = interval or 1
+    duration = end - start
+    local_start = start.astimezone(timezone).replace(tzinfo=None)
+
+    modified = dict((convert_datetime_to_utc(o.original_start), o) for o in modified_occurrences or [])
+    deleted = set(convert_datetime_to_utc(d) for d in deleted_occurrences or [])
+
+    # Without a count, the dates before the window can be skipped over rather than generated one by one.
+    skip_to = None
+    if count is None:
+        skip_to = (window_start - duration).astimezone(timezone).date()
+
+    result = []
+    for number, day in enumerate(_occurrence_dates(local_start.date(), recurrence, interval, days, skip_to)):
+        if count is not None and number >= count:
+            break
+        if end_date is not None and day > end_date:
+            break
+
+        occurrence_start = _to_utc(timezone, datetime.combine(day, local_start.time()))
+        if occurrence_start >= window_end:
+            break
+
+        if occurrence_start in deleted or occurrence_start in modified:
+            continue
+
+        if occurrence_start + duration > window_start:
+            result.append(ExchangeEventOccurrence(id=None, start=occurrence_start, end=occurrence_start + duration,
+                                                  original_start=occurrence_start))
+
+    # Exceptions can be moved into the window from anywhere, so check each of them on its own.
+    for occurrence in modified.values():
+        if occurrence.original_start in deleted:
+            continue
+        if convert_datetime_to_utc(occurrence.start) < window_end and convert_datetime_to_utc(occurrence.end) > window_start:
+            result.append(occurrence)
+
+    result.sort(key=lambda o: convert_datetime_to_utc(o.start))
+    return result
+
+
+def _occurrence_dates(first, recurrence, interval, days, skip_to=None):
+    """ Yields the dates of the series in order, starting from *first* (or the last period before *skip_to*). """
+    if recurrence == u'daily':
+        step = 0
+        if skip_to is not None and skip_to > first:
+            step = (skip_to - first).days // interval
+        while True:
+            yield first + timedelta(days=step * interval)
+            step += 1
+
+    elif recurrence == u'weekly':
+        if not days:
+            raise ValueError(u'Weekly recurrences need recurrence_days')
+        offsets = sorted(WEEKDAY_OFFSETS[day] for day in days.split())
+        week_start = first - timedelta(days=(first.weekday() + 1) % 7)
+        step = 0
+        if skip_to is not None and skip_to > week_start:
+            step = (skip_to - week_start).days // (7 * interval)
+        while True:
+            for offset in offsets:
+                day = week_start + timedelta(days=step * 7 * interval + offset)
+                if day >= first:
+                    yield day
+            step += 1
+
+    elif recurrence == u'monthly':
+        step = 0
+        if skip_to is not None and skip_to > first:
+            step = ((skip_to.year - first.year) * 12 + skip_to.month - first.month) // interval
+        while True:
+            month_index = first.month - 1 + step * interval
+            yield _clamped_date(first.year + month_index // 12, month_index % 12 + 1, first.day)
+            step += 1
+
+    elif recurrence == u'yearly':
+        step = 0
+        if skip_to is not None and skip_to > first:
+            step = skip_to.year - first.year
+        while True:
+            yield _clamped_date(first.year + step, first.month, first.day)
+            step += 1
+
+    else:
+        raise ValueError(u'Unsupported recurrence: %s' % recurrence)
+
+
+def _clamped_date(year, month, day):
+    # Like Outlook, a series on the 31st falls on the last day of shorter months.
+    return datetime(year, month, min(day, monthrange(year, month)[1])).date()
+
+
+def _to_utc(timezone, value):
+    if hasattr(timezone, 'localize'):
+        return timezone.localize(value).astimezone(utc)
+    return value.replace(tzinfo=timezone).astimezone(utc)
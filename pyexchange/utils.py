@@ -4,7 +4,10 @@ Licensed under the Apache License, Version 2.0 (the "License");?you may not use
 
 Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 """
+import threading
+
 from pytz import utc
+from six.moves import queue
 
 
 def convert_datetime_to_utc(datetime_to_convert):
@@ -15,3 +18,157 @@ def convert_datetime_to_utc(datetime_to_convert):
         return datetime_to_convert.astimezone(utc)
     else:
         return utc.localize(datetime_to_convert)
+
+
+def chunks(items, size):
+    """ Splits a list into consecutive lists of at most *size* items. """
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_concurrently(func, args_list, max_workers=4):
+    """
+    Calls ``func(*args)`` for every tuple in *args_list*, using at most *max_workers* threads.
+
+    Returns a list of ``(result, exception)`` tuples in the same order as *args_list*. A call that raised
+    has a result of None and the exception it raised; the other calls are unaffected.
+    """
+    args_list = list(args_list)
+    results = [None] * len(args_list)
+
+    def call(index):
+        try:
+            results[index] = (func(*args_list[index]), None)
+        except Exception as err:
+            results[index] = (None, err)
+
+    if max_workers is None or max_workers <= 1 or len(args_list) <= 1:
+        for index in range(len(args_list)):
+            call(index)
+        return results
+
+    pending = queue.Queue()
+    for index in range(len(args_list)):
+        pending.put(index)
+
+    def worker():
+        while True:
+            try:
+                index = pending.get_nowait()
+            except queue.Empty:
+                return
+            call(index)
+
+    threads = [threading.Thread(target=worker) for _ in range(min(max_workers, len(args_list)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+def read_ahead(iterable, depth=1):
+    """
+    Iterates over *iterable* on a background thread, staying up to *depth* values ahead of the caller.
+
+    The thread stops once *depth* values are waiting, so memory stays bounded, and stops for good when the
+    caller stops iterating. An exception raised by *iterable* is raised to the caller in its place. With a
+    *depth* of 0 or None, *iterable* is simply iterated over.
+    """
+    if not depth:
+        for value in iterable:
+            yield value
+        return
+
+    values = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+    finished = object()
+
+    def put(entry):
+        while not stopped.is_set():
+            try:
+                values.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for value in iterable:
+                if not put((value, None)):
+                    return
+        except Exception as err:
+            put((finished, err))
+        else:
+            put((finished, None))
+
+    thread = threading.Thread(target=produce)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            value, error = values.get()
+            if value is finished:
+                if error is not None:
+                    raise error
+                return
+            yield value
+    finally:
+        stopped.set()
+
+
+def iter_concurrently(func, args_list, max_workers=4, ordered=True):
+    """
+    Like :func:`run_concurrently`, but yields each ``(result, exception)`` tuple as soon as it can: in the
+    order of *args_list* if *ordered*, otherwise as the calls finish. Once the caller stops iterating, no
+    more calls are started.
+    """
+    args_list = list(args_list)
+    if max_workers is None or max_workers <= 1 or len(args_list) <= 1:
+        for args in args_list:
+            try:
+                yield func(*args), None
+            except Exception as err:
+                yield None, err
+        return
+
+    pending = queue.Queue()
+    for index in range(len(args_list)):
+        pending.put(index)
+    finished = queue.Queue()
+    stopped = threading.Event()
+
+    def worker():
+        while not stopped.is_set():
+            try:
+                index = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                finished.put((index, func(*args_list[index]), None))
+            except Exception as err:
+                finished.put((index, None, err))
+
+    for _ in range(min(max_workers, len(args_list))):
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+
+    try:
+        waiting = {}
+        next_index = 0
+        for _ in range(len(args_list)):
+            index, result, error = finished.get()
+            if not ordered:
+                yield result, error
+                continue
+            waiting[index] = (result, error)
+            while next_index in waiting:
+                yield waiting.pop(next_index)
+                next_index += 1
+    finally:
+        stopped.set()
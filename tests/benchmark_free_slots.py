@@ -0,0 +1,55 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+
+Times finding free slots over a working week for growing numbers of attendees, each with a full calendar.
+The time per attendee should stay flat:
+
+  python -m tests.benchmark_free_slots
+"""
+from __future__ import print_function
+
+import random
+import timeit
+from datetime import datetime, timedelta, time
+from pytz import utc
+
+from pyexchange.freebusy import find_free_slots
+
+ATTENDEE_COUNTS = (100, 250, 500, 1000)
+EVENTS_PER_DAY = 6
+START = datetime(year=2050, month=5, day=16, tzinfo=utc)  # a Monday
+END = START + timedelta(days=5)
+
+
+def attendees(count):
+  rng = random.Random(count)
+  result = []
+  for i in range(count):
+    busy = []
+    for day in range(5):
+      for _ in range(EVENTS_PER_DAY):
+        event_start = START + timedelta(days=day, hours=rng.randint(8, 17), minutes=rng.choice((0, 15, 30, 45)))
+        busy.append(dict(
+          start_time=event_start.strftime(u'%Y-%m-%dT%H:%M:%S'),
+          end_time=(event_start + timedelta(minutes=rng.choice((30, 60)))).strftime(u'%Y-%m-%dT%H:%M:%S'),
+          busy_type=u'Busy',
+        ))
+    # One attendee in five is optional, so the ranking is exercised too.
+    result.append({'email': u'person%s@test.linkedin.com' % i, 'busy': busy, 'required': i % 5 != 0})
+  return result
+
+
+def main():
+  for count in ATTENDEE_COUNTS:
+    people = attendees(count)
+    seconds = min(timeit.repeat(lambda: find_free_slots(people, START, END, timedelta(minutes=30),
+                                                        working_hours=(time(8), time(18)), limit=10),
+                                number=1, repeat=3))
+    print(u'{:>5} attendees: {:8.1f} ms, {:6.1f} us per attendee'.format(count, seconds * 1000, seconds * 1e6 / count))
+
+
+if __name__ == '__main__':
+  main()
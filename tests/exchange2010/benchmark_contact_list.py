@@ -0,0 +1,41 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+
+Times parsing a FindItem page of contacts, for pages of growing size. The time per contact should stay flat:
+
+  python -m tests.exchange2010.benchmark_contact_list
+"""
+from __future__ import print_function
+
+import timeit
+from lxml import etree
+from pyexchange import Exchange2010Service
+from pyexchange.exchange2010 import Exchange2010ContactList
+
+from .fixtures import FIND_ITEM_PAGE_RESPONSE, FIND_ITEM_PAGE_CONTACT
+from .test_paged_lists import FakeFolderConnection
+
+PAGE_SIZES = (125, 250, 500, 1000)
+
+
+def contact_page(size):
+  return etree.fromstring(FIND_ITEM_PAGE_RESPONSE.format(offset=size, total=size, last=u'true', items=u''.join(
+    FIND_ITEM_PAGE_CONTACT.format(id=u'item%s' % i, name=u'Contact %s' % i) for i in range(size)
+  )).encode('utf-8'))
+
+
+def main():
+  service = Exchange2010Service(connection=FakeFolderConnection(u'Contact', 0))
+
+  for size in PAGE_SIZES:
+    page = contact_page(size)
+    seconds = min(timeit.repeat(lambda: list(Exchange2010ContactList(service, u'contacts', xml_result=page).items),
+                                number=1, repeat=3))
+    print(u'{:>5} contacts: {:8.1f} ms, {:6.1f} us per contact'.format(size, seconds * 1000, seconds * 1e6 / size))
+
+
+if __name__ == '__main__':
+  main()
@@ -8,6 +8,7 @@ Unless required by applicable law or agreed to in writing, software?distributed
 from datetime import datetime, timedelta, date
 from pytz import utc
 from collections import namedtuple
+from pyexchange.connection import ExchangeBaseConnection
 from pyexchange.base.calendar import ExchangeEventOrganizer, ExchangeEventResponse, RESPONSE_ACCEPTED, RESPONSE_DECLINED, RESPONSE_TENTATIVE, RESPONSE_UNKNOWN
 from pyexchange.exchange2010.soap_request import EXCHANGE_DATE_FORMAT, EXCHANGE_DATETIME_FORMAT  # noqa
 
@@ -1715,3 +1716,140 @@ LIST_EVENTS_RESPONSE = u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/
     </m:FindItemResponse>
   </s:Body>
 </s:Envelope>"""
+
+GET_USER_AVAILABILITY_RESPONSE = u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Header>
+    <h:ServerVersionInfo MajorVersion="14" MinorVersion="3" MajorBuildNumber="174" MinorBuildNumber="1" Version="Exchange2010_SP2" xmlns:h="http://schemas.microsoft.com/exchange/services/2006/types" xmlns="http://schemas.microsoft.com/exchange/services/2006/types" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema"/>
+  </s:Header>
+  <s:Body xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema">
+    <m:GetUserAvailabilityResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:FreeBusyResponseArray>{responses}</m:FreeBusyResponseArray>
+    </m:GetUserAvailabilityResponse>
+  </s:Body>
+</s:Envelope>"""
+
+FREE_BUSY_RESPONSE = u"""
+        <m:FreeBusyResponse>
+          <m:ResponseMessage ResponseClass="Success">
+            <m:ResponseCode>NoError</m:ResponseCode>
+          </m:ResponseMessage>
+          <m:FreeBusyView>
+            <t:FreeBusyViewType>FreeBusy</t:FreeBusyViewType>
+            <t:CalendarEventArray>
+              <t:CalendarEvent>
+                <t:StartTime>{start}</t:StartTime>
+                <t:EndTime>{end}</t:EndTime>
+                <t:BusyType>Busy</t:BusyType>
+              </t:CalendarEvent>
+            </t:CalendarEventArray>
+          </m:FreeBusyView>
+        </m:FreeBusyResponse>"""
+
+FREE_BUSY_ERROR_RESPONSE = u"""
+        <m:FreeBusyResponse>
+          <m:ResponseMessage ResponseClass="Error">
+            <m:MessageText>Unable to resolve e-mail address to a valid account.</m:MessageText>
+            <m:ResponseCode>ErrorMailRecipientNotFound</m:ResponseCode>
+          </m:ResponseMessage>
+        </m:FreeBusyResponse>"""
+
+MERGED_FREE_BUSY_RESPONSE = u"""
+        <m:FreeBusyResponse>
+          <m:ResponseMessage ResponseClass="Success">
+            <m:ResponseCode>NoError</m:ResponseCode>
+          </m:ResponseMessage>
+          <m:FreeBusyView>
+            <t:FreeBusyViewType>MergedOnly</t:FreeBusyViewType>
+            <t:MergedFreeBusy>{merged}</t:MergedFreeBusy>
+          </m:FreeBusyView>
+        </m:FreeBusyResponse>"""
+
+BATCH_ITEM_RESPONSE = u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Header>
+    <h:ServerVersionInfo xmlns:h="http://schemas.microsoft.com/exchange/services/2006/types" xmlns="http://schemas.microsoft.com/exchange/services/2006/types" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema" MajorVersion="14" MinorVersion="3" MajorBuildNumber="195" MinorBuildNumber="1"/>
+  </s:Header>
+  <s:Body xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema">
+    <m:{operation}Response xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>{messages}
+      </m:ResponseMessages>
+    </m:{operation}Response>
+  </s:Body>
+</s:Envelope>"""
+
+BATCH_ITEM_RESPONSE_MESSAGE = u"""
+        <m:{operation}ResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Items>
+            <t:CalendarItem>
+              <t:ItemId Id="{id}" ChangeKey="{change_key}"/>
+            </t:CalendarItem>
+          </m:Items>
+        </m:{operation}ResponseMessage>"""
+
+BATCH_ITEM_ERROR_MESSAGE = u"""
+        <m:{operation}ResponseMessage ResponseClass="Error">
+          <m:MessageText>The request failed.</m:MessageText>
+          <m:ResponseCode>{code}</m:ResponseCode>
+          <m:DescriptiveLinkKey>0</m:DescriptiveLinkKey>
+          <m:Items/>
+        </m:{operation}ResponseMessage>"""
+
+CONVERT_ID_RESPONSE_MESSAGE = u"""
+        <m:ConvertIdResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:AlternateId xsi:type="t:AlternateIdType" Format="{format}" Id="{id}" Mailbox="a@b.com"/>
+        </m:ConvertIdResponseMessage>"""
+
+FIND_ITEM_PAGE_RESPONSE = u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema">
+    <m:FindItemResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages" xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>
+        <m:FindItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:RootFolder IndexedPagingOffset="{offset}" TotalItemsInView="{total}" IncludesLastItemInRange="{last}">
+            <t:Items>{items}
+            </t:Items>
+          </m:RootFolder>
+        </m:FindItemResponseMessage>
+      </m:ResponseMessages>
+    </m:FindItemResponse>
+  </s:Body>
+</s:Envelope>"""
+
+FIND_ITEM_PAGE_ITEM = u"""
+              <t:{type}>
+                <t:ItemId Id="{id}" ChangeKey="ck"/>
+                <t:Subject>{subject}</t:Subject>
+                <t:DisplayName>{subject}</t:DisplayName>
+              </t:{type}>"""
+
+FIND_ITEM_PAGE_CONTACT = u"""
+              <t:Contact>
+                <t:ItemId Id="{id}" ChangeKey="ck"/>
+                <t:DisplayName>{name}</t:DisplayName>
+                <t:EmailAddresses>
+                  <t:Entry Key="EmailAddress1">{id}@test.linkedin.com</t:Entry>
+                </t:EmailAddresses>
+                <t:PhysicalAddresses>
+                  <t:Entry Key="Business">
+                    <t:Street>{id} Main Street</t:Street>
+                    <t:City>Sunnyvale</t:City>
+                  </t:Entry>
+                  <t:Entry Key="Home">
+                    <t:Street>{id} Home Street</t:Street>
+                    <t:PostalCode>94085</t:PostalCode>
+                  </t:Entry>
+                </t:PhysicalAddresses>
+              </t:Contact>"""
+
+
+class FakeCallbackConnection(ExchangeBaseConnection):
+  """ Answers each request with an HTTPretty body *callback*. HTTPretty isn't thread safe, so concurrent batches use this. """
+
+  def __init__(self, callback):
+    self.url = FAKE_EXCHANGE_URL
+    self.callback = callback
+
+  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
+    request = type('FakeRequest', (object,), {'body': body})
+    return self.callback(request, self.url, {})[2].decode('utf-8')
@@ -0,0 +1,253 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import re
+import threading
+import unittest
+from httpretty import HTTPretty, httprettified
+from pytest import raises
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exchange2010 import Exchange2010CalendarUpdateQueue
+from pyexchange.exceptions import *  # noqa
+
+from .fixtures import *  # noqa
+
+SENT_REQUESTS = []
+
+
+def fake_item_response(request, uri, headers):
+  """
+  Answers UpdateItem, DeleteItem, MoveItem and IdOnly GetItem requests for every ItemId in them.
+
+  Items with the change key "STALE" are rejected, "MISSING" items don't exist, and GetItem hands out "FRESH" keys.
+  """
+  body = request.body.decode('utf-8')
+  SENT_REQUESTS.append(body)
+  operation = re.search(r'<m:(UpdateItem|DeleteItem|MoveItem|GetItem)\b', body).group(1)
+
+  messages = []
+  for id, change_key in re.findall(r'<t:ItemId Id="([^"]*)"(?: ChangeKey="([^"]*)")?/>', body):
+    if id == u'MISSING':
+      messages.append(BATCH_ITEM_ERROR_MESSAGE.format(operation=operation, code=u'ErrorItemNotFound'))
+    elif change_key == u'STALE':
+      messages.append(BATCH_ITEM_ERROR_MESSAGE.format(operation=operation, code=u'ErrorChangeKeyRequiredForWriteOperations'))
+    elif operation == u'GetItem':
+      messages.append(BATCH_ITEM_RESPONSE_MESSAGE.format(operation=operation, id=id, change_key=u'FRESH'))
+    elif operation == u'MoveItem':
+      messages.append(BATCH_ITEM_RESPONSE_MESSAGE.format(operation=operation, id=u'MOVED' + id, change_key=u'MOVEDKEY'))
+    else:
+      messages.append(BATCH_ITEM_RESPONSE_MESSAGE.format(operation=operation, id=id, change_key=u'NEWKEY'))
+
+  response = BATCH_ITEM_RESPONSE.format(operation=operation, messages=u''.join(messages))
+  return [200, headers, response.encode('utf-8')]
+
+
+class Test_BulkEventActions(unittest.TestCase):
+  calendar = None
+
+  @classmethod
+  def setUpClass(cls):
+    cls.calendar = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD,
+      )
+    ).calendar()
+
+  def setUp(self):
+    del SENT_REQUESTS[:]
+    HTTPretty.enable()
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=fake_item_response,
+      content_type='text/xml; charset=utf-8',
+    )
+
+  def tearDown(self):
+    HTTPretty.disable()
+    HTTPretty.reset()
+
+  def _events(self, *change_keys):
+    events = []
+    for i, change_key in enumerate(change_keys):
+      event = self.calendar.new_event(subject=u'event%s' % i, start=TEST_EVENT.start, end=TEST_EVENT.end)
+      event._id = u'MISSING' if change_key == u'MISSING' else u'ID%s' % i
+      event._change_key = change_key
+      event._reset_dirty_attributes()
+      events.append(event)
+    return events
+
+  def test_updates_are_batched(self):
+    events = self._events(u'KEY', u'KEY', u'KEY')
+    for event in events:
+      event.location = u'Room 2'
+
+    results = self.calendar.update_events(events, batch_size=2)
+
+    assert len(SENT_REQUESTS) == 2
+    assert SENT_REQUESTS[0].count(u'<t:ItemChange>') == 2
+    assert all(result.error is None for result in results)
+    assert [event.change_key for event in events] == [u'NEWKEY'] * 3
+    assert not events[0]._dirty_attributes
+
+  def test_events_without_changes_are_not_sent(self):
+    events = self._events(u'KEY', u'KEY')
+    events[1].location = u'Room 2'
+
+    results = self.calendar.update_events(events)
+
+    assert SENT_REQUESTS[0].count(u'<t:ItemChange>') == 1
+    assert results[0].response_code is None
+    assert results[1].response_code == u'NoError'
+
+  def test_stale_change_keys_are_refreshed_and_retried(self):
+    events = self._events(u'KEY', u'STALE', u'MISSING')
+
+    results = self.calendar.cancel_events(events)
+
+    assert len(SENT_REQUESTS) == 3
+    assert u'<m:GetItem' in SENT_REQUESTS[1]
+    assert u'ID0' not in SENT_REQUESTS[1]
+    assert u'ChangeKey="FRESH"' in SENT_REQUESTS[2]
+
+    assert results[0].error is None
+    assert results[1].error is None
+    assert isinstance(results[2].error, ExchangeItemNotFoundException)
+
+  def test_stale_change_keys_can_be_reported_instead(self):
+    events = self._events(u'STALE')
+
+    results = self.calendar.cancel_events(events, retry_stale=False)
+
+    assert len(SENT_REQUESTS) == 1
+    assert isinstance(results[0].error, ExchangeStaleChangeKeyException)
+
+  def test_moved_events_get_new_ids(self):
+    events = self._events(u'KEY', u'KEY')
+
+    results = self.calendar.move_events(events, u'OTHER')
+
+    assert len(SENT_REQUESTS) == 1
+    assert [event.id for event in events] == [u'MOVEDID0', u'MOVEDID1']
+    assert all(event.calendar_id == u'OTHER' for event in events)
+    assert results[0].change_key == u'MOVEDKEY'
+
+  def test_events_that_were_never_created_are_reported(self):
+    event = self.calendar.new_event(subject=u'new')
+
+    results = self.calendar.cancel_events([event])
+
+    assert isinstance(results[0].error, TypeError)
+    assert SENT_REQUESTS == []
+
+  def test_move_needs_a_folder(self):
+    with raises(TypeError):
+      self.calendar.move_events(self._events(u'KEY'), None)
+
+
+class FakeCalendar(object):
+  """ Records the events each flush would save. """
+
+  def __init__(self):
+    self.flushed = []
+    self.flushed_event = threading.Event()
+
+  def update_events(self, events, **kwargs):
+    self.flushed.append([(event.id, set(event._dirty_attributes)) for event in events])
+    self.flushed_event.set()
+    return events
+
+
+class Test_UpdateQueue(unittest.TestCase):
+  calendar = None
+
+  @classmethod
+  def setUpClass(cls):
+    cls.calendar = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD,
+      )
+    ).calendar()
+
+  def _event(self, id):
+    event = self.calendar.new_event(subject=u'event', start=TEST_EVENT.start, end=TEST_EVENT.end)
+    event._id = id
+    event._change_key = u'KEY'
+    event._reset_dirty_attributes()
+    return event
+
+  def test_changes_to_the_same_event_are_merged(self):
+    fake = FakeCalendar()
+    queue = Exchange2010CalendarUpdateQueue(fake, flush_interval=None)
+
+    event = self._event(u'ID1')
+    event.location = u'Room 2'
+    queue.add(event)
+    event.subject = u'New subject'
+    queue.add(event)
+
+    copy = self._event(u'ID1')
+    copy.text_body = u'body'
+    queue.add(copy)
+
+    assert len(queue) == 1
+    queue.flush()
+
+    assert fake.flushed == [[(u'ID1', set([u'location', u'subject', u'text_body']))]]
+    assert copy.location == u'Room 2'
+
+  def test_queue_flushes_when_full(self):
+    fake = FakeCalendar()
+    queue = Exchange2010CalendarUpdateQueue(fake, flush_interval=None, max_pending=2)
+
+    for id in (u'ID1', u'ID2', u'ID3'):
+      event = self._event(id)
+      event.location = u'Room 2'
+      queue.add(event)
+
+    assert [[id for id, _ in batch] for batch in fake.flushed] == [[u'ID1', u'ID2']]
+    assert len(queue) == 1
+
+  def test_queue_flushes_on_a_timer(self):
+    fake = FakeCalendar()
+    queue = Exchange2010CalendarUpdateQueue(fake, flush_interval=0.01)
+
+    event = self._event(u'ID1')
+    event.location = u'Room 2'
+    queue.add(event)
+
+    assert fake.flushed_event.wait(5)
+    assert len(queue) == 0
+
+  def test_unchanged_events_are_not_queued(self):
+    queue = Exchange2010CalendarUpdateQueue(FakeCalendar(), flush_interval=None)
+
+    queue.add(self._event(u'ID1'))
+
+    assert len(queue) == 0
+
+  @httprettified
+  def test_flush_sends_one_update_request(self):
+    del SENT_REQUESTS[:]
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=fake_item_response,
+      content_type='text/xml; charset=utf-8',
+    )
+    events = [self._event(u'ID1'), self._event(u'ID2')]
+
+    with self.calendar.update_queue(flush_interval=None) as queue:
+      for event in events:
+        event.location = u'Room 2'
+        queue.add(event)
+
+    assert len(SENT_REQUESTS) == 1
+    assert SENT_REQUESTS[0].count(u'<t:ItemChange>') == 2
+    assert [event.change_key for event in events] == [u'NEWKEY', u'NEWKEY']
@@ -0,0 +1,140 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import re
+import threading
+import unittest
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeBaseConnection
+
+from .fixtures import *  # noqa
+
+CONTACT = u"""
+              <t:Contact>
+                <t:ItemId Id="{id}" ChangeKey="{change_key}"/>
+                <t:DisplayName>{display_name}</t:DisplayName>
+                <t:EmailAddresses>
+                  <t:Entry Key="EmailAddress1">{email}</t:Entry>
+                </t:EmailAddresses>
+                <t:CompleteName>
+                  <t:FirstName>{first_name}</t:FirstName>
+                  <t:LastName>{last_name}</t:LastName>
+                </t:CompleteName>
+              </t:Contact>"""
+
+
+class FakeContactsConnection(ExchangeBaseConnection):
+  """ A contacts folder that can be changed between requests. """
+
+  def __init__(self):
+    self.url = FAKE_EXCHANGE_URL
+    self.contacts = {}
+    self.requests = []
+
+  def put(self, id, first_name, last_name, email, change_key=u'ck1'):
+    self.contacts[id] = dict(id=id, change_key=change_key, first_name=first_name, last_name=last_name,
+                             display_name=u'%s %s' % (first_name, last_name), email=email)
+
+  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
+    body = body.decode('utf-8')
+    self.requests.append(body)
+
+    if u'<m:FindItem' in body:
+      return FIND_ITEM_PAGE_RESPONSE.format(
+        offset=len(self.contacts), total=len(self.contacts), last=u'true',
+        items=u''.join(CONTACT.format(**contact) for _, contact in sorted(self.contacts.items())),
+      )
+
+    messages = [u"""
+        <m:GetItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Items>%s</m:Items>
+        </m:GetItemResponseMessage>""" % CONTACT.format(**self.contacts[id])
+                for id in re.findall(u'ItemId Id="([^"]+)"', body)]
+    return BATCH_ITEM_RESPONSE.format(operation=u'GetItem', messages=u''.join(messages))
+
+
+class Test_ContactDirectory(unittest.TestCase):
+
+  def setUp(self):
+    self.connection = FakeContactsConnection()
+    self.connection.put(u'c1', u'Ann', u'Smith', u'ann@test.linkedin.com')
+    self.connection.put(u'c2', u'Annabel', u'Jones', u'annabel@test.linkedin.com')
+    self.connection.put(u'c3', u'Bob', u'Anderson', u'Bob@Test.LinkedIn.com')
+
+    self.directory = Exchange2010Service(connection=self.connection).contacts().directory()
+    assert self.directory.refresh() == 3
+
+  def names(self, contacts):
+    return sorted(contact.display_name for contact in contacts)
+
+  def test_names_are_searched_by_prefix(self):
+    assert self.names(self.directory.search(u'ann')) == [u'Ann Smith', u'Annabel Jones']
+    assert self.names(self.directory.search(u'AND')) == [u'Bob Anderson']
+    assert self.names(self.directory.search(u'an')) == [u'Ann Smith', u'Annabel Jones', u'Bob Anderson']
+    assert self.directory.search(u'zed') == []
+    assert len(self.directory.search(u'an', limit=1)) == 1
+
+  def test_emails_are_looked_up_ignoring_case(self):
+    assert self.directory.by_email(u'bob@test.linkedin.com').id == u'c3'
+    assert self.directory.by_email(u'nobody@test.linkedin.com') is None
+
+  def test_lookups_stay_local(self):
+    sent = len(self.connection.requests)
+
+    self.directory.search(u'a')
+    self.directory.by_email(u'ann@test.linkedin.com')
+
+    assert len(self.connection.requests) == sent
+
+  def test_refresh_only_fetches_changes(self):
+    self.connection.put(u'c1', u'Anne', u'Smith', u'anne@test.linkedin.com', change_key=u'ck2')
+    self.connection.put(u'c4', u'Carol', u'White', u'carol@test.linkedin.com')
+    del self.connection.contacts[u'c2']
+    del self.connection.requests[:]
+
+    assert self.directory.refresh() == 2
+
+    assert u'<t:BaseShape>IdOnly</t:BaseShape>' in self.connection.requests[0]
+    assert re.findall(u'ItemId Id="([^"]+)"', self.connection.requests[1]) in ([u'c1', u'c4'], [u'c4', u'c1'])
+    assert len(self.directory) == 3
+    assert self.names(self.directory.search(u'ann')) == [u'Anne Smith']
+    assert self.directory.by_email(u'ann@test.linkedin.com') is None
+    assert self.directory.by_email(u'anne@test.linkedin.com').id == u'c1'
+    assert self.directory.by_email(u'annabel@test.linkedin.com') is None
+    assert self.names(self.directory.search(u'c')) == [u'Carol White']
+
+  def test_nothing_is_fetched_when_nothing_changed(self):
+    del self.connection.requests[:]
+
+    assert self.directory.refresh() == 0
+    assert len(self.connection.requests) == 1
+
+
+class Test_ConcurrentRefresh(unittest.TestCase):
+
+  def test_only_one_thread_loads_the_folder(self):
+    class SlowContactsConnection(FakeContactsConnection):
+
+      def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
+        threading.Event().wait(0.05)
+        return super(SlowContactsConnection, self).send(body, headers, retries, timeout, encoding)
+
+    connection = SlowContactsConnection()
+    connection.put(u'c1', u'Ann', u'Smith', u'ann@test.linkedin.com')
+    directory = Exchange2010Service(connection=connection).contacts().directory()
+
+    fetched = []
+    threads = [threading.Thread(target=lambda: fetched.append(directory.refresh())) for _ in range(3)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    full_loads = [request for request in connection.requests if u'<t:BaseShape>AllProperties</t:BaseShape>' in request]
+    assert len(full_loads) == 1
+    assert sorted(fetched) == [0, 0, 1]
+    assert len(directory) == 1
@@ -0,0 +1,71 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import unittest
+from httpretty import HTTPretty, httprettified
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exceptions import *  # noqa
+
+from .fixtures import *  # noqa
+from .test_response_cache import SENT_REQUESTS, fake_convert_id_response
+
+
+class Test_ConvertIds(unittest.TestCase):
+
+  def setUp(self):
+    del SENT_REQUESTS[:]
+    self.service = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD,
+      )
+    )
+
+  @httprettified
+  def test_ids_are_converted_in_batches(self):
+    HTTPretty.register_uri(HTTPretty.POST, FAKE_EXCHANGE_URL, body=fake_convert_id_response)
+    ids = [u'id%s' % i for i in range(5)]
+
+    results = self.service.convert_ids(ids, u'EntryId', batch_size=2, max_workers=1)
+
+    assert len(SENT_REQUESTS) == 3
+    assert [result.item for result in results] == ids
+    assert [result.id for result in results] == [u'converted-' + id for id in ids]
+
+  @httprettified
+  def test_conversions_are_remembered(self):
+    HTTPretty.register_uri(HTTPretty.POST, FAKE_EXCHANGE_URL, body=fake_convert_id_response)
+
+    self.service.convert_ids([u'a', u'b'], u'EntryId', max_workers=1)
+    results = self.service.convert_ids([u'b', u'c', u'c'], u'EntryId', max_workers=1)
+
+    assert len(SENT_REQUESTS) == 2
+    assert SENT_REQUESTS[1].count(u'<t:AlternateId') == 1
+    assert [result.id for result in results] == [u'converted-b', u'converted-c', u'converted-c']
+
+    self.service.convert_ids([u'a'], u'OwaId', max_workers=1)
+    assert len(SENT_REQUESTS) == 3
+
+  @httprettified
+  def test_failures_are_reported_per_id(self):
+    HTTPretty.register_uri(HTTPretty.POST, FAKE_EXCHANGE_URL, body=fake_convert_id_response)
+
+    results = self.service.convert_ids([u'a', u'missing', u'b'], u'EntryId', max_workers=1)
+
+    assert results[1].id is None
+    assert isinstance(results[1].error, FailedExchangeException)
+    assert results[1].response_code == u'ErrorInvalidIdMalformed'
+    assert results[2].id == u'converted-b'
+
+  def test_batches_run_concurrently_in_order(self):
+    service = Exchange2010Service(connection=FakeCallbackConnection(fake_convert_id_response))
+    ids = [u'id%s' % i for i in range(25)]
+
+    results = service.convert_ids(ids, u'EntryId', batch_size=3, max_workers=4)
+
+    assert [result.id for result in results] == [u'converted-' + id for id in ids]
@@ -0,0 +1,102 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import re
+import unittest
+from httpretty import HTTPretty, httprettified
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exceptions import *  # noqa
+
+from .fixtures import *  # noqa
+
+SENT_REQUESTS = []
+
+
+def fake_create_response(request, uri, headers):
+  """ Creates every event except the ones whose subject starts with "reject". """
+  body = request.body.decode('utf-8')
+  SENT_REQUESTS.append(body)
+
+  messages = []
+  for i, subject in enumerate(re.findall(r'<t:Subject>([^<]*)</t:Subject>', body)):
+    if subject.startswith(u'reject'):
+      messages.append(BATCH_ITEM_ERROR_MESSAGE.format(operation=u'CreateItem', code=u'ErrorInvalidRecipients'))
+    else:
+      messages.append(BATCH_ITEM_RESPONSE_MESSAGE.format(operation=u'CreateItem', id=subject, change_key=u'KEY'))
+
+  response = BATCH_ITEM_RESPONSE.format(operation=u'CreateItem', messages=u''.join(messages))
+  return [200, headers, response.encode('utf-8')]
+
+
+class Test_CreatingManyEvents(unittest.TestCase):
+  calendar = None
+
+  @classmethod
+  def setUpClass(cls):
+    cls.calendar = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD,
+      )
+    ).calendar()
+
+  def _new_event(self, subject, **kwargs):
+    return self.calendar.new_event(subject=subject, start=TEST_EVENT.start, end=TEST_EVENT.end, **kwargs)
+
+  def _create_events(self, events, **kwargs):
+    del SENT_REQUESTS[:]
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=fake_create_response,
+      content_type='text/xml; charset=utf-8',
+    )
+    return self.calendar.create_events(events, **kwargs)
+
+  @httprettified
+  def test_events_are_created_in_batches(self):
+    events = [self._new_event(u'event%s' % i) for i in range(5)]
+
+    results = self._create_events(events, batch_size=2)
+
+    assert len(SENT_REQUESTS) == 3
+    assert [event.id for event in events] == [u'event%s' % i for i in range(5)]
+    assert all(event.change_key == u'KEY' for event in events)
+    assert all(result.error is None for result in results)
+
+  @httprettified
+  def test_rejected_events_do_not_fail_the_batch(self):
+    events = [self._new_event(u'event1'), self._new_event(u'reject2'), self._new_event(u'event3')]
+
+    results = self._create_events(events)
+
+    assert len(SENT_REQUESTS) == 1
+    assert [result.item for result in results] == events
+    assert results[1].response_code == u'ErrorInvalidRecipients'
+    assert isinstance(results[1].error, FailedExchangeException)
+    assert events[1].id is None
+    assert events[2].id == u'event3'
+
+  @httprettified
+  def test_events_are_grouped_by_calendar(self):
+    events = [self._new_event(u'event1'), self._new_event(u'event2'), self._new_event(u'event3')]
+    events[1].calendar_id = u'OTHER'
+
+    self._create_events(events)
+
+    assert len(SENT_REQUESTS) == 2
+    assert u'event1' in SENT_REQUESTS[0] and u'event3' in SENT_REQUESTS[0]
+    assert u'<t:FolderId Id="OTHER"/>' in SENT_REQUESTS[1]
+
+  @httprettified
+  def test_invalid_events_are_not_sent(self):
+    events = [self._new_event(u'event1'), self.calendar.new_event(subject=u'no times')]
+
+    results = self._create_events(events)
+
+    assert isinstance(results[1].error, ValueError)
+    assert u'no times' not in SENT_REQUESTS[0]
@@ -0,0 +1,115 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import unittest
+from pyexchange import Exchange2010Service
+from pyexchange.cache import ResponseCache
+from pyexchange.connection import ExchangeBaseConnection
+
+from .fixtures import *  # noqa
+
+FIND_FOLDER_PAGE_RESPONSE = u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:FindFolderResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
+                          xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>
+        <m:FindFolderResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:RootFolder IndexedPagingOffset="{count}" TotalItemsInView="{count}" IncludesLastItemInRange="true">
+            <t:Folders>{folders}
+            </t:Folders>
+          </m:RootFolder>
+        </m:FindFolderResponseMessage>
+      </m:ResponseMessages>
+    </m:FindFolderResponse>
+  </s:Body>
+</s:Envelope>"""
+
+FOLDER = u"""
+              <t:Folder>
+                <t:FolderId Id="{id}" ChangeKey="ck"/>
+                <t:ParentFolderId Id="{parent_id}" ChangeKey="ck"/>
+                <t:DisplayName>{name}</t:DisplayName>
+              </t:Folder>"""
+
+# id, parent id, display name
+FOLDERS = [
+  (u'inbox-id', u'root-id', u'Inbox'),
+  (u'projects-id', u'inbox-id', u'Projects'),
+  (u'x-id', u'projects-id', u'X'),
+  (u'y-id', u'projects-id', u'Y'),
+  (u'sent-id', u'root-id', u'Sent Items'),
+]
+
+
+class FakeFolderTreeConnection(ExchangeBaseConnection):
+
+  def __init__(self):
+    self.url = FAKE_EXCHANGE_URL
+    self.folders = list(FOLDERS)
+    self.requests = []
+
+  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
+    self.requests.append(body.decode('utf-8'))
+    return FIND_FOLDER_PAGE_RESPONSE.format(count=len(self.folders), folders=u''.join(
+      FOLDER.format(id=id, parent_id=parent_id, name=name) for id, parent_id, name in self.folders
+    ))
+
+
+class Test_FolderIndex(unittest.TestCase):
+
+  def setUp(self):
+    self.connection = FakeFolderTreeConnection()
+    self.index = Exchange2010Service(connection=self.connection).folder().index()
+
+  def test_paths_resolve_to_ids_and_back(self):
+    assert self.index.resolve(u'Inbox/Projects/X') == u'x-id'
+    assert self.index.resolve(u'/inbox/projects/x/') == u'x-id'
+    assert self.index.resolve(u'Inbox/Nothing') is None
+    assert self.index.path_of(u'y-id') == u'Inbox/Projects/Y'
+    assert self.index.folder(u'Sent Items').id == u'sent-id'
+
+  def test_the_tree_is_walked_both_ways(self):
+    assert sorted(folder.id for folder in self.index.children()) == [u'inbox-id', u'sent-id']
+    assert sorted(folder.id for folder in self.index.children(u'projects-id')) == [u'x-id', u'y-id']
+    assert self.index.parent(u'x-id').id == u'projects-id'
+    assert self.index.parent(u'inbox-id') is None
+    assert len(self.index) == 5
+
+  def test_one_deep_search_answers_every_lookup(self):
+    for _ in range(3):
+      self.index.resolve(u'Inbox/Projects/X')
+      self.index.path_of(u'x-id')
+
+    assert len(self.connection.requests) == 1
+    assert u'Traversal="Deep"' in self.connection.requests[0]
+    assert u'<t:BaseShape>IdOnly</t:BaseShape>' in self.connection.requests[0]
+    assert u'<t:FieldURI FieldURI="folder:DisplayName"/>' in self.connection.requests[0]
+
+  def test_the_index_is_reloaded_once_too_old(self):
+    self.index.ttl = 60
+    self.index.resolve(u'Inbox')
+    self.connection.folders.append((u'z-id', u'projects-id', u'Z'))
+
+    assert self.index.resolve(u'Inbox/Projects/Z') is None
+
+    self.index.loaded_at -= 61
+    assert self.index.resolve(u'Inbox/Projects/Z') == u'z-id'
+    assert len(self.connection.requests) == 2
+
+  def test_refreshing_skips_the_response_cache(self):
+    index = Exchange2010Service(connection=self.connection, response_cache=ResponseCache()).folder().index()
+    index.resolve(u'Inbox')
+    self.connection.folders.append((u'z-id', u'projects-id', u'Z'))
+
+    assert index.refresh().resolve(u'Inbox/Projects/Z') == u'z-id'
+    assert len(self.connection.requests) == 2
+
+  def test_folders_are_parsed_in_place(self):
+    folders = list(Exchange2010Service(connection=self.connection).folder().find_folder(u'root', traversal=u'Deep'))
+
+    assert [folder.display_name for folder in folders] == [name for _, _, name in FOLDERS]
+    assert [folder.parent_id for folder in folders] == [parent_id for _, parent_id, _ in FOLDERS]
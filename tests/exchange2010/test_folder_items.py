@@ -0,0 +1,74 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import unittest
+from pyexchange import Exchange2010Service
+from pyexchange.cache import ResponseCache
+from pyexchange.exchange2010.restrictions import Exists
+
+from .fixtures import *  # noqa
+from .test_paged_lists import FakeFolderConnection
+
+
+class FakeCountingConnection(FakeFolderConnection):
+
+  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
+    if b'<m:GetFolder' in body:
+      self.requests.append(body.decode('utf-8'))
+      return GET_FOLDER_RESPONSE
+    return super(FakeCountingConnection, self).send(body, headers, retries, timeout, encoding)
+
+
+class Test_ItemIds(unittest.TestCase):
+
+  def setUp(self):
+    self.connection = FakeCountingConnection(u'Message', 25)
+    self.service = Exchange2010Service(connection=self.connection, batch_size=10)
+
+  def test_ids_are_listed_without_loading_items(self):
+    ids = list(self.service.folder().iter_ids(u'inbox'))
+
+    assert [item_id.id for item_id in ids] == [u'item%s' % i for i in range(25)]
+    assert len(self.connection.requests) == 3
+    assert all(u'<t:BaseShape>IdOnly</t:BaseShape>' in request for request in self.connection.requests)
+    assert not any(u'<m:GetItem' in request for request in self.connection.requests)
+
+  def test_ids_can_be_read_ahead_and_restricted(self):
+    ids = list(self.service.folder().iter_ids(u'inbox', restriction=Exists(u'item:Subject'), read_ahead=1))
+
+    assert len(ids) == 25
+    assert u'<m:Restriction><t:Exists>' in self.connection.requests[0]
+
+
+class Test_Count(unittest.TestCase):
+
+  def setUp(self):
+    self.connection = FakeCountingConnection(u'Message', 25)
+    self.service = Exchange2010Service(connection=self.connection, batch_size=10)
+
+  def test_count_comes_from_the_folder(self):
+    assert self.service.folder().count(u'inbox') == 2
+    assert self.service.folder().count(u'inbox', unread=True) == 2
+
+    assert u'<t:FieldURI FieldURI="folder:TotalCount"/>' in self.connection.requests[0]
+    assert u'<t:FieldURI FieldURI="folder:UnreadCount"/>' in self.connection.requests[1]
+
+  def test_counts_are_not_answered_from_the_response_cache(self):
+    cache = ResponseCache()
+    service = Exchange2010Service(connection=self.connection, batch_size=10, response_cache=cache)
+
+    service.folder().count(u'inbox')
+    service.folder().count(u'inbox')
+
+    assert len(self.connection.requests) == 2
+    assert len(cache._entries) == 0
+
+  def test_restricted_counts_ask_for_a_single_item(self):
+    assert self.service.folder().count(u'inbox', unread=True, restriction=Exists(u'item:Subject')) == 25
+
+    assert len(self.connection.requests) == 1
+    assert u'MaxEntriesReturned="1"' in self.connection.requests[0]
+    assert u'<m:Restriction><t:And><t:Exists>' in self.connection.requests[0]
@@ -118,6 +118,19 @@ class Test_ParseEventResponseData(unittest.TestCase):
     assert conflicting_events[0].body == TEST_CONFLICT_EVENT.body
     assert conflicting_events[0].conflicting_event_ids[0] == TEST_EVENT.id
 
+  @httprettified
+  def test_conflicting_events_ask_only_for_the_fields(self):
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=CONFLICTING_EVENTS_RESPONSE.encode('utf-8'),
+      content_type='text/xml; charset=utf-8',
+    )
+    self.event.conflicting_events(fields=[u'item:Subject'])
+
+    request = HTTPretty.last_request.body.decode('utf-8')
+    assert u'<t:BaseShape>IdOnly</t:BaseShape>' in request
+    assert u'<t:FieldURI FieldURI="item:Subject"/>' in request
+
 
 class Test_FailingToGetEvents(unittest.TestCase):
 
@@ -337,6 +350,20 @@ class Test_GetOccurence(unittest.TestCase):
     assert type(occurrences) == list
     assert len(occurrences) == 0
 
+  @httprettified
+  def test_get_occurrences_ask_only_for_the_fields(self):
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=GET_DAILY_OCCURRENCES.encode('utf-8'),
+      content_type='text/xml; charset=utf-8',
+    )
+    occurrences = self.event.get_occurrence(range(5), fields=[u'item:Subject', u'calendar:Start'])
+
+    assert occurrences[0].subject == TEST_EVENT_DAILY_OCCURRENCES[0].subject
+    request = HTTPretty.last_request.body.decode('utf-8')
+    assert u'<t:BaseShape>IdOnly</t:BaseShape>' in request
+    assert u'<t:FieldURI FieldURI="item:Subject"/><t:FieldURI FieldURI="calendar:Start"/>' in request
+
 
 class Test_InvalidEventTypeFromSingle(unittest.TestCase):
   service = None
@@ -424,6 +451,20 @@ class Test_GetMaster(unittest.TestCase):
     with raises(InvalidEventType):
       master.get_master()
 
+  @httprettified
+  def test_get_master_asks_only_for_the_fields(self):
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=GET_RECURRING_MASTER_DAILY_EVENT.encode('utf-8'),
+      content_type='text/xml; charset=utf-8',
+    )
+    self.event.get_master(fields=[u'item:Subject'])
+
+    request = HTTPretty.last_request.body.decode('utf-8')
+    assert u'<t:BaseShape>IdOnly</t:BaseShape>' in request
+    assert u'<t:FieldURI FieldURI="item:Subject"/>' in request
+    assert u'<t:RecurringMasterItemId' in request
+
 
 class Test_GetConflictingEventsEmpty(unittest.TestCase):
   event = None
@@ -455,3 +496,72 @@ class Test_GetConflictingEventsEmpty(unittest.TestCase):
 
   def test_conflicting_events_empty(self):
     assert len(self.event.conflicting_events()) == 0
+
+
+EXPAND_START = datetime(year=2050, month=5, day=1, tzinfo=utc)
+EXPAND_END = datetime(year=2050, month=7, day=1, tzinfo=utc)
+
+
+class Test_ExpandOccurrences(unittest.TestCase):
+  service = None
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD
+      )
+    )
+
+  def _get_event(self, body, fixture):
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=body.encode('utf-8'),
+      content_type='text/xml; charset=utf-8',
+    )
+    return self.service.calendar(id=fixture.calendar_id).get_event(id=fixture.id)
+
+  @httprettified
+  def test_weekly_occurrences_are_expanded(self):
+    event = self._get_event(GET_RECURRING_MASTER_WEEKLY_EVENT, TEST_RECURRING_EVENT_WEEKLY)
+
+    occurrences = event.expand_occurrences(EXPAND_START, EXPAND_END, utc)
+
+    assert [o.start.day for o in occurrences] == [20, 23, 24, 27, 30, 31]
+    assert all(o.end - o.start == event.end - event.start for o in occurrences)
+    assert all(o.id is None for o in occurrences)
+
+  @httprettified
+  def test_modified_and_deleted_occurrences_are_merged(self):
+    body = GET_RECURRING_MASTER_DAILY_EVENT.replace(u'</t:Recurrence>', u"""</t:Recurrence>
+              <t:ModifiedOccurrences>
+                <t:Occurrence>
+                  <t:ItemId Id="MODIFIED" ChangeKey="MODIFIEDKEY"/>
+                  <t:Start>2050-05-22T08:00:00Z</t:Start>
+                  <t:End>2050-05-22T09:00:00Z</t:End>
+                  <t:OriginalStart>2050-05-21T20:42:50Z</t:OriginalStart>
+                </t:Occurrence>
+              </t:ModifiedOccurrences>
+              <t:DeletedOccurrences>
+                <t:DeletedOccurrence>
+                  <t:Start>2050-05-23T20:42:50Z</t:Start>
+                </t:DeletedOccurrence>
+              </t:DeletedOccurrences>""")
+    event = self._get_event(body, TEST_RECURRING_EVENT_DAILY)
+
+    assert event.modified_occurrences[0].id == u'MODIFIED'
+    assert event.deleted_occurrences == [datetime(year=2050, month=5, day=23, hour=20, minute=42, second=50, tzinfo=utc)]
+
+    occurrences = event.expand_occurrences(EXPAND_START, EXPAND_END, utc)
+
+    assert [(o.start.day, o.start.hour) for o in occurrences] == [(20, 20), (22, 8), (22, 20), (24, 20), (25, 20)]
+    assert occurrences[1].id == u'MODIFIED'
+
+  @httprettified
+  def test_only_recurring_masters_can_be_expanded(self):
+    event = self._get_event(GET_ITEM_RESPONSE, TEST_EVENT)
+
+    with raises(InvalidEventType):
+      event.expand_occurrences(EXPAND_START, EXPAND_END, utc)
@@ -0,0 +1,97 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import unittest
+from httpretty import HTTPretty
+from pyexchange import Exchange2010Service
+from pyexchange.cache import ItemCache
+from pyexchange.connection import ExchangeNTLMAuthConnection
+
+from .fixtures import *  # noqa
+from ..test_cache import FakeClock
+
+SENT_REQUESTS = []
+CURRENT_CHANGE_KEY = [TEST_EVENT.change_key]
+
+
+def fake_get_item_response(request, uri, headers):
+  body = request.body.decode('utf-8')
+  SENT_REQUESTS.append(body)
+
+  if u'IdOnly' in body:
+    message = BATCH_ITEM_RESPONSE_MESSAGE.format(operation=u'GetItem', id=TEST_EVENT.id, change_key=CURRENT_CHANGE_KEY[0])
+    return [200, headers, BATCH_ITEM_RESPONSE.format(operation=u'GetItem', messages=message).encode('utf-8')]
+
+  return [200, headers, GET_ITEM_RESPONSE.replace(TEST_EVENT.change_key, CURRENT_CHANGE_KEY[0]).encode('utf-8')]
+
+
+class Test_ItemCache(unittest.TestCase):
+
+  def setUp(self):
+    del SENT_REQUESTS[:]
+    CURRENT_CHANGE_KEY[0] = TEST_EVENT.change_key
+    self.clock = FakeClock()
+    self.service = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD,
+      ),
+      item_cache=ItemCache(max_age=10, clock=self.clock),
+    )
+    HTTPretty.enable()
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=fake_get_item_response,
+      content_type='text/xml; charset=utf-8',
+    )
+
+  def tearDown(self):
+    HTTPretty.disable()
+    HTTPretty.reset()
+
+  def test_repeat_reads_are_served_from_the_cache(self):
+    first = self.service.calendar().get_event(id=TEST_EVENT.id)
+    second = self.service.calendar().get_event(id=TEST_EVENT.id)
+
+    assert len(SENT_REQUESTS) == 1
+    assert second.subject == first.subject == TEST_EVENT.subject
+    assert second is not first
+
+  def test_old_entries_are_revalidated_with_id_only(self):
+    self.service.calendar().get_event(id=TEST_EVENT.id)
+    self.clock.now += 11
+
+    event = self.service.calendar().get_event(id=TEST_EVENT.id)
+
+    assert len(SENT_REQUESTS) == 2
+    assert u'IdOnly' in SENT_REQUESTS[1]
+    assert event.subject == TEST_EVENT.subject
+
+  def test_changed_items_are_fetched_again(self):
+    self.service.calendar().get_event(id=TEST_EVENT.id)
+    self.clock.now += 11
+    CURRENT_CHANGE_KEY[0] = u'CHANGED'
+
+    self.service.calendar().get_event(id=TEST_EVENT.id)
+
+    assert len(SENT_REQUESTS) == 3
+    assert u'AllProperties' in SENT_REQUESTS[2]
+    assert self.service.item_cache.change_key(TEST_EVENT.id) == u'CHANGED'
+
+  def test_writes_invalidate_the_cache(self):
+    event = self.service.calendar().get_event(id=TEST_EVENT.id)
+    self.service.calendar().cancel_events([event])
+
+    assert len(self.service.item_cache) == 0
+
+  def test_revalidate_cached_items_drops_changed_items(self):
+    self.service.calendar().get_event(id=TEST_EVENT.id)
+    CURRENT_CHANGE_KEY[0] = u'CHANGED'
+
+    self.service.revalidate_cached_items()
+
+    assert len(self.service.item_cache) == 0
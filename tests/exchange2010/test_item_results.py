@@ -0,0 +1,167 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import re
+import unittest
+from httpretty import HTTPretty, httprettified
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exceptions import *  # noqa
+from pyexchange.exchange2010 import soap_request
+
+from .fixtures import *  # noqa
+
+GET_ATTACHMENT_RESPONSE_MESSAGE = u"""
+        <m:GetAttachmentResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Attachments>
+            <t:FileAttachment>
+              <t:AttachmentId Id="{id}"/>
+              <t:Name>notes.txt</t:Name>
+              <t:Content>aGVsbG8=</t:Content>
+            </t:FileAttachment>
+          </m:Attachments>
+        </m:GetAttachmentResponseMessage>"""
+
+
+class Test_PartialSuccess(unittest.TestCase):
+
+  def setUp(self):
+    self.service = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD,
+      )
+    )
+
+  def respond(self, operation, *messages):
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=BATCH_ITEM_RESPONSE.format(operation=operation, messages=u''.join(messages)).encode('utf-8'),
+      content_type='text/xml; charset=utf-8',
+    )
+
+  @httprettified
+  def test_one_missing_item_does_not_fail_the_others(self):
+    self.respond(
+      u'GetItem',
+      BATCH_ITEM_RESPONSE_MESSAGE.format(operation=u'GetItem', id=u'id1', change_key=u'ck1'),
+      BATCH_ITEM_ERROR_MESSAGE.format(operation=u'GetItem', code=u'ErrorItemNotFound'),
+      BATCH_ITEM_RESPONSE_MESSAGE.format(operation=u'GetItem', id=u'id3', change_key=u'ck3'),
+    )
+
+    results = self.service.get_item_results([u'id1', u'id2', u'id3'])
+
+    assert [result.item for result in results] == [u'id1', u'id2', u'id3']
+    assert [result.response_code for result in results] == [u'NoError', u'ErrorItemNotFound', u'NoError']
+    assert results[0].error is None and results[0].change_key == u'ck1'
+    assert isinstance(results[1].error, ExchangeItemNotFoundException)
+    assert results[2].xml.find(u'm:Items/t:CalendarItem', namespaces=soap_request.NAMESPACES) is not None
+
+  @httprettified
+  def test_ids_are_fetched_in_batches(self):
+    batches = []
+
+    def respond(request, uri, headers):
+      ids = re.findall(r'ItemId Id="([^"]+)"', request.body.decode('utf-8'))
+      batches.append(ids)
+      messages = [BATCH_ITEM_RESPONSE_MESSAGE.format(operation=u'GetItem', id=id, change_key=u'ck') for id in ids]
+      return 200, headers, BATCH_ITEM_RESPONSE.format(operation=u'GetItem', messages=u''.join(messages)).encode('utf-8')
+
+    HTTPretty.register_uri(HTTPretty.POST, FAKE_EXCHANGE_URL, body=respond, content_type='text/xml; charset=utf-8')
+
+    results = self.service.get_item_results([u'id%s' % i for i in range(5)], batch_size=2)
+
+    assert [batch for batch in batches if batch] == [[u'id0', u'id1'], [u'id2', u'id3'], [u'id4']]
+    assert [result.id for result in results] == [u'id%s' % i for i in range(5)]
+
+  @httprettified
+  def test_delete_results_have_no_ids(self):
+    self.respond(
+      u'DeleteItem',
+      BATCH_ITEM_ERROR_MESSAGE.format(operation=u'DeleteItem', code=u'ErrorAccessDenied'),
+      BATCH_ITEM_ERROR_MESSAGE.format(operation=u'DeleteItem', code=u'NoError'),
+    )
+
+    results = self.service.send_items(soap_request.delete_events([TEST_EVENT, TEST_EVENT]), [1, 2])
+
+    assert isinstance(results[0].error, FailedExchangeException)
+    assert results[1].error is None
+    assert results[1].id is None
+
+  @httprettified
+  def test_attachment_results(self):
+    self.respond(
+      u'GetAttachment',
+      GET_ATTACHMENT_RESPONSE_MESSAGE.format(id=u'att1'),
+      BATCH_ITEM_ERROR_MESSAGE.format(operation=u'GetAttachment', code=u'ErrorInvalidIdMalformed'),
+    )
+
+    results = self.service.get_attachment_results([u'att1', u'att2'])
+
+    assert results[0].id == u'att1'
+    assert results[0].xml.findtext(u'.//t:Name', namespaces=soap_request.NAMESPACES) == u'notes.txt'
+    assert results[1].response_code == u'ErrorInvalidIdMalformed'
+
+  @httprettified
+  def test_soap_faults_still_raise(self):
+    HTTPretty.register_uri(HTTPretty.POST, FAKE_EXCHANGE_URL, body=u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body><s:Fault><faultcode>s:Client</faultcode><faultstring>bad</faultstring></s:Fault></s:Body>
+</s:Envelope>""", content_type='text/xml; charset=utf-8')
+
+    with self.assertRaises(FailedExchangeException):
+      self.service.send_items(soap_request.get_item([u'id1']), [u'id1'])
+
+
+GET_ITEM_TYPED_MESSAGE = u"""
+        <m:GetItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Items>
+            <t:{type}>
+              <t:ItemId Id="{id}" ChangeKey="ck"/>
+              <t:Subject>{type} subject</t:Subject>
+            </t:{type}>
+          </m:Items>
+        </m:GetItemResponseMessage>"""
+
+
+class Test_GetItems(unittest.TestCase):
+
+  def setUp(self):
+    self.service = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD,
+      )
+    )
+
+  @httprettified
+  def test_items_of_each_type_are_loaded_in_order(self):
+    messages = [
+      GET_ITEM_TYPED_MESSAGE.format(type=u'Task', id=u'task'),
+      GET_ITEM_TYPED_MESSAGE.format(type=u'Message', id=u'mail'),
+      BATCH_ITEM_ERROR_MESSAGE.format(operation=u'GetItem', code=u'ErrorItemNotFound'),
+      GET_ITEM_TYPED_MESSAGE.format(type=u'CalendarItem', id=u'event'),
+      GET_ITEM_TYPED_MESSAGE.format(type=u'Contact', id=u'contact'),
+      GET_ITEM_TYPED_MESSAGE.format(type=u'PostItem', id=u'post'),
+    ]
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=BATCH_ITEM_RESPONSE.format(operation=u'GetItem', messages=u''.join(messages)).encode('utf-8'),
+      content_type='text/xml; charset=utf-8',
+    )
+
+    items = self.service.get_items([u'task', u'mail', u'gone', u'event', u'contact', u'post'])
+
+    assert [type(item).__name__ for item in items] == [
+      u'Exchange2010TaskItem', u'Exchange2010MailItem', u'NoneType', u'Exchange2010CalendarEvent',
+      u'Exchange2010ContactItem', u'NoneType',
+    ]
+    assert [item.id for item in items if item is not None] == [u'task', u'mail', u'event', u'contact']
+    assert items[1].subject == u'Message subject'
+    assert items[3].subject == u'CalendarItem subject'
@@ -0,0 +1,292 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import re
+import threading
+import unittest
+from lxml import etree
+from pyexchange import Exchange2010Service
+from pyexchange.exchange2010 import Exchange2010ContactList
+from pyexchange.connection import ExchangeBaseConnection
+
+from .fixtures import *  # noqa
+
+
+class FakeFolderConnection(ExchangeBaseConnection):
+  """ Answers paged FindItem requests (and GetItem for their ids) for a folder of *total* items. """
+
+  def __init__(self, item_type, total):
+    self.url = FAKE_EXCHANGE_URL
+    self.item_type = item_type
+    self.total = total
+    self.requests = []
+    self.lock = threading.Lock()
+
+  def item(self, index):
+    return FIND_ITEM_PAGE_ITEM.format(type=self.item_type, id=u'item%s' % index, subject=u'Item %s' % index)
+
+  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
+    body = body.decode('utf-8')
+    with self.lock:
+      self.requests.append(body)
+
+    if u'<m:FindItem' in body:
+      offset = int(re.search(u'Offset="(\\d+)"', body).group(1))
+      limit = int(re.search(u'MaxEntriesReturned="(\\d+)"', body).group(1))
+      end = min(offset + limit, self.total)
+      return FIND_ITEM_PAGE_RESPONSE.format(
+        offset=end, total=self.total, last=u'true' if end >= self.total else u'false',
+        items=u''.join(self.item(i) for i in range(offset, end)),
+      )
+
+    ids = re.findall(u'ItemId Id="item(\\d+)"', body)
+    messages = [u"""
+        <m:GetItemResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:Items>%s</m:Items>
+        </m:GetItemResponseMessage>""" % self.item(int(i)) for i in ids]
+    return BATCH_ITEM_RESPONSE.format(operation=u'GetItem', messages=u''.join(messages))
+
+
+class Test_ReadAhead(unittest.TestCase):
+
+  def service(self, item_type, total):
+    self.connection = FakeFolderConnection(item_type, total)
+    return Exchange2010Service(connection=self.connection, batch_size=10)
+
+  def test_tasks_are_the_same_with_read_ahead(self):
+    tasks = self.service(u'Task', 25).tasks().get_all_tasks(read_ahead=2)
+
+    assert [task.id for task in tasks.items] == [u'item%s' % i for i in range(25)]
+    assert tasks.count == 25
+
+  def test_mail_is_the_same_with_read_ahead(self):
+    mails = self.service(u'Message', 25).mail().list_mails(read_ahead=1)
+
+    assert [mail.subject for mail in mails.items] == [u'Item %s' % i for i in range(25)]
+
+  def test_contacts_are_the_same_with_read_ahead(self):
+    contacts = self.service(u'Contact', 25).contacts().get_all_contacts(read_ahead=1)
+
+    assert [contact.id for contact in contacts.items] == [u'item%s' % i for i in range(25)]
+
+  def test_read_ahead_stops_when_the_caller_does(self):
+    contacts = self.service(u'Contact', 1000).contacts().get_all_contacts(read_ahead=1)
+
+    items = contacts.items
+    next(items)
+    items.close()
+    threading.Event().wait(0.3)
+
+    # the page being read, one waiting and one blocked at most
+    assert len(self.connection.requests) <= 3
+
+
+class Test_ParallelScan(unittest.TestCase):
+
+  def service(self, item_type, total):
+    self.connection = FakeFolderConnection(item_type, total)
+    return Exchange2010Service(connection=self.connection, batch_size=10)
+
+  def test_pages_are_fetched_in_parallel_in_order(self):
+    mails = self.service(u'Message', 95).mail().list_mails(parallel=4)
+
+    assert [mail.id for mail in mails.items] == [u'item%s' % i for i in range(95)]
+    find_requests = [body for body in self.connection.requests if u'<m:FindItem' in body]
+    assert len(find_requests) == 10
+
+  def test_pages_can_be_yielded_as_they_arrive(self):
+    contacts = self.service(u'Contact', 95).contacts().get_all_contacts(parallel=4, ordered=False)
+
+    ids = [contact.id for contact in contacts.items]
+    assert sorted(ids) == sorted(u'item%s' % i for i in range(95))
+    assert ids[:10] == [u'item%s' % i for i in range(10)]
+
+  def test_a_single_page_needs_no_workers(self):
+    contacts = self.service(u'Contact', 5).contacts().get_all_contacts(parallel=4)
+
+    assert len(list(contacts.items)) == 5
+    assert len(self.connection.requests) == 1
+
+  def test_short_pages_are_followed_up(self):
+    class ShortPageConnection(FakeFolderConnection):
+
+      def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
+        # Exchange may return fewer items than asked for; never more than 7 here.
+        body = re.sub(b'MaxEntriesReturned="(\\d+)"',
+                      lambda match: b'MaxEntriesReturned="%d"' % min(int(match.group(1)), 7), body)
+        return super(ShortPageConnection, self).send(body, headers, retries, timeout, encoding)
+
+    for ordered in (True, False):
+      self.connection = ShortPageConnection(u'Contact', 95)
+      service = Exchange2010Service(connection=self.connection, batch_size=10)
+
+      ids = [contact.id for contact in service.contacts().get_all_contacts(parallel=4, ordered=ordered).items]
+
+      assert sorted(ids) == sorted(u'item%s' % i for i in range(95))
+      if ordered:
+        assert ids == [u'item%s' % i for i in range(95)]
+
+  def test_no_more_than_parallel_pages_run_ahead(self):
+    contacts = self.service(u'Contact', 1000).contacts().get_all_contacts(parallel=2)
+
+    items = contacts.items
+    for _ in range(11):
+      next(items)
+    threading.Event().wait(0.3)
+
+    # the first page and one window of two
+    assert len(self.connection.requests) == 3
+
+
+class Test_FieldProjection(unittest.TestCase):
+
+  def service(self, item_type, total):
+    self.connection = FakeFolderConnection(item_type, total)
+    return Exchange2010Service(connection=self.connection, batch_size=10)
+
+  def test_mail_list_asks_only_for_the_fields(self):
+    mails = self.service(u'Message', 5).mail().list_mails(fields=[u'item:Subject'])
+
+    assert [mail.subject for mail in mails.items] == [u'Item %s' % i for i in range(5)]
+    for request in self.connection.requests:
+      assert u'<t:BaseShape>IdOnly</t:BaseShape>' in request
+      assert u'<t:FieldURI FieldURI="item:Subject"/>' in request
+
+  def test_contact_list_asks_only_for_the_fields(self):
+    contacts = self.service(u'Contact', 5).contacts().get_all_contacts(fields=[u'contacts:DisplayName'])
+
+    assert [contact.id for contact in contacts.items] == [u'item%s' % i for i in range(5)]
+    assert u'<t:FieldURI FieldURI="contacts:DisplayName"/>' in self.connection.requests[0]
+
+  def test_task_details_ask_only_for_the_fields(self):
+    tasks = self.service(u'Task', 5).tasks().get_all_tasks(fields=[u'item:Subject', u'task:Status'])
+
+    assert [task.subject for task in tasks.items] == [u'Item %s' % i for i in range(5)]
+    get_item = [request for request in self.connection.requests if u'<m:GetItem' in request][0]
+    assert u'<t:FieldURI FieldURI="item:Subject"/><t:FieldURI FieldURI="task:Status"/>' in get_item
+
+  def test_single_items_ask_only_for_the_fields(self):
+    mail = self.service(u'Message', 5).mail().get_mail(u'item3', fields=[u'item:Subject'])
+
+    assert mail.subject == u'Item 3'
+    assert mail.recipients_to == []
+    assert u'<t:FieldURI FieldURI="item:Subject"/>' in self.connection.requests[-1]
+
+  def test_no_fields_is_all_properties(self):
+    list(self.service(u'Contact', 5).contacts().get_all_contacts().items)
+
+    assert u'<t:BaseShape>AllProperties</t:BaseShape>' in self.connection.requests[0]
+    assert u'FieldURI' not in self.connection.requests[0]
+
+
+class Test_TopN(unittest.TestCase):
+
+  def service(self, item_type, total):
+    self.connection = FakeFolderConnection(item_type, total)
+    return Exchange2010Service(connection=self.connection, batch_size=10)
+
+  def find_items(self):
+    return [request for request in self.connection.requests if u'<m:FindItem' in request]
+
+  def test_newest_messages_take_one_request(self):
+    mails = self.service(u'Message', 500).mail().list_mails(order_by=[u'-item:DateTimeReceived'], limit=5)
+
+    assert [mail.id for mail in mails.items] == [u'item%s' % i for i in range(5)]
+    assert len(self.find_items()) == 1
+    assert u'MaxEntriesReturned="5"' in self.find_items()[0]
+    assert (u'<m:SortOrder><t:FieldOrder Order="Descending"><t:FieldURI FieldURI="item:DateTimeReceived"/>'
+            u'</t:FieldOrder></m:SortOrder>') in self.find_items()[0]
+
+  def test_limits_span_pages(self):
+    tasks = self.service(u'Task', 500).tasks().get_all_tasks(order_by=[u'task:DueDate', u'-item:Importance'], limit=25)
+
+    assert [task.id for task in tasks.items] == [u'item%s' % i for i in range(25)]
+    page_sizes = [re.search(u'MaxEntriesReturned="(\\d+)"', request).group(1) for request in self.find_items()]
+    assert page_sizes == [u'10', u'10', u'5']
+    assert u'<t:FieldOrder Order="Ascending"><t:FieldURI FieldURI="task:DueDate"/>' in self.find_items()[0]
+
+  def test_limits_cap_parallel_scans(self):
+    contacts = self.service(u'Contact', 500).contacts().get_all_contacts(parallel=4, limit=35)
+
+    assert [contact.id for contact in contacts.items] == [u'item%s' % i for i in range(35)]
+    assert len(self.find_items()) == 4
+
+  def test_a_small_folder_ends_before_the_limit(self):
+    mails = self.service(u'Message', 3).mail().list_mails(limit=50)
+
+    assert len(list(mails.items)) == 3
+    assert len(self.find_items()) == 1
+
+  def test_a_limit_of_zero_sends_nothing(self):
+    mails = self.service(u'Message', 3).mail().list_mails(limit=0)
+
+    assert list(mails.items) == []
+    assert self.connection.requests == []
+
+
+class Test_SinglePassTasks(unittest.TestCase):
+
+  def service(self, total, connection_class=FakeFolderConnection):
+    self.connection = connection_class(u'Task', total)
+    return Exchange2010Service(connection=self.connection, batch_size=10)
+
+  def test_one_request_per_page(self):
+    tasks = self.service(25).tasks().get_all_tasks(single_pass=True)
+
+    assert [task.subject for task in tasks.items] == [u'Item %s' % i for i in range(25)]
+    assert len(self.connection.requests) == 3
+    assert all(u'<t:BaseShape>AllProperties</t:BaseShape>' in request for request in self.connection.requests)
+
+  def test_projected_fields_come_from_find_item(self):
+    tasks = self.service(25).tasks().get_all_tasks(single_pass=True, fields=[u'item:Subject', u'task:DueDate'])
+
+    assert len(list(tasks.items)) == 25
+    assert len(self.connection.requests) == 3
+    assert u'<t:FieldURI FieldURI="task:DueDate"/>' in self.connection.requests[0]
+
+  def test_bodies_are_fetched_while_the_next_page_is_found(self):
+    next_page_found = threading.Event()
+    overlapped = []
+
+    class PipelineConnection(FakeFolderConnection):
+
+      def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
+        if b'Offset="10"' in body:
+          next_page_found.set()
+        elif b'<m:GetItem' in body and b'Id="item0"' in body:
+          overlapped.append(next_page_found.wait(5))
+        return super(PipelineConnection, self).send(body, headers, retries, timeout, encoding)
+
+    task_list = self.service(25, PipelineConnection).tasks()
+    tasks = task_list.get_all_tasks(single_pass=True, fields=[u'item:Subject', u'item:Body'])
+
+    assert [task.subject for task in tasks.items] == [u'Item %s' % i for i in range(25)]
+    assert overlapped == [True]
+
+    find_items = [request for request in self.connection.requests if u'<m:FindItem' in request]
+    get_items = [request for request in self.connection.requests if u'<m:GetItem' in request]
+    assert len(find_items) == 3 and len(get_items) == 3
+    assert u'item:Body' not in find_items[0]
+    assert u'<t:FieldURI FieldURI="item:Body"/>' in get_items[0]
+    assert u'item:Subject' not in get_items[0]
+
+
+class Test_ContactPages(unittest.TestCase):
+
+  def test_contacts_only_get_their_own_addresses(self):
+    page = FIND_ITEM_PAGE_RESPONSE.format(offset=3, total=3, last=u'true', items=u''.join(
+      FIND_ITEM_PAGE_CONTACT.format(id=u'item%s' % i, name=u'Contact %s' % i) for i in range(3)
+    ))
+    service = Exchange2010Service(connection=FakeFolderConnection(u'Contact', 3))
+
+    contacts = list(Exchange2010ContactList(service, u'contacts', xml_result=etree.fromstring(page.encode('utf-8'))).items)
+
+    assert [contact.email_address1 for contact in contacts] == [u'item%s@test.linkedin.com' % i for i in range(3)]
+    assert contacts[1].physical_addresses == [
+      {u'street': u'item1 Main Street', u'city': u'Sunnyvale'},
+      {u'street': u'item1 Home Street', u'postal_code': u'94085'},
+    ]
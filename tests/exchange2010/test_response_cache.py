@@ -0,0 +1,144 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import re
+import unittest
+from httpretty import HTTPretty
+from pytest import raises
+from pyexchange import Exchange2010Service
+from pyexchange.cache import ResponseCache
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exchange2010 import soap_request
+from pyexchange.exceptions import *  # noqa
+
+from .fixtures import *  # noqa
+
+SENT_REQUESTS = []
+
+
+def fake_convert_id_response(request, uri, headers):
+  """ "Converts" every id by prefixing it with "converted-", except "missing" ids. """
+  body = request.body.decode('utf-8')
+  SENT_REQUESTS.append(body)
+
+  messages = []
+  for id in re.findall(r'<t:AlternateId [^>]*Id="([^"]*)"', body):
+    if id == u'missing':
+      messages.append(BATCH_ITEM_ERROR_MESSAGE.format(operation=u'ConvertId', code=u'ErrorInvalidIdMalformed'))
+    else:
+      messages.append(CONVERT_ID_RESPONSE_MESSAGE.format(format=u'EntryId', id=u'converted-' + id))
+
+  response = BATCH_ITEM_RESPONSE.format(operation=u'ConvertId', messages=u''.join(messages))
+  return [200, headers, response.encode('utf-8')]
+
+
+class Test_ResponseCache(unittest.TestCase):
+
+  def setUp(self):
+    del SENT_REQUESTS[:]
+    self.cache = ResponseCache()
+    HTTPretty.enable()
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=fake_convert_id_response,
+      content_type='text/xml; charset=utf-8',
+    )
+
+  def tearDown(self):
+    HTTPretty.disable()
+    HTTPretty.reset()
+
+  def _service(self, impersonate_sid=None):
+    return Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD,
+      ),
+      impersonate_sid=impersonate_sid,
+      response_cache=self.cache,
+    )
+
+  def test_repeated_requests_are_answered_from_the_cache(self):
+    service = self._service()
+
+    first = service.convert_id(u'abc', u'EntryId')
+    second = service.convert_id(u'abc', u'EntryId')
+
+    assert len(SENT_REQUESTS) == 1
+    assert first == second == [u'converted-abc']
+    assert (self.cache.hits, self.cache.misses) == (1, 1)
+
+  def test_different_requests_are_cached_separately(self):
+    service = self._service()
+
+    service.convert_id(u'abc', u'EntryId')
+    service.convert_id(u'def', u'EntryId')
+    service.convert_id(u'abc', u'OwaId')
+
+    assert len(SENT_REQUESTS) == 3
+
+  def test_impersonated_users_are_cached_separately(self):
+    self._service(impersonate_sid=u'S-1').convert_id(u'abc', u'EntryId')
+    self._service(impersonate_sid=u'S-2').convert_id(u'abc', u'EntryId')
+
+    assert len(SENT_REQUESTS) == 2
+
+  def test_bypass_and_invalidate(self):
+    service = self._service()
+    service.convert_id(u'abc', u'EntryId')
+
+    with self.cache.bypass():
+      service.convert_id(u'abc', u'EntryId')
+    assert len(SENT_REQUESTS) == 2
+
+    service.invalidate_cached_responses(u'ConvertId')
+    service.convert_id(u'abc', u'EntryId')
+    assert len(SENT_REQUESTS) == 3
+
+  def test_errors_are_not_cached(self):
+    service = self._service()
+
+    for _ in range(2):
+      with raises(FailedExchangeException):
+        service.convert_id(u'missing', u'EntryId')
+
+    assert len(SENT_REQUESTS) == 2
+    assert len(self.cache._entries) == 0
+
+  def test_uncached_operations_always_go_to_exchange(self):
+    service = self._service()
+
+    for _ in range(2):
+      service.send(soap_request.get_item(exchange_id=u'abc', format=u'IdOnly'), check_for_errors=False)
+
+    assert len(SENT_REQUESTS) == 2
+
+  def test_batches_with_errors_are_not_cached(self):
+    answers = [
+      BATCH_ITEM_RESPONSE.format(operation=u'ConvertId', messages=BATCH_ITEM_ERROR_MESSAGE.format(
+        operation=u'ConvertId', code=u'ErrorInternalServerTransientError')),
+      BATCH_ITEM_RESPONSE.format(operation=u'ConvertId', messages=CONVERT_ID_RESPONSE_MESSAGE.format(
+        format=u'EntryId', id=u'converted-abc')),
+    ]
+
+    def transient_error_then_success(request, uri, headers):
+      SENT_REQUESTS.append(request.body.decode('utf-8'))
+      return [200, headers, answers[min(len(SENT_REQUESTS), 2) - 1].encode('utf-8')]
+
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=transient_error_then_success,
+      content_type='text/xml; charset=utf-8',
+    )
+    service = self._service()
+
+    first, = service.convert_ids([u'abc'], u'EntryId', max_workers=1)
+    second, = service.convert_ids([u'abc'], u'EntryId', max_workers=1)
+
+    assert first.response_code == u'ErrorInternalServerTransientError'
+    assert second.error is None and second.id == u'converted-abc'
+    assert len(SENT_REQUESTS) == 2
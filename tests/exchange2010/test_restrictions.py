@@ -0,0 +1,102 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import unittest
+from datetime import datetime
+from lxml import etree
+from pytz import utc
+from pyexchange import Exchange2010Service
+from pyexchange.base.calendar import ExchangeExtendedProperty
+from pyexchange.exchange2010 import soap_request
+from pyexchange.exchange2010.restrictions import IsEqualTo, IsGreaterThan, Contains, Exists, And, Or, Not
+
+from .fixtures import *  # noqa
+from .test_paged_lists import FakeFolderConnection
+
+
+def to_string(restriction):
+  return etree.tostring(restriction.to_xml()).decode('utf-8').replace(u' xmlns:m="%s"' % soap_request.MSG_NS, u'') \
+    .replace(u' xmlns:s="%s"' % soap_request.SOAP_NS, u'').replace(u' xmlns:t="%s"' % soap_request.TYPE_NS, u'')
+
+
+class Test_Restrictions(unittest.TestCase):
+
+  def test_comparisons(self):
+    received = datetime(2050, 5, 20, 9, 30, tzinfo=utc)
+
+    assert to_string(IsEqualTo(u'message:IsRead', False)) == (
+      u'<t:IsEqualTo><t:FieldURI FieldURI="message:IsRead"/>'
+      u'<t:FieldURIOrConstant><t:Constant Value="false"/></t:FieldURIOrConstant></t:IsEqualTo>'
+    )
+    assert u'<t:Constant Value="2050-05-20T09:30:00Z"/>' in to_string(IsGreaterThan(u'item:DateTimeReceived', received))
+
+  def test_contains(self):
+    assert to_string(Contains(u'item:Categories', u'Red & Blue', mode=u'FullString')) == (
+      u'<t:Contains ContainmentMode="FullString" ContainmentComparison="IgnoreCase">'
+      u'<t:FieldURI FieldURI="item:Categories"/><t:Constant Value="Red &amp; Blue"/></t:Contains>'
+    )
+
+  def test_indexed_and_extended_fields(self):
+    assert to_string(Exists(u'contacts:EmailAddress:EmailAddress1')) == (
+      u'<t:Exists><t:IndexedFieldURI FieldURI="contacts:EmailAddress" FieldIndex="EmailAddress1"/></t:Exists>'
+    )
+
+    extended_property = ExchangeExtendedProperty(distinguished_property_set_id=u'PublicStrings',
+                                                 property_name=u'ExternalId', property_type=u'String', value=None)
+    xml = to_string(IsEqualTo(extended_property, u'abc'))
+    assert u'<t:ExtendedFieldURI DistinguishedPropertySetId="PublicStrings"' in xml
+
+  def test_combinations(self):
+    unread = IsEqualTo(u'message:IsRead', False)
+    flagged = Contains(u'item:Categories', u'Red')
+
+    xml = (unread & ~flagged | Exists(u'item:Subject')).to_xml()
+
+    assert etree.QName(xml).localname == u'Or'
+    assert [etree.QName(child).localname for child in xml[0]] == [u'IsEqualTo', u'Not']
+    assert etree.QName(And(unread).to_xml()).localname == u'IsEqualTo'
+
+    with self.assertRaises(ValueError):
+      Or()
+
+  def test_equal_restrictions_are_interchangeable(self):
+    assert IsEqualTo(u'message:IsRead', False) & Exists(u'item:Subject') == \
+      IsEqualTo(u'message:IsRead', False) & Exists(u'item:Subject')
+    assert len(set([Not(IsEqualTo(u'message:IsRead', False)), Not(IsEqualTo(u'message:IsRead', False))])) == 1
+    assert IsEqualTo(u'message:IsRead', False) != IsEqualTo(u'message:IsRead', True)
+
+  def test_restriction_comes_before_the_folder(self):
+    root = soap_request.find_items(u'inbox', limit=10, restriction=IsEqualTo(u'message:IsRead', False))
+
+    assert [etree.QName(child).localname for child in root] == [
+      u'ItemShape', u'IndexedPageItemView', u'Restriction', u'ParentFolderIds',
+    ]
+
+
+class Test_ListRestrictions(unittest.TestCase):
+
+  def service(self, item_type, total):
+    self.connection = FakeFolderConnection(item_type, total)
+    return Exchange2010Service(connection=self.connection, batch_size=10)
+
+  def test_lists_send_the_restriction_with_every_page(self):
+    unread = IsEqualTo(u'message:IsRead', False)
+    service = self.service(u'Message', 25)
+
+    assert len(list(service.mail().list_mails(restriction=unread).items)) == 25
+
+    find_items = [request for request in self.connection.requests if u'<m:FindItem' in request]
+    assert len(find_items) == 3
+    assert all(u'<m:Restriction><t:IsEqualTo>' in request for request in find_items)
+
+  def test_task_and_contact_lists_take_restrictions(self):
+    service = self.service(u'Task', 5)
+    list(service.tasks().get_all_tasks(restriction=Exists(u'task:DueDate')).items)
+    assert u'<m:Restriction><t:Exists>' in self.connection.requests[0]
+
+    service = self.service(u'Contact', 5)
+    list(service.contacts().get_all_contacts(restriction=Contains(u'contacts:DisplayName', u'Ann')).items)
+    assert u'<m:Restriction><t:Contains' in self.connection.requests[0]
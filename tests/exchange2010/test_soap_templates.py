@@ -0,0 +1,148 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import unittest
+from datetime import datetime
+from lxml import etree
+from pytz import utc
+from pyexchange import Exchange2010Service
+from pyexchange.base.calendar import ExchangeExtendedProperty
+from pyexchange.connection import ExchangeBaseConnection, ExchangeNTLMAuthConnection
+from pyexchange.exchange2010 import soap_request, soap_templates
+from pyexchange.exchange2010.restrictions import IsEqualTo, Contains
+
+from .fixtures import *  # noqa
+
+AWKWARD_ID = u'AAMk&<>"\'\r\n\té=='
+
+
+class RecordingConnection(ExchangeBaseConnection):
+
+  def __init__(self):
+    self.url = FAKE_EXCHANGE_URL
+    self.sent = []
+
+  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
+    self.sent.append(body)
+    return GET_ITEM_RESPONSE_ID_ONLY
+
+
+class Test_SoapTemplates(unittest.TestCase):
+
+  def setUp(self):
+    self.service = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD,
+      )
+    )
+
+  def assertSameRequest(self, name, *args, **kwargs):
+    expected = etree.tostring(self.service._wrap_soap_xml_request(getattr(soap_request, name)(*args, **kwargs)),
+                              encoding=u'utf-8')
+    prefix, suffix = self.service._serialized_envelope()
+
+    for _ in range(2):  # built the first time, then from the cached template
+      body = getattr(soap_templates, name)(*args, **kwargs)
+      assert prefix + body + suffix == expected
+
+  def test_get_item(self):
+    self.assertSameRequest(u'get_item', TEST_EVENT.id, format=u'AllProperties')
+    self.assertSameRequest(u'get_item', [TEST_EVENT.id, AWKWARD_ID, u'third'], format=u'IdOnly')
+
+  def test_find_items(self):
+    self.assertSameRequest(u'find_items', u'inbox', format=u'AllProperties', limit=100, offset=200)
+    self.assertSameRequest(u'find_items', AWKWARD_ID, query_string=u'subject:"a & b"', limit=None, offset=0)
+    self.assertSameRequest(u'find_items', u'contacts', offset=10)
+
+  def test_restrictions_use_the_builder(self):
+    templates = len(soap_templates._templates)
+
+    for restriction in (IsEqualTo(u'message:IsRead', False), Contains(u'item:Subject', u'a & b')):
+      body = soap_templates.find_items(u'inbox', limit=10, offset=20, restriction=restriction)
+      assert etree.iselement(body)
+      assert etree.tostring(body) == etree.tostring(
+        soap_request.find_items(u'inbox', limit=10, offset=20, restriction=restriction))
+
+    assert len(soap_templates._templates) == templates
+
+  def test_find_items_with_a_sort_order(self):
+    self.assertSameRequest(u'find_items', u'inbox', limit=10, offset=20, order_by=[u'-item:DateTimeReceived'])
+    self.assertSameRequest(u'find_items', u'inbox', limit=10, order_by=[u'item:Subject', u'-item:Importance'])
+
+  def test_sync_calendar_items(self):
+    self.assertSameRequest(u'sync_calendar_items')
+    self.assertSameRequest(u'sync_calendar_items', calendar_id=AWKWARD_ID, sync_state=u'H4sI&<>"\r\nAAA=')
+    self.assertSameRequest(u'sync_calendar_items', delegate_for=u'boss@test.linkedin.com', sync_state=u'H4sIAAA=')
+
+  def test_get_user_availability(self):
+    attendees = [{u'email': u'a@test.linkedin.com'}, {u'email': u'b&c@test.linkedin.com'}]
+    start = datetime(2050, 5, 20, 9, tzinfo=utc)
+    end = datetime(2050, 5, 20, 17, tzinfo=utc)
+
+    self.assertSameRequest(u'get_user_availability', attendees, start, end)
+    self.assertSameRequest(u'get_user_availability', attendees, start, end, requested_view=u'MergedOnly',
+                           merged_free_busy_interval=15)
+
+  def test_envelope_is_kept_for_each_impersonated_user(self):
+    self.assertSameRequest(u'get_item', TEST_EVENT.id)
+
+    self.service.impersonate_sid = u'S-1-5-21-1'
+    self.assertSameRequest(u'get_item', TEST_EVENT.id)
+    assert b'S-1-5-21-1' in self.service._serialized_envelope()[0]
+
+    self.service.impersonate_sid = None
+    assert b'S-1-5-21-1' not in self.service._serialized_envelope()[0]
+
+  def test_invalid_characters_are_refused(self):
+    with self.assertRaises(ValueError):
+      soap_templates.get_item(u'bad\x00id')
+
+  def test_additional_properties_use_the_builder(self):
+    extended_property = ExchangeExtendedProperty(distinguished_property_set_id=u'PublicStrings',
+                                                 property_name=u'ExternalId', property_type=u'String', value=None)
+    body = soap_templates.get_item(TEST_EVENT.id, additional_properties=[extended_property])
+    assert etree.iselement(body)
+
+
+class Test_SerializedEnvelope(unittest.TestCase):
+
+  def setUp(self):
+    self.connection = RecordingConnection()
+    self.service = Exchange2010Service(connection=self.connection, impersonate_sid=u'S-1-5-21-1')
+
+    self.envelopes_built = 0
+    wrap = self.service._wrap_soap_xml_request
+
+    def counting_wrap(exchange_xml):
+      self.envelopes_built += 1
+      return wrap(exchange_xml)
+
+    self.service._wrap_soap_xml_request = counting_wrap
+
+  def test_element_bodies_are_sent_as_if_wrapped_in_the_envelope(self):
+    expected = etree.tostring(self.service._wrap_soap_xml_request(soap_request.get_item(TEST_EVENT.id)),
+                              encoding=u'utf-8')
+
+    self.service.send(soap_request.get_item(TEST_EVENT.id))
+
+    assert self.connection.sent == [expected]
+
+  def test_envelope_is_serialized_once_per_impersonated_user(self):
+    for _ in range(3):
+      self.service.send(soap_request.get_item(TEST_EVENT.id))
+      self.service.send(soap_templates.get_item(TEST_EVENT.id))
+    assert self.envelopes_built == 1
+
+    self.service.impersonate_sid = u'S-1-5-21-2'
+    self.service.send(soap_request.get_item(TEST_EVENT.id))
+    assert self.envelopes_built == 2
+    assert b'S-1-5-21-2' in self.connection.sent[-1]
+
+    self.service.impersonate_sid = u'S-1-5-21-1'
+    self.service.send(soap_request.get_item(TEST_EVENT.id))
+    assert self.envelopes_built == 2
@@ -0,0 +1,109 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import re
+import unittest
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeBaseConnection
+
+from .fixtures import *  # noqa
+
+SYNC_FOLDER_HIERARCHY_RESPONSE = u"""<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <m:SyncFolderHierarchyResponse xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages"
+                                   xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types">
+      <m:ResponseMessages>
+        <m:SyncFolderHierarchyResponseMessage ResponseClass="Success">
+          <m:ResponseCode>NoError</m:ResponseCode>
+          <m:SyncState>{sync_state}</m:SyncState>
+          <m:IncludesLastFolderInRange>{last}</m:IncludesLastFolderInRange>
+          <m:Changes>{changes}
+          </m:Changes>
+        </m:SyncFolderHierarchyResponseMessage>
+      </m:ResponseMessages>
+    </m:SyncFolderHierarchyResponse>
+  </s:Body>
+</s:Envelope>"""
+
+FOLDER_CHANGE = u"""
+            <t:{change}>
+              <t:{type}>
+                <t:FolderId Id="{id}" ChangeKey="ck"/>
+                <t:ParentFolderId Id="root-id" ChangeKey="ck"/>
+                <t:DisplayName>{name}</t:DisplayName>
+              </t:{type}>
+            </t:{change}>"""
+
+FOLDER_DELETE = u"""
+            <t:Delete>
+              <t:FolderId Id="{id}" ChangeKey="ck"/>
+            </t:Delete>"""
+
+# The answers to each sync state, as (next state, includes last folder, changes).
+SYNC_PAGES = {
+  None: (u'state1', u'false', [
+    FOLDER_CHANGE.format(change=u'Create', type=u'Folder', id=u'inbox-id', name=u'Inbox'),
+    FOLDER_CHANGE.format(change=u'Create', type=u'CalendarFolder', id=u'calendar-id', name=u'Calendar'),
+  ]),
+  u'state1': (u'state2', u'true', [
+    FOLDER_CHANGE.format(change=u'Create', type=u'TasksFolder', id=u'tasks-id', name=u'Tasks'),
+  ]),
+  u'state2': (u'state3', u'true', [
+    FOLDER_CHANGE.format(change=u'Update', type=u'Folder', id=u'inbox-id', name=u'Inbox (renamed)'),
+    FOLDER_DELETE.format(id=u'calendar-id'),
+  ]),
+  u'state3': (u'state3', u'true', []),
+}
+
+
+class FakeSyncConnection(ExchangeBaseConnection):
+
+  def __init__(self):
+    self.url = FAKE_EXCHANGE_URL
+    self.requests = []
+
+  def send(self, body, headers=None, retries=2, timeout=30, encoding=u"utf-8"):
+    body = body.decode('utf-8')
+    self.requests.append(body)
+
+    state = re.search(u'<m:SyncState>([^<]*)</m:SyncState>', body)
+    sync_state, last, changes = SYNC_PAGES[state.group(1) if state else None]
+    return SYNC_FOLDER_HIERARCHY_RESPONSE.format(sync_state=sync_state, last=last, changes=u''.join(changes))
+
+
+class Test_SyncFolders(unittest.TestCase):
+
+  def setUp(self):
+    self.connection = FakeSyncConnection()
+    self.folders = Exchange2010Service(connection=self.connection).folder()
+
+  def test_first_sync_pages_through_every_folder(self):
+    changes = self.folders.sync_folders()
+
+    assert [(folder.id, folder.folder_type) for folder in changes.created] == [
+      (u'inbox-id', u'Folder'), (u'calendar-id', u'CalendarFolder'), (u'tasks-id', u'TasksFolder'),
+    ]
+    assert changes.updated == [] and changes.deleted == []
+    assert changes.last_sync_state == u'state2'
+    assert len(self.connection.requests) == 2
+    assert u'<m:SyncState>' not in self.connection.requests[0]
+
+  def test_later_syncs_only_return_the_changes(self):
+    changes = self.folders.sync_folders(sync_state=u'state2')
+
+    assert changes.created == []
+    assert [(folder.id, folder.display_name) for folder in changes.updated] == [(u'inbox-id', u'Inbox (renamed)')]
+    assert changes.deleted == [u'calendar-id']
+    assert changes.last_sync_state == u'state3'
+
+    assert self.folders.sync_folders(sync_state=changes.last_sync_state).created == []
+
+  def test_sync_can_be_limited_to_a_folder_and_fields(self):
+    self.folders.sync_folders(folder_id=u'msgfolderroot', sync_state=u'state3', fields=[u'folder:DisplayName'])
+
+    assert u'<m:SyncFolderId><t:DistinguishedFolderId Id="msgfolderroot"/></m:SyncFolderId>' in self.connection.requests[0]
+    assert u'<t:BaseShape>IdOnly</t:BaseShape>' in self.connection.requests[0]
+    assert u'<t:FieldURI FieldURI="folder:DisplayName"/>' in self.connection.requests[0]
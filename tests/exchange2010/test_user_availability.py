@@ -0,0 +1,184 @@
+"""
+(c) 2013 LinkedIn Corp. All rights reserved.
+Licensed under the Apache License, Version 2.0 (the "License");?you may not use this file except in compliance with the License. You may obtain a copy of the License at  http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+"""
+import re
+import unittest
+from pytest import raises
+from httpretty import HTTPretty, httprettified
+from pyexchange import Exchange2010Service
+from pyexchange.connection import ExchangeNTLMAuthConnection
+from pyexchange.exceptions import *  # noqa
+
+from .fixtures import *  # noqa
+
+SENT_BATCHES = []
+
+
+def fake_availability_response(request, uri, headers):
+  """ Answers with one busy hour per attendee: person<N> is busy from N:00 to N:30. """
+  SENT_BATCHES.append(request.body)
+  emails = re.findall(r'<t:Address>([^<]+)</t:Address>', request.body.decode('utf-8'))
+
+  if any(u'broken' in email for email in emails):
+    return [500, headers, u'']
+
+  responses = []
+  for email in emails:
+    if u'unknown' in email:
+      responses.append(FREE_BUSY_ERROR_RESPONSE)
+    else:
+      hour = int(re.search(r'(\d+)@', email).group(1))
+      responses.append(FREE_BUSY_RESPONSE.format(
+        start=u'2050-05-20T%02d:00:00' % hour,
+        end=u'2050-05-20T%02d:30:00' % hour,
+      ))
+
+  return [200, headers, GET_USER_AVAILABILITY_RESPONSE.format(responses=u''.join(responses)).encode('utf-8')]
+
+
+class Test_GetUserAvailability(unittest.TestCase):
+  service = None
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD,
+      )
+    )
+
+  def _get_availability(self, attendees, **kwargs):
+    del SENT_BATCHES[:]
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=fake_availability_response,
+      content_type='text/xml; charset=utf-8',
+    )
+    return self.service.calendar().get_user_availability(
+      attendees, TEST_EVENT_LIST_START, TEST_EVENT_LIST_END, **kwargs
+    )
+
+  @httprettified
+  def test_attendees_are_split_into_batches(self):
+    attendees = [{'email': u'person%s@test.linkedin.com' % i} for i in range(5)]
+
+    self._get_availability(attendees, batch_size=2, max_workers=1)
+
+    assert len(SENT_BATCHES) == 3
+
+  def test_results_are_merged_in_attendee_order(self):
+    attendees = [{'email': u'person%s@test.linkedin.com' % i} for i in range(7)]
+
+    service = Exchange2010Service(connection=FakeCallbackConnection(fake_availability_response))
+    availability = service.calendar().get_user_availability(
+      attendees, TEST_EVENT_LIST_START, TEST_EVENT_LIST_END, batch_size=2, max_workers=3
+    )
+
+    assert availability.errors == []
+    for i, attendee in enumerate(attendees):
+      assert attendee['busy'] == [dict(
+        start_time=u'2050-05-20T%02d:00:00' % i,
+        end_time=u'2050-05-20T%02d:30:00' % i,
+        busy_type=u'Busy',
+      )]
+
+  @httprettified
+  def test_batch_size_is_capped(self):
+    attendees = [{'email': u'person%s@test.linkedin.com' % (i % 10)} for i in range(150)]
+
+    self._get_availability(attendees, batch_size=1000, max_workers=1)
+
+    assert len(SENT_BATCHES) == 2
+
+  @httprettified
+  def test_failed_batch_does_not_lose_other_batches(self):
+    attendees = [
+      {'email': u'person1@test.linkedin.com'},
+      {'email': u'person2@test.linkedin.com'},
+      {'email': u'broken3@test.linkedin.com'},
+      {'email': u'person4@test.linkedin.com'},
+    ]
+
+    availability = self._get_availability(attendees, batch_size=2, max_workers=1, partial_results=True)
+
+    assert len(attendees[0]['busy']) == 1
+    assert len(attendees[1]['busy']) == 1
+    assert attendees[2]['busy'] is None
+    assert attendees[3]['busy'] is None
+
+    assert len(availability.errors) == 1
+    assert availability.errors[0].attendees == attendees[2:]
+    assert isinstance(availability.errors[0].error, FailedExchangeException)
+
+  @httprettified
+  def test_failed_batch_raises_by_default(self):
+    attendees = [{'email': u'broken1@test.linkedin.com'}]
+
+    with raises(FailedExchangeException):
+      self._get_availability(attendees)
+
+  @httprettified
+  def test_unknown_mailbox_is_reported_per_attendee(self):
+    attendees = [
+      {'email': u'person1@test.linkedin.com'},
+      {'email': u'unknown2@test.linkedin.com'},
+      {'email': u'person3@test.linkedin.com'},
+    ]
+
+    availability = self._get_availability(attendees)
+
+    assert availability.errors == []
+    assert attendees[1]['busy'] is None
+    assert attendees[1]['error'] == u'ErrorMailRecipientNotFound'
+    assert attendees[2]['busy'][0]['start_time'] == u'2050-05-20T03:00:00'
+
+
+class Test_GetMergedUserAvailability(unittest.TestCase):
+  service = None
+
+  @classmethod
+  def setUpClass(cls):
+    cls.service = Exchange2010Service(
+      connection=ExchangeNTLMAuthConnection(
+        url=FAKE_EXCHANGE_URL,
+        username=FAKE_EXCHANGE_USERNAME,
+        password=FAKE_EXCHANGE_PASSWORD,
+      )
+    )
+
+  @httprettified
+  def test_merged_free_busy_is_decoded_per_attendee(self):
+    HTTPretty.register_uri(
+      HTTPretty.POST, FAKE_EXCHANGE_URL,
+      body=GET_USER_AVAILABILITY_RESPONSE.format(responses=u''.join([
+        MERGED_FREE_BUSY_RESPONSE.format(merged=u'0022100'),
+        MERGED_FREE_BUSY_RESPONSE.format(merged=u'3300005'),
+      ])).encode('utf-8'),
+      content_type='text/xml; charset=utf-8',
+    )
+    attendees = [{'email': u'person1@test.linkedin.com'}, {'email': u'person2@test.linkedin.com'}]
+
+    self.service.calendar().get_user_availability(
+      attendees, TEST_EVENT_LIST_START, TEST_EVENT_LIST_END,
+      requested_view=u'MergedOnly', merged_free_busy_interval=15,
+    )
+
+    request = HTTPretty.last_request.body.decode('utf-8')
+    assert u'<t:MergedFreeBusyIntervalInMinutes>15</t:MergedFreeBusyIntervalInMinutes>' in request
+    assert u'<t:RequestedView>MergedOnly</t:RequestedView>' in request
+
+    assert list(attendees[0]['merged_free_busy']) == [0, 0, 2, 2, 1, 0, 0]
+    assert list(attendees[1]['merged_free_busy']) == [3, 3, 0, 0, 0, 0, 5]
+    assert 'busy' not in attendees[0]
+
+  def test_unknown_view_is_rejected(self):
+    with raises(ValueError):
+      self.service.calendar().get_user_availability(
+        [{'email': u'person1@test.linkedin.com'}], TEST_EVENT_LIST_START, TEST_EVENT_LIST_END,
+        requested_view=u'Everything',
+      )
@@ -0,0 +1,143 @@
+import os
+import shutil
+import tempfile
+
+from pyexchange.cache import LRUCache, ItemCache, ResponseCache
+
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 1000.0
+
+  def __call__(self):
+    return self.now
+
+
+def test_least_recently_used_entries_are_dropped():
+  cache = LRUCache(max_size=2)
+  cache.set('a', 1)
+  cache.set('b', 2)
+  cache.get('a')
+  cache.set('c', 3)
+
+  assert 'a' in cache and 'c' in cache
+  assert 'b' not in cache
+
+
+def test_entries_expire_after_ttl():
+  clock = FakeClock()
+  cache = LRUCache(ttl=10, clock=clock)
+  cache.set('a', 1)
+
+  clock.now += 11
+
+  assert cache.get('a') is None
+  assert cache.misses == 1
+
+
+def test_item_cache_freshness_and_revalidation():
+  clock = FakeClock()
+  cache = ItemCache(max_age=10, clock=clock)
+  cache.set(u'ID', u'KEY1', 'xml', shape='AllProperties')
+
+  assert cache.is_fresh(cache.get(u'ID', 'AllProperties'))
+  assert cache.get(u'ID', 'IdOnly') is None
+
+  clock.now += 11
+  assert not cache.is_fresh(cache.get(u'ID', 'AllProperties'))
+  assert cache.change_key(u'ID') is None
+
+  assert cache.revalidate(u'ID', u'KEY1')
+  assert cache.change_key(u'ID') == u'KEY1'
+
+  assert not cache.revalidate(u'ID', u'KEY2')
+  assert cache.get(u'ID', 'AllProperties') is None
+
+
+def test_item_cache_drops_other_shapes_when_the_item_changes():
+  cache = ItemCache()
+  cache.set(u'ID', u'KEY1', 'all', shape='AllProperties')
+  cache.set(u'ID', u'KEY1', 'default', shape='Default')
+  assert cache.get(u'ID', 'AllProperties').xml == 'all'
+
+  cache.set(u'ID', u'KEY2', 'default2', shape='Default')
+  assert cache.get(u'ID', 'AllProperties') is None
+
+
+def test_notifications_invalidate_items():
+  cache = ItemCache()
+  for id in (u'A', u'B', u'C'):
+    cache.set(id, u'KEY', 'xml')
+
+  cache.invalidate_notification({'modified': [u'A'], 'moved': {'item_id': [u'X'], 'old_item_id': [u'B']}, 'deleted': []})
+
+  assert cache.item_ids() == [u'C']
+
+
+def test_response_cache_expires_per_operation():
+  clock = FakeClock()
+  cache = ResponseCache(ttls={u'GetFolder': 10, u'ConvertId': None}, clock=clock)
+  cache.set('folder', u'GetFolder', u'<folder/>')
+  cache.set('id', u'ConvertId', u'<id/>')
+
+  assert cache.caches(u'GetFolder')
+  assert not cache.caches(u'GetItem')
+
+  clock.now += 11
+  assert cache.get('folder') is None
+  assert cache.get('id') == u'<id/>'
+  assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_response_cache_bypass_and_invalidate():
+  cache = ResponseCache()
+  cache.set('folder', u'GetFolder', u'<folder/>')
+  cache.set('rooms', u'GetRooms', u'<rooms/>')
+
+  with cache.bypass():
+    assert not cache.caches(u'GetFolder')
+  assert cache.caches(u'GetFolder')
+
+  cache.invalidate(u'GetFolder')
+  assert cache.get('folder') is None
+  assert cache.get('rooms') == u'<rooms/>'
+
+
+def test_response_cache_disk_tier():
+  directory = tempfile.mkdtemp()
+  try:
+    ResponseCache(directory=directory).set('rooms', u'GetRooms', u'<röoms/>')
+
+    cache = ResponseCache(directory=directory)
+    assert cache.get('rooms') == u'<röoms/>'
+
+    cache.invalidate()
+    assert os.listdir(directory) == []
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_response_cache_disk_tier_keeps_line_endings():
+  directory = tempfile.mkdtemp()
+  try:
+    ResponseCache(directory=directory).set('rooms', u'GetRooms', u'<rooms>\r\n<room/>\r</rooms>\n')
+
+    assert ResponseCache(directory=directory).get('rooms') == u'<rooms>\r\n<room/>\r</rooms>\n'
+  finally:
+    shutil.rmtree(directory)
+
+
+def test_response_cache_disk_tier_drops_corrupt_entries():
+  directory = tempfile.mkdtemp()
+  try:
+    for name, content in (('garbled', b'GetRooms\nnot-a-time\n<rooms/>'), ('truncated', b'GetRooms\n1'),
+                          ('binary', b'\xff\xfe\x00')):
+      with open(os.path.join(directory, name), 'wb') as f:
+        f.write(content)
+
+      cache = ResponseCache(directory=directory)
+      assert cache.get(name) is None
+      assert cache.misses == 1
+      assert not os.path.exists(os.path.join(directory, name))
+  finally:
+    shutil.rmtree(directory)
@@ -5,6 +5,8 @@ Licensed under the Apache License, Version 2.0 (the "License");?you may not use
 Unless required by applicable law or agreed to in writing, software?distributed under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 """
 import httpretty
+import threading
+import time
 import unittest
 from mock import patch, MagicMock, call
 from pytest import raises
@@ -82,3 +84,26 @@ def test_session_is_cached():
 
     # assert we only get called once, after that it's cached
     manager.MockSession.assert_called_once_with()
+
+
+def test_session_is_built_once_across_threads():
+
+  def slow_session():
+    time.sleep(0.05)
+    return MagicMock()
+
+  with patch('requests.Session', side_effect=slow_session) as MockSession:
+
+    connection = ExchangeNTLMAuthConnection(url=FAKE_EXCHANGE_URL,
+                                            username=FAKE_EXCHANGE_USERNAME,
+                                            password=FAKE_EXCHANGE_PASSWORD)
+
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(connection.build_session())) for _ in range(4)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    MockSession.assert_called_once_with()
+    assert len(set(id(session) for session in sessions)) == 1
@@ -0,0 +1,47 @@
+from pyexchange.directory import PrefixTrie
+
+
+def test_prefixes_find_every_key_under_them():
+  trie = PrefixTrie()
+  trie.add(u'ann', 1)
+  trie.add(u'anna', 2)
+  trie.add(u'annabel', 3)
+  trie.add(u'bob', 4)
+
+  assert sorted(trie.find(u'an')) == [1, 2, 3]
+  assert trie.find(u'anna') == [2, 3]
+  assert sorted(trie.find(u'')) == [1, 2, 3, 4]
+  assert trie.find(u'c') == []
+
+
+def test_shortest_keys_come_first_up_to_the_limit():
+  trie = PrefixTrie()
+  trie.add(u'annabel', 3)
+  trie.add(u'ann', 1)
+  trie.add(u'anna', 2)
+
+  assert trie.find(u'a', limit=2) == [1, 2]
+
+
+def test_values_under_several_keys_are_found_once():
+  trie = PrefixTrie()
+  trie.add(u'ann smith', 1)
+  trie.add(u'ann', 1)
+
+  assert trie.find(u'an') == [1]
+
+
+def test_removing_prunes_the_trie():
+  trie = PrefixTrie()
+  trie.add(u'ann', 1)
+  trie.add(u'anna', 2)
+  trie.add(u'ann', 3)
+
+  trie.remove(u'ann', 1)
+  assert sorted(trie.find(u'ann')) == [2, 3]
+
+  trie.remove(u'anna', 2)
+  trie.remove(u'ann', 3)
+  trie.remove(u'zed', 4)
+  assert trie.find(u'a') == []
+  assert trie._root == {}
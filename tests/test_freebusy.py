@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, time
+from array import array
+from pytz import timezone, utc
+
+from pyexchange.freebusy import find_free_slots
+
+START = datetime(year=2050, month=5, day=20, hour=9, tzinfo=utc)  # a Friday
+END = datetime(year=2050, month=5, day=20, hour=12, tzinfo=utc)
+HOUR = timedelta(hours=1)
+
+
+def busy(start_hour, start_minute, end_hour, end_minute, busy_type=u'Busy'):
+  return dict(
+    start_time=u'2050-05-20T%02d:%02d:00' % (start_hour, start_minute),
+    end_time=u'2050-05-20T%02d:%02d:00' % (end_hour, end_minute),
+    busy_type=busy_type,
+  )
+
+
+def starts(slots):
+  return [(slot.start.hour, slot.start.minute) for slot in slots]
+
+
+def test_required_attendees_block_slots():
+  attendees = [
+    {'email': u'a@test.linkedin.com', 'busy': [busy(9, 0, 10, 0)]},
+    {'email': u'b@test.linkedin.com', 'busy': [busy(10, 30, 11, 0)]},
+  ]
+
+  slots = find_free_slots(attendees, START, END, HOUR)
+
+  assert starts(slots) == [(11, 0)]
+  assert slots[0].end == datetime(year=2050, month=5, day=20, hour=12, tzinfo=utc)
+
+
+def test_free_time_does_not_block():
+  attendees = [{'email': u'a@test.linkedin.com', 'busy': [busy(9, 0, 12, 0, busy_type=u'Free')]}]
+
+  assert len(find_free_slots(attendees, START, END, HOUR)) == 9
+
+
+def test_optional_attendees_only_change_the_ranking():
+  attendees = [
+    {'email': u'a@test.linkedin.com', 'busy': [busy(9, 0, 9, 30)]},
+    {'email': u'b@test.linkedin.com', 'busy': [busy(10, 0, 11, 0)], 'required': False},
+    {'email': u'c@test.linkedin.com', 'busy': [busy(10, 0, 10, 15)], 'required': False, 'weight': 3},
+  ]
+
+  slots = find_free_slots(attendees, START, END, HOUR)
+
+  assert starts(slots) == [(11, 0), (10, 15), (10, 30), (10, 45), (9, 30), (9, 45), (10, 0)]
+  assert [slot.optional_conflicts for slot in slots] == [0, 1, 1, 1, 4, 4, 4]
+
+
+def test_working_hours_mask_slots():
+  attendees = [{'email': u'a@test.linkedin.com', 'busy': []}]
+  phoenix = timezone('America/Phoenix')  # 09:00 - 17:00 there (no daylight saving time) is 16:00 - 00:00 UTC
+  slots = find_free_slots(attendees, START, START + timedelta(days=1), HOUR, granularity=HOUR,
+                          working_hours=(time(9), time(17)), timezone=phoenix)
+
+  assert starts(slots) == [(16, 0), (17, 0), (18, 0), (19, 0), (20, 0), (21, 0), (22, 0), (23, 0)]
+
+
+def test_working_hours_can_cross_midnight():
+  attendees = [{'email': u'a@test.linkedin.com', 'busy': []}]
+  thursday_night = START - timedelta(hours=12)  # the Thursday and Friday shifts each run until 06:00
+  slots = find_free_slots(attendees, thursday_night, thursday_night + timedelta(days=2), HOUR, granularity=HOUR,
+                          working_hours=(time(22), time(6)))
+
+  assert [(slot.start.day, slot.start.hour) for slot in slots] == [
+    (19, 22), (19, 23), (20, 0), (20, 1), (20, 2), (20, 3), (20, 4), (20, 5),
+    (20, 22), (20, 23), (21, 0), (21, 1), (21, 2), (21, 3), (21, 4), (21, 5)]
+
+
+def test_merged_free_busy_vectors_are_rasterized():
+  attendees = [{'email': u'a@test.linkedin.com', 'merged_free_busy': array('B', [2, 2, 1, 0, 0, 3])}]
+
+  slots = find_free_slots(attendees, START, END, HOUR, merged_free_busy_interval=30)
+
+  assert starts(slots) == [(10, 30)]
+
+
+def test_attendees_without_data_are_ignored():
+  attendees = [{'email': u'a@test.linkedin.com', 'busy': None}]
+
+  assert len(find_free_slots(attendees, START, END, HOUR, limit=2)) == 2
+
+
+def test_meeting_longer_than_window_has_no_slots():
+  assert find_free_slots([], START, END, 4 * HOUR) == []
@@ -0,0 +1,88 @@
+from datetime import datetime, date, timedelta
+from pytz import timezone, utc
+
+from pyexchange.base.calendar import ExchangeEventOccurrence
+from pyexchange.recurrence import expand_recurrence
+
+START = datetime(year=2050, month=1, day=31, hour=9, tzinfo=utc)  # a Monday
+END = START + timedelta(hours=1)
+
+
+def days(occurrences):
+  return [(o.start.month, o.start.day) for o in occurrences]
+
+
+def test_daily_interval():
+  occurrences = expand_recurrence(START, END, u'daily', START, START + timedelta(days=7), utc, interval=3)
+
+  assert days(occurrences) == [(1, 31), (2, 3), (2, 6)]
+
+
+def test_weekly_days_start_on_the_first_occurrence():
+  occurrences = expand_recurrence(START, END, u'weekly', START - timedelta(days=7), START + timedelta(days=14), utc,
+                                  interval=2, days=u'Sunday Monday Wednesday')
+
+  assert days(occurrences) == [(1, 31), (2, 2), (2, 13)]
+
+
+def test_monthly_falls_back_to_the_last_day_of_short_months():
+  occurrences = expand_recurrence(START, END, u'monthly', START, datetime(2050, 5, 1, tzinfo=utc), utc)
+
+  assert days(occurrences) == [(1, 31), (2, 28), (3, 31), (4, 30)]
+
+
+def test_yearly_with_end_date():
+  occurrences = expand_recurrence(START, END, u'yearly', START, datetime(2060, 1, 1, tzinfo=utc), utc,
+                                  end_date=date(2053, 1, 31))
+
+  assert [o.start.year for o in occurrences] == [2050, 2051, 2052, 2053]
+
+
+def test_window_far_from_the_start_is_skipped_to():
+  window_start = datetime(2150, 3, 1, tzinfo=utc)
+  occurrences = expand_recurrence(START, END, u'daily', window_start, window_start + timedelta(days=2), utc)
+
+  assert [o.start for o in occurrences] == [window_start + timedelta(hours=9), window_start + timedelta(days=1, hours=9)]
+
+
+def test_count_limits_the_series():
+  occurrences = expand_recurrence(START, END, u'daily', START + timedelta(days=2), START + timedelta(days=30), utc,
+                                  count=4)
+
+  assert days(occurrences) == [(2, 2), (2, 3)]
+
+
+def test_occurrences_overlapping_the_window_start_are_included():
+  occurrences = expand_recurrence(START, END, u'daily', START + timedelta(minutes=30), START + timedelta(hours=2),
+                                  utc)
+
+  assert days(occurrences) == [(1, 31)]
+
+
+def test_wall_clock_time_is_kept_across_dst():
+  pacific = timezone('America/Los_Angeles')
+  start = pacific.localize(datetime(2030, 3, 8, 9))
+  occurrences = expand_recurrence(start, start + timedelta(hours=1), u'daily', start, start + timedelta(days=3), pacific)
+
+  assert [o.start.hour for o in occurrences] == [17, 17, 16, 16]
+
+
+def test_weekly_days_are_those_of_the_meetings_time_zone():
+  pacific = timezone('America/Los_Angeles')
+  start = pacific.localize(datetime(2030, 1, 7, 17))  # a Monday, and Tuesday in UTC
+  occurrences = expand_recurrence(start, start + timedelta(hours=1), u'weekly', start, start + timedelta(days=21),
+                                  pacific, days=u'Monday')
+
+  assert [o.start.astimezone(pacific).strftime('%A %d %H:%M') for o in occurrences] == [
+    u'Monday 07 17:00', u'Monday 14 17:00', u'Monday 21 17:00']
+
+
+def test_exceptions_replace_their_occurrence():
+  moved = ExchangeEventOccurrence(id=u'MOVED', start=START + timedelta(days=10), end=END + timedelta(days=10),
+                                  original_start=START + timedelta(days=1))
+  occurrences = expand_recurrence(START, END, u'daily', START + timedelta(days=1), START + timedelta(days=11), utc,
+                                  end_date=date(2050, 2, 3), modified_occurrences=[moved],
+                                  deleted_occurrences=[START + timedelta(days=2)])
+
+  assert days(occurrences) == [(2, 3), (2, 10)]
+  assert occurrences[1].id == u'MOVED'
@@ -1,8 +1,9 @@
 from datetime import datetime
 from pytz import timezone, utc
-from pytest import mark
+from pytest import mark, raises
 
-from pyexchange.utils import convert_datetime_to_utc
+import threading
+from pyexchange.utils import convert_datetime_to_utc, chunks, run_concurrently, iter_concurrently, read_ahead
 
 
 def test_converting_none_returns_none():
@@ -22,3 +23,70 @@ def test_converting_tz_aware_date_returns_tz_aware_date():
   utc_time = utc.localize(datetime(year=2014, month=4, day=1, hour=8, minute=0, second=0))
 
   assert convert_datetime_to_utc(pacific_time) == utc_time
+
+
+def test_chunks_splits_into_batches():
+  assert chunks(range(5), 2) == [[0, 1], [2, 3], [4]]
+  assert chunks([], 2) == []
+
+
+def test_run_concurrently_keeps_order_and_captures_errors():
+  def divide(a, b):
+    return a // b
+
+  results = run_concurrently(divide, [(4, 2), (1, 0), (9, 3)], max_workers=3)
+
+  assert results[0] == (2, None)
+  assert results[1][0] is None
+  assert isinstance(results[1][1], ZeroDivisionError)
+  assert results[2] == (3, None)
+
+
+def test_read_ahead_keeps_order():
+  assert list(read_ahead(iter(range(10)), depth=2)) == list(range(10))
+  assert list(read_ahead(iter(range(3)), depth=0)) == [0, 1, 2]
+
+
+def test_read_ahead_stays_at_most_depth_ahead():
+  produced = []
+
+  def pages():
+    for i in range(10):
+      produced.append(i)
+      yield i
+
+  values = read_ahead(pages(), depth=2)
+  assert next(values) == 0
+
+  for _ in range(50):
+    if len(produced) >= 4:
+      break
+    threading.Event().wait(0.01)
+
+  assert len(produced) <= 4  # one value handed over, two waiting and one being put
+  values.close()
+
+
+def test_read_ahead_raises_errors_in_the_caller():
+  def pages():
+    yield 1
+    raise ValueError(u'page 2 failed')
+
+  values = read_ahead(pages(), depth=1)
+  assert next(values) == 1
+  with raises(ValueError):
+    next(values)
+
+
+def test_iter_concurrently_yields_in_order_or_as_finished():
+  def square(x):
+    if x == 3:
+      raise ValueError(x)
+    return x * x
+
+  ordered = list(iter_concurrently(square, [(i,) for i in range(6)], max_workers=3))
+  assert [result for result, error in ordered] == [0, 1, 4, None, 16, 25]
+  assert isinstance(ordered[3][1], ValueError)
+
+  unordered = list(iter_concurrently(square, [(i,) for i in range(6)], max_workers=3, ordered=False))
+  assert sorted(result for result, error in unordered if error is None) == [0, 1, 4, 16, 25]